@@ -3,6 +3,17 @@ from functools import lru_cache
 from app.application.gestos.gestor_sesiones import GestorSesiones
 from app.infrastructure.storage.azure_storage import AzureStorageService
 from app.infrastructure.video.gesture_recorder import GestureRecorder
+from app.infrastructure.video.calibration import CalibrationRegistry
+from app.infrastructure.video.preview_stream import PreviewHub
+from app.infrastructure.video.preview_cache import PreviewVideoCache
+from app.application.gestos.importar_videos import ImportJobRegistry
+from app.infrastructure.external.threaded_capture import ThreadedVideoCapture
+from app.infrastructure.external.video_capture import VideoCapture
+from app.infrastructure.external.pose_inference import AdaptivePoseEstimator, PoseEstimator
+from app.infrastructure.external.camera_broker import CameraSubscriber
+from app.infrastructure.external.landmark_stream import ReplayCapture
+from app.infrastructure.video.filters import config_por_tipo
+from config.settings import settings
 
 @lru_cache()
 def get_gestor_sesiones() -> GestorSesiones:
@@ -13,5 +24,68 @@ def get_azure_storage() -> AzureStorageService:
     return AzureStorageService()
 
 @lru_cache()
+def get_calibration_registry() -> CalibrationRegistry:
+    return CalibrationRegistry(
+        path=settings.CALIBRATION_FILE,
+        default_name=settings.CALIBRATION_PROFILE,
+    )
+
+@lru_cache()
+def get_preview_hub() -> PreviewHub:
+    return PreviewHub()
+
+@lru_cache()
+def get_preview_videos() -> PreviewVideoCache:
+    return PreviewVideoCache(
+        modo=settings.PREVIEW_VIDEO_MODE,
+        fps=settings.PREVIEW_VIDEO_FPS,
+        max_entradas=settings.PREVIEW_CACHE_MAX,
+    )
+
+@lru_cache()
+def get_import_jobs() -> ImportJobRegistry:
+    return ImportJobRegistry()
+
+def build_pose_estimator():
+    if settings.POSE_INFERENCE == "adaptive":
+        return AdaptivePoseEstimator(
+            inference_width=settings.POSE_INFERENCE_WIDTH,
+            target_fps=settings.POSE_TARGET_FPS,
+        )
+    return PoseEstimator()
+
 def get_gesture_recorder() -> GestureRecorder:
-    return GestureRecorder(cam_index=1)  # o el que uses
\ No newline at end of file
+    if settings.CAMERA_BROKER_NAME:
+        return _get_broker_gesture_recorder()
+    return _get_local_gesture_recorder()
+
+@lru_cache()
+def _get_broker_gesture_recorder() -> GestureRecorder:
+    # Con broker no hay dueño único de la cámara: cada grabación abre su suscriptor
+    # (se mapea el bloque compartido al empezar y se libera al terminar)
+    name = settings.CAMERA_BROKER_NAME
+    return GestureRecorder(
+        calibracion=get_calibration_registry(),
+        capture_factory=lambda: CameraSubscriber(name),
+        filtro_config=config_por_tipo(settings.SERVO_FILTER),
+        previews=get_preview_hub(),
+        videos=get_preview_videos(),
+    )
+
+@lru_cache()
+def _get_local_gesture_recorder() -> GestureRecorder:
+    if settings.CAPTURE_REPLAY_FILE:
+        capture = ReplayCapture(settings.CAPTURE_REPLAY_FILE, realtime=True, loop=True)
+    elif settings.CAPTURE_MODE == "threaded":
+        capture = ThreadedVideoCapture(cam_index=settings.CAMERA_INDEX, estimator=build_pose_estimator())
+    else:
+        capture = VideoCapture(cam_index=settings.CAMERA_INDEX, reuse_buffers=True,
+                               estimator=build_pose_estimator())
+    return GestureRecorder(
+        cam_index=settings.CAMERA_INDEX,
+        calibracion=get_calibration_registry(),
+        capture=capture,
+        filtro_config=config_por_tipo(settings.SERVO_FILTER),
+        previews=get_preview_hub(),
+        videos=get_preview_videos(),
+    )
\ No newline at end of file
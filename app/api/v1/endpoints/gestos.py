@@ -1,18 +1,29 @@
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, WebSocket, WebSocketDisconnect
 from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from sse_starlette.sse import EventSourceResponse
 
 from app.api.v1.dependencies import (
     get_gestor_sesiones,
     get_azure_storage,
     get_gesture_recorder,
+    get_calibration_registry,
+    get_import_jobs,
+    get_preview_hub,
+    get_preview_videos,
 )
 from app.application.gestos.crear_sesion import CrearSesionGesto, CrearSesionGestoRequest, CrearSesionGestoResponse
 from app.application.gestos.aprobar_gesto import AprobarGesto, AprobarGestoRequest, AprobarGestoResponse
-from app.application.gestos.iniciar_grabacion import IniciarStreamGrabacion
+from app.application.gestos.iniciar_grabacion import IniciarStreamGrabacion, IniciarGrabacionSegundoPlano
+from app.application.gestos.preview_en_vivo import PreviewEnVivo
 from app.application.gestos.obtener_sesion import ObtenerSesion, ObtenerSesionResponse
 from app.application.gestos.preview_gesto import PreviewGesto, PreviewGestoRequest
+from app.application.gestos.eventos_sesion import EventosSesion
+from app.application.gestos.importar_videos import ImportarVideos, ImportarVideosRequest, ObtenerImportacion
 from app.domain.enums.gesture_type import GestureType
 from app.infrastructure.storage.azure_storage import AzureStorageService
+from app.infrastructure.video.preview_stream import MJPEG_BOUNDARY, mjpeg_part, ws_message
+from config.settings import settings
 
 router = APIRouter(prefix="/gestos", tags=["gestos"])
 
@@ -29,8 +40,9 @@ def obtener_sesion(
 def crear_sesion(
     request: CrearSesionGestoRequest,
     gestor = Depends(get_gestor_sesiones),
+    calibracion = Depends(get_calibration_registry),
 ):
-    use_case = CrearSesionGesto(gestor)
+    use_case = CrearSesionGesto(gestor, calibracion)
     return use_case.ejecutar(request)
 
 @router.get("/sesion/{sesion_id}/stream")
@@ -43,6 +55,72 @@ def stream_gesto(
     generator = use_case.ejecutar(sesion_id)
     return StreamingResponse(generator, media_type="text/event-stream")
 
+@router.post("/sesion/{sesion_id}/grabar")
+def grabar_gesto(
+    sesion_id: str,
+    gestor = Depends(get_gestor_sesiones),
+    recorder = Depends(get_gesture_recorder),
+):
+    use_case = IniciarGrabacionSegundoPlano(gestor, recorder)
+    return use_case.ejecutar(sesion_id)
+
+@router.get("/sesion/{sesion_id}/preview.mjpeg")
+def preview_mjpeg(
+    sesion_id: str,
+    quality: int = Query(70, ge=1, le=100),
+    scale: float = Query(1.0, gt=0, le=1),
+    max_fps: float | None = Query(None, gt=0),
+    gestor = Depends(get_gestor_sesiones),
+    previews = Depends(get_preview_hub),
+):
+    frames = PreviewEnVivo(gestor, previews).ejecutar(sesion_id, quality, scale, max_fps)
+    return StreamingResponse(
+        (mjpeg_part(frame) for frame in frames),
+        media_type=f"multipart/x-mixed-replace; boundary={MJPEG_BOUNDARY}",
+    )
+
+@router.websocket("/sesion/{sesion_id}/preview/ws")
+async def preview_ws(
+    websocket: WebSocket,
+    sesion_id: str,
+    quality: int = 70,
+    scale: float = 1.0,
+    max_fps: float | None = None,
+    gestor = Depends(get_gestor_sesiones),
+    previews = Depends(get_preview_hub),
+):
+    """Mensajes binarios: cabecera WS_HEADER (seq, timestamp, time_left) + JPEG."""
+    try:
+        frames = await run_in_threadpool(
+            PreviewEnVivo(gestor, previews).ejecutar, sesion_id, quality, scale, max_fps
+        )
+    except HTTPException as e:
+        await websocket.close(code=1008, reason=str(e.detail))
+        return
+
+    try:
+        await websocket.accept()
+        while True:
+            frame = await run_in_threadpool(next, frames, None)
+            if frame is None:
+                break
+            await websocket.send_bytes(ws_message(frame))
+        await websocket.close()
+    except WebSocketDisconnect:
+        pass
+    finally:
+        # Suelta el canal aunque el cliente se haya ido a mitad del stream
+        await run_in_threadpool(frames.close)
+
+@router.get("/sesion/{sesion_id}/eventos")
+async def eventos_sesion(
+    sesion_id: str,
+    gestor = Depends(get_gestor_sesiones),
+    videos = Depends(get_preview_videos),
+):
+    use_case = EventosSesion(gestor, videos)
+    return EventSourceResponse(await use_case.ejecutar(sesion_id))
+
 # Añade estas dos rutas
 
 @router.post("/sesion/{sesion_id}/preview")
@@ -50,8 +128,9 @@ def generar_preview(
     sesion_id: str,
     gestor = Depends(get_gestor_sesiones),
     azure = Depends(get_azure_storage),
+    videos = Depends(get_preview_videos),
 ):
-    use_case = PreviewGesto(gestor, azure)
+    use_case = PreviewGesto(gestor, azure, videos)
     return use_case.ejecutar(PreviewGestoRequest(sesion_id=sesion_id))
 
 @router.post("/sesion/{sesion_id}/aprobar")
@@ -63,6 +142,24 @@ def aprobar_gesto(
 ):
     use_case = AprobarGesto(gestor, azure)
     return use_case.ejecutar(AprobarGestoRequest(sesion_id=sesion_id, nombre=nombre))
+
+@router.post("/importar")
+def importar_videos(
+    request: ImportarVideosRequest,
+    azure = Depends(get_azure_storage),
+    calibracion = Depends(get_calibration_registry),
+    jobs = Depends(get_import_jobs),
+):
+    use_case = ImportarVideos(azure, calibracion, jobs, workers=settings.IMPORT_WORKERS or None)
+    return use_case.ejecutar(request)
+
+@router.get("/importar/{job_id}")
+def obtener_importacion(
+    job_id: str,
+    jobs = Depends(get_import_jobs),
+):
+    return ObtenerImportacion(jobs).ejecutar(job_id)
+
 @router.get("/gestos/{tipo}")
 def listar_gestos(tipo: GestureType, storage: AzureStorageService = Depends()):
     return storage.listar_gestos_por_tipo(tipo)
\ No newline at end of file
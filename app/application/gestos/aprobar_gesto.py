@@ -1,9 +1,12 @@
 # app/application/gestos/aprobar_gesto.py
 from dataclasses import dataclass
-import json
 from fastapi import HTTPException
 from app.application.gestos.gestor_sesiones import GestorSesiones
 from app.infrastructure.storage.azure_storage import AzureStorageService
+from app.infrastructure.video.keyframes import comprimir_movimientos
+from app.infrastructure.video.mapper import pose_to_servo_row
+from app.infrastructure.video.resample import movimientos_uniformes
+from config.settings import settings
 
 @dataclass(frozen=True)
 class AprobarGestoRequest:
@@ -15,24 +18,38 @@ class AprobarGestoResponse:
     mensaje: str
     url: str
     frames: int
+    keyframes: int
+    ratio_compresion: float
+    error_maximo: int
 
 class AprobarGesto:
-    def __init__(self, gestor: GestorSesiones, azure: AzureStorageService):
+    def __init__(self, gestor: GestorSesiones, azure: AzureStorageService,
+                 tick_hz: float | None = None, max_hold: float | None = None,
+                 max_error: int | None = None):
         self.gestor = gestor
         self.azure = azure
+        self.tick_hz = tick_hz or settings.ROBOT_TICK_HZ
+        self.max_hold = settings.GESTURE_MAX_HOLD if max_hold is None else max_hold
+        self.max_error = settings.GESTURE_MAX_ERROR if max_error is None else max_error
 
     def ejecutar(self, request: AprobarGestoRequest) -> AprobarGestoResponse:
         sesion = self.gestor.obtener(request.sesion_id)
         if not sesion or not sesion.finalizado:
             raise HTTPException(400, "Sesión no finalizada")
 
-        movimientos = [
-            {"time": f.timestamp, **f.pose} for f in sesion.frames
-        ]
-        if not movimientos:
+        if not sesion.frames:
             raise HTTPException(400, "No hay movimientos para guardar")
 
-        json_data = json.dumps(movimientos, ensure_ascii=False, indent=2).encode()
+        # Grilla fija a la frecuencia del robot: cada frame dura exactamente 1 / tick_hz
+        movimientos = movimientos_uniformes(
+            [f.timestamp for f in sesion.frames],
+            [pose_to_servo_row(f.pose) for f in sesion.frames],
+            rate_hz=self.tick_hz,
+            max_hold=self.max_hold,
+        )
+
+        # Keyframes por canal con error acotado (ver keyframes.descomprimir_gesto)
+        json_data, stats = comprimir_movimientos(movimientos, self.tick_hz, self.max_error)
 
         url = self.azure.subir_gesto(
             data=json_data,
@@ -45,5 +62,6 @@ class AprobarGesto:
         return AprobarGestoResponse(
             mensaje="Gesto guardado permanentemente",
             url=url,
-            frames=len(movimientos)
+            frames=len(movimientos),
+            **stats
         )
\ No newline at end of file
@@ -1,8 +1,10 @@
 from dataclasses import dataclass
 from typing import List
+from fastapi import HTTPException
 from app.domain.entities.gesto_sesion import GestoSesion
 from app.domain.enums.gesture_type import GestureType
 from app.application.gestos.gestor_sesiones import GestorSesiones
+from app.infrastructure.video.calibration import CalibrationRegistry
 
 @dataclass(frozen=True)
 class CrearSesionGestoRequest:
@@ -10,6 +12,7 @@ class CrearSesionGestoRequest:
     emocion: str | None = None
     palabras_clave: List[str] | None = None
     duracion_segundos: float = 5.0
+    perfil_calibracion: str | None = None
 
 @dataclass
 class CrearSesionGestoResponse:
@@ -19,17 +22,30 @@ class CrearSesionGestoResponse:
     palabras_clave: List[str]
     duracion_segundos: float
     creado_en: str
+    perfil_calibracion: str | None = None
 
 class CrearSesionGesto:
-    def __init__(self, gestor: GestorSesiones):
+    def __init__(self, gestor: GestorSesiones, calibracion: CalibrationRegistry | None = None):
         self.gestor = gestor
+        self.calibracion = calibracion
 
     def ejecutar(self, request: CrearSesionGestoRequest) -> CrearSesionGestoResponse:
+        # El perfil se valida acá: en la grabación el error llegaría con el stream ya abierto
+        if self.calibracion is not None and request.perfil_calibracion:
+            try:
+                self.calibracion.get(request.perfil_calibracion)
+            except KeyError:
+                raise HTTPException(
+                    422,
+                    f"Perfil de calibración '{request.perfil_calibracion}' no existe "
+                    f"(disponibles: {', '.join(self.calibracion.names())})",
+                )
         sesion = GestoSesion(
             tipo=request.tipo,
             emocion=request.emocion,
             palabras_clave=request.palabras_clave or [],
             duracion_segundos=request.duracion_segundos,
+            perfil_calibracion=request.perfil_calibracion,
         )
         self.gestor.crear(sesion)
 
@@ -40,4 +56,5 @@ class CrearSesionGesto:
             palabras_clave=sesion.palabras_clave,
             duracion_segundos=sesion.duracion_segundos,
             creado_en=sesion.creado_en.isoformat(),
+            perfil_calibracion=sesion.perfil_calibracion,
         )
\ No newline at end of file
@@ -0,0 +1,69 @@
+# app/application/gestos/eventos_sesion.py
+import asyncio
+import json
+from dataclasses import asdict
+from typing import Optional
+
+from fastapi import HTTPException
+from starlette.concurrency import run_in_threadpool
+
+from app.application.gestos.gestor_sesiones import GestorSesiones
+from app.application.gestos.obtener_sesion import ObtenerSesion
+from app.infrastructure.video.preview_cache import PreviewVideoCache
+
+# Segundos que se espera el preview una vez terminada la grabación
+ESPERA_PREVIEW = 120.0
+
+class EventosSesion:
+    """
+    Estado de la sesión por push: un evento "estado" con la foto actual y luego
+    cada transición que publica el grabador (countdown, grabando, frames,
+    finished, preview, eliminada). Una sola lectura del store por conexión.
+    El stream termina con "preview" o "eliminada"; después de "finished" se
+    espera el preview como mucho `espera_preview` segundos. Si la sesión ya
+    estaba finalizada y su preview existe, se envía y el stream termina enseguida.
+    """
+
+    def __init__(self, gestor: GestorSesiones, videos: Optional[PreviewVideoCache] = None,
+                 espera_preview: float = ESPERA_PREVIEW):
+        self.gestor = gestor
+        self.videos = videos
+        self.espera_preview = espera_preview
+
+    async def ejecutar(self, sesion_id: str):
+        # Suscribirse antes de leer el estado: nada queda entre la foto y el primer evento
+        suscripcion = self.gestor.suscribir(sesion_id)
+        await suscripcion.iniciar()
+        try:
+            estado = await run_in_threadpool(ObtenerSesion(self.gestor).ejecutar, sesion_id)
+        except HTTPException:
+            await suscripcion.cerrar()
+            raise
+        return self._stream(estado, suscripcion)
+
+    def _preview_url(self, sesion_id: str) -> Optional[str]:
+        video = self.videos.obtener(sesion_id) if self.videos is not None else None
+        return video.url_vigente() if video is not None else None
+
+    async def _stream(self, estado, suscripcion):
+        try:
+            yield {"event": "estado", "data": json.dumps(asdict(estado), ensure_ascii=False)}
+            finalizado = estado.finalizado
+            if finalizado:
+                url = self._preview_url(estado.sesion_id)
+                if url is not None:
+                    yield {"event": "preview", "data": json.dumps(url, ensure_ascii=False)}
+                    return
+            eventos = suscripcion.__aiter__()
+            while True:
+                try:
+                    if finalizado:
+                        evento = await asyncio.wait_for(eventos.__anext__(), self.espera_preview)
+                    else:
+                        evento = await eventos.__anext__()
+                except (StopAsyncIteration, asyncio.TimeoutError):
+                    return
+                yield {"event": evento["type"], "data": json.dumps(evento["data"], ensure_ascii=False)}
+                finalizado = finalizado or evento["type"] == "finished"
+        finally:
+            await suscripcion.cerrar()
@@ -1,6 +1,8 @@
 # app/application/gestos/generar_preview.py
+import os
 from app.infrastructure.video.video_encoder import crear_video_preview
 from app.infrastructure.storage.azure_storage import AzureStorageService
+from app.infrastructure.storage.enums.container import Container
 from app.domain.entities.gesto_sesion import GestoSesion
 
 class GenerarPreviewVideo:
@@ -12,14 +14,15 @@ class GenerarPreviewVideo:
             raise ValueError("No hay frames")
 
         video_path = crear_video_preview(sesion.frames)
-        
+
+        # Se sube por bloques desde el archivo, sin cargarlo entero en memoria
         with open(video_path, "rb") as f:
             url = self.azure._subir(
-                container="gestos",
-                data=f.read(),
-                blob_name=f"preview/{sesion.id}.mp4"
+                container=Container.GESTOS,
+                data=f,
+                blob_name=f"preview/{sesion.id}.mp4",
+                content_type="video/mp4",
             )
-        
-        import os
+
         os.unlink(video_path)  # borrar temporal
-        return url
\ No newline at end of file
+        return url
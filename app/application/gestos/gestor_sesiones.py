@@ -1,64 +1,39 @@
-import json
-from datetime import timedelta, datetime
-import redis
 from config.settings import settings
 from app.domain.entities.gesto_sesion import GestoSesion, FrameData
-from app.domain.enums.gesture_type import GestureType
+from app.infrastructure.persistence.session_events import EVENTO_FIN, SessionEventBus, Suscripcion, build_event_bus
+from app.infrastructure.persistence.session_store import SessionStore, build_session_store
 
 class GestorSesiones:
-    def __init__(self):
-        self.redis = redis.from_url(settings.REDIS_URL, decode_responses=True)
+    """
+    Sesiones de grabación de gestos sobre un SessionStore intercambiable:
+    Redis (varios workers) o en proceso (una sola máquina), según SESSION_STORE.
 
-    def _key(self, sid): return f"gesto_sesion:{sid}"
+    Los cambios de estado se publican además en un bus de eventos para que los
+    clientes los reciban por SSE en lugar de consultar el store.
+    """
 
-    def crear(self, sesion: GestoSesion):
-        data = {
-            "id": sesion.id,
-            "tipo": sesion.tipo.value,
-            "emocion": sesion.emocion,
-            "palabras_clave": sesion.palabras_clave,
-            "duracion_segundos": sesion.duracion_segundos,
-            "grabando": sesion.grabando,
-            "finalizado": sesion.finalizado,
-            "cuenta_regresiva": sesion.cuenta_regresiva,
-            "inicio_grabacion": sesion.inicio_grabacion.isoformat() if sesion.inicio_grabacion else None,
-            "creado_en": sesion.creado_en.isoformat(),
-            "frames": [
-                {
-                    "timestamp": f.timestamp,
-                    "pose": f.pose,
-                    "image_base64": f.image_base64
-                } for f in sesion.frames
-            ]
-        }
-        self.redis.setex(self._key(sesion.id), timedelta(minutes=30), json.dumps(data))
+    def __init__(self, store: SessionStore | None = None, eventos: SessionEventBus | None = None):
+        self.store = store or build_session_store(
+            settings.SESSION_STORE,
+            settings.REDIS_URL,
+            max_sesiones=settings.SESSION_MAX_SESIONES,
+            max_mb=settings.SESSION_MAX_MB,
+        )
+        self.eventos = eventos or build_event_bus(settings.SESSION_EVENTS or settings.SESSION_STORE, settings.REDIS_URL)
 
-    def obtener(self, sesion_id: str) -> GestoSesion | None:
-        raw = self.redis.get(self._key(sesion_id))
-        if not raw: return None
-        data = json.loads(raw)
+    def crear(self, sesion: GestoSesion): self.store.crear(sesion)
+    def guardar_estado(self, sesion: GestoSesion): self.store.guardar_estado(sesion)
+    def agregar_frame(self, sesion_id: str, frame: FrameData): self.store.agregar_frame(sesion_id, frame)
+    def obtener_estado(self, sesion_id: str) -> GestoSesion | None: return self.store.obtener_estado(sesion_id)
+    def obtener(self, sesion_id: str) -> GestoSesion | None: return self.store.obtener(sesion_id)
+    def guardar(self, sesion: GestoSesion): self.crear(sesion)
 
-        frames = [
-            FrameData(
-                timestamp=f["timestamp"],
-                pose=f["pose"],
-                image_base64=f["image_base64"]
-            ) for f in data.get("frames", [])
-        ]
+    def eliminar(self, sid: str):
+        self.store.eliminar(sid)
+        self.publicar(sid, EVENTO_FIN)
 
-        return GestoSesion(
-            id=data["id"],
-            tipo=GestureType(data["tipo"]),
-            emocion=data["emocion"],
-            palabras_clave=data["palabras_clave"],
-            duracion_segundos=data["duracion_segundos"],
-            frames=frames,
-            grabando=data["grabando"],
-            finalizado=data["finalizado"],
-            cuenta_regresiva=data["cuenta_regresiva"],
-            inicio_grabacion=datetime.fromisoformat(data["inicio_grabacion"]) if data["inicio_grabacion"] else None,
-            creado_en=datetime.fromisoformat(data["creado_en"].replace("Z", "+00:00")),
-        )
+    def publicar(self, sesion_id: str, tipo: str, data=None):
+        self.eventos.publicar(sesion_id, {"type": tipo, "data": data})
 
-    def guardar(self, sesion: GestoSesion): self.crear(sesion)
-    def eliminar(self, sid: str): self.redis.delete(self._key(sid))
\ No newline at end of file
+    def suscribir(self, sesion_id: str) -> Suscripcion:
+        return self.eventos.suscribir(sesion_id)
@@ -0,0 +1,195 @@
+# app/application/gestos/importar_videos.py
+"""
+Importa videos de referencia como gestos de la biblioteca.
+
+    python -m app.application.gestos.importar_videos manifest.json --workers 8
+    python -m app.application.gestos.importar_videos manifest.json --out gestos/   # sin Azure
+"""
+import argparse
+import json
+import logging
+import os
+import threading
+from dataclasses import dataclass, field, replace
+from typing import Dict, List, Optional
+
+from fastapi import HTTPException
+
+from app.domain.enums.gesture_type import GestureType
+from app.infrastructure.storage.azure_storage import AzureStorageService
+from app.infrastructure.video.calibration import CalibrationRegistry
+from app.infrastructure.video.keyframes import DEFAULT_MAX_ERROR, comprimir_movimientos
+from app.infrastructure.video.resample import DEFAULT_TICK_HZ
+from app.infrastructure.video.video_import import ImportJob, VideoImporter, VideoImportItem, load_manifest
+from config.settings import settings
+
+log = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class VideoImportEntry:
+    path: str
+    nombre: Optional[str] = None
+    tipo: GestureType = GestureType.EMOTIONAL
+    emocion: Optional[str] = None
+    palabras_clave: List[str] = field(default_factory=list)
+    perfil_calibracion: Optional[str] = None
+
+
+@dataclass(frozen=True)
+class ImportarVideosRequest:
+    videos: List[VideoImportEntry]
+
+
+def _metadata(item: VideoImportItem) -> Dict[str, str]:
+    return {
+        "emocion": item.emocion or "",
+        "palabras_clave": ",".join(item.palabras_clave),
+    }
+
+
+def _json_gesto(movimientos: List[Dict], tick_hz: float, max_error: int) -> bytes:
+    # Mismo formato (keyframes) que AprobarGesto
+    return comprimir_movimientos(movimientos, tick_hz, max_error)[0]
+
+
+class ImportJobRegistry:
+    """Jobs de importación en memoria del proceso (el progreso se consulta por id)."""
+
+    def __init__(self):
+        self._jobs: Dict[str, ImportJob] = {}
+        self._lock = threading.Lock()
+
+    def add(self, job: ImportJob) -> None:
+        with self._lock:
+            self._jobs[job.id] = job
+
+    def get(self, job_id: str) -> Optional[ImportJob]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+
+def _dentro_de(path: str, carpeta: str) -> bool:
+    return os.path.commonpath([path, carpeta]) == carpeta
+
+
+class ImportarVideos:
+    """
+    Importación desde la API: solo se aceptan videos dentro de `import_dir`
+    (settings.IMPORT_DIR); las rutas relativas son relativas a esa carpeta.
+    """
+
+    def __init__(self, azure: AzureStorageService, calibracion: CalibrationRegistry,
+                 jobs: ImportJobRegistry, workers: Optional[int] = None, import_dir: Optional[str] = None):
+        self.azure = azure
+        self.jobs = jobs
+        self.import_dir = os.path.realpath(import_dir or settings.IMPORT_DIR)
+        self.importer = VideoImporter(workers=workers, profiles=calibracion.get,
+                                      tick_hz=settings.ROBOT_TICK_HZ, max_hold=settings.GESTURE_MAX_HOLD)
+
+    def _subir(self, item: VideoImportItem, movimientos: List[Dict]) -> Dict:
+        url = self.azure.subir_gesto(
+            data=_json_gesto(movimientos, self.importer.tick_hz, settings.GESTURE_MAX_ERROR),
+            filename=f"{item.nombre}.json",
+            tipo=item.tipo,
+            metadata=_metadata(item),
+        )
+        return {"url": url}
+
+    def ejecutar(self, request: ImportarVideosRequest) -> Dict:
+        if not request.videos:
+            raise HTTPException(400, "El manifest no tiene videos")
+        items = [VideoImportItem.from_dict(vars(v), self.import_dir) for v in request.videos]
+        # realpath: ni "../" ni un symlink sacan la ruta de la carpeta de importación
+        items = [replace(i, path=os.path.realpath(i.path)) for i in items]
+        fuera = [v.path for v, i in zip(request.videos, items) if not _dentro_de(i.path, self.import_dir)]
+        if fuera:
+            raise HTTPException(400, f"Videos fuera de la carpeta de importación: {', '.join(fuera)}")
+        faltantes = [v.path for v, i in zip(request.videos, items) if not os.path.isfile(i.path)]
+        if faltantes:
+            raise HTTPException(400, f"Videos no encontrados: {', '.join(faltantes)}")
+
+        job = ImportJob(total=len(items))
+        self.jobs.add(job)
+        threading.Thread(
+            target=self._run, args=(items, job), name=f"import-{job.id}", daemon=True
+        ).start()
+        return job.to_dict()
+
+    def _run(self, items: List[VideoImportItem], job: ImportJob) -> None:
+        try:
+            self.importer.run(items, self._subir, job)
+        except Exception as e:
+            # run() ya lo registró si falló adentro; esto cubre lo que falle antes
+            if job.error is None:
+                log.exception("Importación %s abortada", job.id)
+                job.estado, job.error = "error", f"{type(e).__name__}: {e}"
+
+
+class ObtenerImportacion:
+    def __init__(self, jobs: ImportJobRegistry):
+        self.jobs = jobs
+
+    def ejecutar(self, job_id: str) -> Dict:
+        job = self.jobs.get(job_id)
+        if not job:
+            raise HTTPException(404, "Importación no encontrada")
+        return job.to_dict()
+
+
+# ------------------ CLI ------------------
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Importar videos de referencia como gestos")
+    parser.add_argument("manifest")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--model-complexity", type=int, default=1)
+    parser.add_argument("--calibration", default=None, help="Archivo de perfiles de calibración")
+    parser.add_argument("--tick-hz", type=float, default=DEFAULT_TICK_HZ, help="Frecuencia del robot (Hz)")
+    parser.add_argument("--max-error", type=int, default=DEFAULT_MAX_ERROR,
+                        help="Error máximo de la compresión por keyframes (unidades de servo)")
+    parser.add_argument("--out", default=None, help="Escribir los JSON en esta carpeta en vez de subirlos")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s | %(name)s | %(levelname)s | %(message)s")
+
+    items = load_manifest(args.manifest)
+    calibracion = CalibrationRegistry(path=args.calibration)
+    importer = VideoImporter(workers=args.workers, model_complexity=args.model_complexity,
+                             profiles=calibracion.get, tick_hz=args.tick_hz)
+
+    if args.out:
+        indice: Dict[str, Dict] = {}
+
+        def on_gesture(item: VideoImportItem, movimientos: List[Dict]) -> Dict:
+            carpeta = os.path.join(args.out, item.tipo.value)
+            os.makedirs(carpeta, exist_ok=True)
+            path = os.path.join(carpeta, f"{item.nombre}.json")
+            with open(path, "wb") as f:
+                f.write(_json_gesto(movimientos, args.tick_hz, args.max_error))
+            indice[f"{item.tipo.value}/{item.nombre}.json"] = {
+                "emocion": item.emocion, "palabras_clave": item.palabras_clave,
+            }
+            return {"path": path}
+    else:
+        azure = AzureStorageService()
+
+        def on_gesture(item: VideoImportItem, movimientos: List[Dict]) -> Dict:
+            data = _json_gesto(movimientos, args.tick_hz, args.max_error)
+            url = azure.subir_gesto(data, f"{item.nombre}.json", item.tipo, _metadata(item))
+            return {"url": url}
+
+    job = importer.run(items, on_gesture)
+    if args.out:
+        with open(os.path.join(args.out, "manifest.json"), "w", encoding="utf-8") as f:
+            json.dump(indice, f, ensure_ascii=False, indent=2)
+
+    resumen = job.to_dict()
+    print(f"{resumen['procesados']}/{resumen['total']} videos, {resumen['frames']} frames "
+          f"({resumen['frames_con_pose']} con pose) "
+          f"en {resumen['segundos']}s ({resumen['frames_por_segundo']} frames/s), "
+          f"{len(resumen['errores'])} errores")
+    for e in resumen["errores"]:
+        print(f"  {e['path']}: {e['error']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,12 @@
+import logging
+import threading
 from fastapi import HTTPException
 from app.application.gestos.gestor_sesiones import GestorSesiones
 from app.infrastructure.video.gesture_recorder import GestureRecorder
 from app.domain.entities.gesto_sesion import GestoSesion
 
+log = logging.getLogger(__name__)
+
 class IniciarStreamGrabacion:
     def __init__(self, gestor: GestorSesiones, recorder: GestureRecorder):
         self.gestor = gestor
@@ -20,4 +24,24 @@ class IniciarStreamGrabacion:
 
     def ejecutar(self, sesion_id: str):
         sesion = self._obtener_y_validar(sesion_id)
-        return self.recorder.stream_with_countdown(sesion, self.gestor)
\ No newline at end of file
+        return self.recorder.stream_with_countdown(sesion, self.gestor)
+
+class IniciarGrabacionSegundoPlano(IniciarStreamGrabacion):
+    """
+    Graba sin SSE: la grabación corre en un hilo propio y el cliente sigue el
+    estado por /eventos y el video por el preview MJPEG o WebSocket.
+    """
+
+    def ejecutar(self, sesion_id: str) -> dict:
+        sesion = self._obtener_y_validar(sesion_id)
+        threading.Thread(
+            target=self._grabar, args=(sesion,), name=f"grabacion-{sesion.id}", daemon=True
+        ).start()
+        return {"sesion_id": sesion.id, "estado": "iniciada"}
+
+    def _grabar(self, sesion: GestoSesion) -> None:
+        try:
+            for _ in self.recorder.stream_with_countdown(sesion, self.gestor, con_imagen=False):
+                pass
+        except Exception:
+            log.exception("Error en la grabación de la sesión %s", sesion.id)
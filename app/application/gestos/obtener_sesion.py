@@ -25,7 +25,7 @@ class ObtenerSesion:
         self.gestor = gestor
 
     def ejecutar(self, sesion_id: str) -> ObtenerSesionResponse:
-        sesion: Optional[GestoSesion] = self.gestor.obtener(sesion_id)
+        sesion: Optional[GestoSesion] = self.gestor.obtener_estado(sesion_id)
         if not sesion:
             raise HTTPException(404, "Sesión no encontrada o ya expiró")
 
@@ -43,7 +43,7 @@ class ObtenerSesion:
             grabando=sesion.grabando,
             finalizado=sesion.finalizado,
             cuenta_regresiva=sesion.cuenta_regresiva,
-            frames_capturados=len(sesion.frames),
+            frames_capturados=sesion.frames_guardados,
             tiempo_restante=tiempo_restante,
             creado_en=sesion.creado_en.isoformat() + "Z",
         )
\ No newline at end of file
@@ -0,0 +1,37 @@
+# app/application/gestos/preview_en_vivo.py
+from fastapi import HTTPException
+
+from app.application.gestos.gestor_sesiones import GestorSesiones
+from app.infrastructure.video.preview_stream import PreviewChannel, PreviewHub, PreviewOptions
+
+class PreviewEnVivo:
+    """Canal de preview binario de una sesión que está (o va a estar) grabando."""
+
+    def __init__(self, gestor: GestorSesiones, previews: PreviewHub):
+        self.gestor = gestor
+        self.previews = previews
+
+    def ejecutar(self, sesion_id: str, quality: int, scale: float, max_fps: float | None):
+        sesion = self.gestor.obtener_estado(sesion_id)
+        if not sesion:
+            raise HTTPException(404, "Sesión no encontrada")
+        if sesion.finalizado:
+            raise HTTPException(400, "La grabación ya terminó")
+        try:
+            options = PreviewOptions(quality=quality, scale=scale, max_fps=max_fps)
+        except ValueError as e:
+            raise HTTPException(422, str(e))
+        return self._frames(sesion_id, options)
+
+    def _frames(self, sesion_id: str, options: PreviewOptions):
+        """Frames hasta que la grabación termina, la sesión desaparece o no llega nada por un rato."""
+        def activa() -> bool:
+            sesion = self.gestor.obtener_estado(sesion_id)
+            return sesion is not None and not sesion.finalizado
+
+        # El cliente puede conectarse antes de que empiece la grabación: el grabador usará este canal
+        canal: PreviewChannel = self.previews.abrir(sesion_id)
+        try:
+            yield from canal.frames(options, activa=activa)
+        finally:
+            self.previews.soltar(sesion_id, canal)
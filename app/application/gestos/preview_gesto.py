@@ -1,10 +1,14 @@
 # app/application/gestos/preview_gesto.py
 from dataclasses import dataclass
-from fastapi import HTTPException
 import os
+import time
+from fastapi import HTTPException
 from app.application.gestos.gestor_sesiones import GestorSesiones
 from app.infrastructure.storage.azure_storage import AzureStorageService
-from app.infrastructure.video.video_encoder import crear_video_preview
+from app.infrastructure.video.preview_cache import PreviewVideo, PreviewVideoCache
+from app.infrastructure.video.video_encoder import CONTENT_TYPE, crear_video_preview
+
+PREVIEW_EXPIRA_HORAS = 1
 
 @dataclass
 class PreviewGestoRequest:
@@ -14,30 +18,47 @@ class PreviewGestoRequest:
 class PreviewGestoResponse:
     video_url: str
     frames: int
+    en_cache: bool = False
 
 class PreviewGesto:
-    def __init__(self, gestor: GestorSesiones, azure: AzureStorageService):
+    def __init__(self, gestor: GestorSesiones, azure: AzureStorageService, videos: PreviewVideoCache):
         self.gestor = gestor
         self.azure = azure
+        self.videos = videos
 
     def ejecutar(self, request: PreviewGestoRequest) -> PreviewGestoResponse:
-        sesion = self.gestor.obtener(request.sesion_id)
+        # Solo metadata: los frames se leen únicamente si no hay video en caché
+        sesion = self.gestor.obtener_estado(request.sesion_id)
         if not sesion or not sesion.finalizado:
             raise HTTPException(400, "La grabación no ha finalizado")
 
-        if not sesion.frames:
+        if not sesion.frames_guardados:
             raise HTTPException(400, "No hay frames grabados")
 
-        # Generar video
-        video_path = crear_video_preview(sesion.frames)
+        video = self.videos.obtener(sesion.id)
+        if video is not None and video.url_vigente():
+            return PreviewGestoResponse(video_url=video.url, frames=video.frames, en_cache=True)
+
+        if video is None:
+            # Grabado en otro proceso (o ya desalojado): se codifica desde los frames guardados
+            sesion = self.gestor.obtener(request.sesion_id)
+            if not sesion or not sesion.frames:
+                raise HTTPException(400, "No hay frames grabados")
+            path = crear_video_preview(sesion.frames, fps=self.videos.fps, modo=self.videos.modo)
+            video = self.videos.guardar(
+                sesion.id, PreviewVideo(path, len(sesion.frames), CONTENT_TYPE[self.videos.modo])
+            )
 
         # Subir como temporal (expira en 1 hora)
-        with open(video_path, "rb") as f:
-            video_url = self.azure.subir_temporal(
-                data=f.read(),
-                filename=f"preview_{sesion.id}.mp4",
-                expires_in_hours=1
+        extension = os.path.splitext(video.path)[1]
+        with open(video.path, "rb") as f:
+            video.url = self.azure.subir_temporal(
+                data=f,
+                filename=f"preview_{sesion.id}{extension}",
+                expires_in_hours=PREVIEW_EXPIRA_HORAS,
+                content_type=video.content_type,
             )
+        video.url_expira = time.time() + PREVIEW_EXPIRA_HORAS * 3600
 
-        os.unlink(video_path)
-        return PreviewGestoResponse(video_url=video_url, frames=len(sesion.frames))
\ No newline at end of file
+        self.gestor.publicar(sesion.id, "preview", video.url)
+        return PreviewGestoResponse(video_url=video.url, frames=video.frames)
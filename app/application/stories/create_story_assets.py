@@ -5,6 +5,7 @@ from typing import Dict
 
 from app.application.stories.emotion_analysis import analyze_emotions
 from app.application.stories.gesture_selection import select_gestures
+from app.domain.entities.gesto_plantilla import serializar_gesto
 from app.infrastructure.external.audio.text_to_speech import (
     generate_audios,
     combine_audios,
@@ -58,7 +59,8 @@ def create_story_assets(
     # Guardar movimientos como TXT legible
     movements_path = os.path.join(temp_dir, "movements.txt")
     with open(movements_path, "w", encoding="utf-8") as f:
-        json.dump(gestures_with_segments, f, indent=4, ensure_ascii=False)
+        # Los gestos seleccionados son instancias: se materializan al escribir
+        json.dump(gestures_with_segments, f, indent=4, ensure_ascii=False, default=serializar_gesto)
 
     # Guardar texto original
     text_path = os.path.join(temp_dir, "story_text.txt")
@@ -0,0 +1,195 @@
+# app/application/stories/gesture_library.py
+"""
+Biblioteca de gestos en memoria, compartida por todo el proceso. Los gestos
+son GestoPlantilla inmutables: se pueden usar desde varios cuentos a la vez.
+
+Se carga una vez por carpeta y se indexa por emoción (cada lista ordenada por
+duración, para buscar con bisect) y por palabra clave. En cada uso se revisa
+la carpeta como mucho cada `check_interval` segundos y solo se vuelven a leer
+los archivos cuyo (mtime, tamaño) cambió.
+
+Con un KeywordExpansionStore, los sinónimos de cada palabra clave también
+entran al autómata (apuntando al mismo gesto), así que una oración que dice
+"contento" encuentra el gesto de "feliz" en la misma pasada.
+"""
+import json
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+from app.application.stories.keyword_matcher import KeywordMatch, KeywordMatcher
+from app.domain.entities.gesto_plantilla import GestoPlantilla
+
+if TYPE_CHECKING:
+    from app.application.stories.keyword_expansion import KeywordExpansionStore
+
+log = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class _Indice:
+    gestures: Dict[str, GestoPlantilla] = field(default_factory=dict)
+    # emoción → (duraciones ordenadas, gestos en el mismo orden)
+    por_emocion: Dict[str, Tuple[List[float], List[GestoPlantilla]]] = field(default_factory=dict)
+    # palabra clave → [(orden del gesto, orden de la palabra en el gesto, gesto)]
+    por_keyword: Dict[str, List[Tuple[int, int, GestoPlantilla]]] = field(default_factory=dict)
+    # Palabras clave / frases y sus expansiones en un autómata (payload: (orden, k, gesto, expandida))
+    matcher: KeywordMatcher = field(default_factory=lambda: KeywordMatcher(()))
+
+
+def _indexar(gestures: Dict[str, GestoPlantilla],
+             expansiones: Optional["KeywordExpansionStore"] = None) -> _Indice:
+    por_emocion: Dict[str, List[GestoPlantilla]] = {}
+    por_keyword: Dict[str, List[Tuple[int, int, GestoPlantilla]]] = {}
+    for orden, gesture in enumerate(gestures.values()):
+        for label in gesture.labels:
+            por_emocion.setdefault(label, []).append(gesture)
+        for k, keyword in enumerate(gesture.keywords):
+            por_keyword.setdefault(keyword, []).append((orden, k, gesture))
+    ordenado = {}
+    for label, lista in por_emocion.items():
+        lista.sort(key=lambda g: g.duration)  # estable: a igual duración, orden de la biblioteca
+        ordenado[label] = ([g.duration for g in lista], lista)
+    patrones = [(keyword, (*hit, False)) for keyword, hits in por_keyword.items() for hit in hits]
+    if expansiones is not None:
+        patrones += [
+            (termino, (*hit, True))
+            for keyword, hits in por_keyword.items()
+            for termino in expansiones.expandir(keyword)
+            for hit in hits
+        ]
+    matcher = KeywordMatcher(patrones)
+    return _Indice(gestures, ordenado, por_keyword, matcher)
+
+
+class GestureLibrary:
+    def __init__(self, folder: str, check_interval: float = 2.0,
+                 expansiones: Optional["KeywordExpansionStore"] = None):
+        self.folder = folder
+        self.check_interval = check_interval
+        self.expansiones = expansiones
+        self._archivos: Dict[str, Tuple[Tuple[int, int], GestoPlantilla]] = {}
+        # Archivos inválidos → (mtime, tamaño) con el que fallaron: no se releen hasta que cambien
+        self._fallidos: Dict[str, Tuple[int, int]] = {}
+        self._indice = _Indice()
+        self._revisado = 0.0
+        # Cambia con cada recarga (para invalidar cachés derivados, p. ej. los planes)
+        self.version = 0
+        self._lock = threading.Lock()
+        self.refrescar(forzar=True)
+
+    # ------------------ Recarga ------------------
+    def refrescar(self, forzar: bool = False) -> bool:
+        """Relee los archivos nuevos o modificados; True si el índice cambió."""
+        if not forzar and time.monotonic() - self._revisado < self.check_interval:
+            return False
+        with self._lock:
+            # Otro hilo pudo haber revisado mientras se esperaba el lock
+            if not forzar and time.monotonic() - self._revisado < self.check_interval:
+                return False
+            self._revisado = time.monotonic()
+            try:
+                entradas = sorted(
+                    (e for e in os.scandir(self.folder) if e.name.endswith(".json") and e.is_file()),
+                    key=lambda e: e.name,
+                )
+            except FileNotFoundError:
+                entradas = []
+
+            archivos = {}
+            fallidos = {}
+            cambio = False
+            for entrada in entradas:
+                try:
+                    st = entrada.stat()
+                except FileNotFoundError:
+                    continue  # borrado entre scandir y stat: si estaba cargado, falta en `archivos`
+                clave = (st.st_mtime_ns, st.st_size)
+                previo = self._archivos.get(entrada.path)
+                if previo is not None and previo[0] == clave:
+                    archivos[entrada.path] = previo
+                    continue
+                if self._fallidos.get(entrada.path) == clave:
+                    fallidos[entrada.path] = clave
+                    continue
+                try:
+                    with open(entrada.path, "r", encoding="utf-8") as f:
+                        archivos[entrada.path] = (clave, GestoPlantilla.from_dict(json.load(f)))
+                except (OSError, ValueError, KeyError) as e:
+                    log.warning("Gesto %s ignorado: %s", entrada.path, e)
+                    fallidos[entrada.path] = clave
+                    continue
+                cambio = True
+            self._fallidos = fallidos
+            cambio = cambio or archivos.keys() != self._archivos.keys()
+            if not cambio:
+                return False
+
+            self._archivos = archivos
+            gestures = {g.gesture_id: g for _, g in archivos.values()}
+            # Un solo reemplazo del índice: los lectores ven el viejo o el nuevo, nunca uno a medias
+            self._indice = _indexar(gestures, self.expansiones)
+            self.version += 1
+            log.info("Biblioteca %s: %d gestos", self.folder, len(gestures))
+            return True
+
+    def usar_expansiones(self, expansiones: Optional["KeywordExpansionStore"]) -> bool:
+        """Cambia el store de expansiones y rehace el índice con los mismos gestos; True si cambió."""
+        if expansiones is self.expansiones:
+            return False
+        with self._lock:
+            if expansiones is self.expansiones:
+                return False
+            self.expansiones = expansiones
+            self._indice = _indexar(self._indice.gestures, expansiones)
+            self.version += 1
+            log.info("Biblioteca %s: índice rehecho con otras expansiones", self.folder)
+            return True
+
+    # ------------------ Consultas ------------------
+    @property
+    def gestures(self) -> Dict[str, GestoPlantilla]:
+        return self._indice.gestures
+
+    def por_emocion(self, emotion: str) -> List[GestoPlantilla]:
+        return self._indice.por_emocion.get(emotion, ([], []))[1]
+
+    def mas_larga(self, emotion: str) -> Optional[GestoPlantilla]:
+        return self.mas_larga_hasta(emotion, float("inf"))
+
+    def mas_larga_hasta(self, emotion: str, max_duration: float) -> Optional[GestoPlantilla]:
+        """El gesto más largo de la emoción con duración <= max_duration (el primero si hay empate)."""
+        duraciones, lista = self._indice.por_emocion.get(emotion, ([], []))
+        i = bisect_right(duraciones, max_duration)
+        if i == 0:
+            return None
+        return lista[bisect_left(duraciones, duraciones[i - 1])]
+
+    def por_keyword(self, keyword: str) -> List[Tuple[int, int, GestoPlantilla]]:
+        return self._indice.por_keyword.get(keyword, [])
+
+    def buscar_keywords(self, texto: str) -> List[KeywordMatch]:
+        """Palabras clave (y expansiones) presentes en el texto, sin tildes ni mayúsculas, en una sola pasada."""
+        return self._indice.matcher.buscar(texto)
+
+
+# (carpeta, con expansiones) → biblioteca; el store no es parte de la clave porque
+# cambia cuando la base de expansiones se reimporta
+_bibliotecas: Dict[Tuple[str, bool], GestureLibrary] = {}
+_bibliotecas_lock = threading.Lock()
+
+
+def get_gesture_library(folder: str, expansiones: Optional["KeywordExpansionStore"] = None) -> GestureLibrary:
+    """Biblioteca compartida de la carpeta, al día con los cambios en disco y con el store recibido."""
+    clave = (os.path.abspath(folder), expansiones is not None)
+    with _bibliotecas_lock:
+        library = _bibliotecas.get(clave)
+        if library is None:
+            library = _bibliotecas[clave] = GestureLibrary(clave[0], expansiones=expansiones)
+    library.usar_expansiones(expansiones)
+    library.refrescar()
+    return library
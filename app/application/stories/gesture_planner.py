@@ -0,0 +1,262 @@
+# app/application/stories/gesture_planner.py
+"""
+Planificador del relleno de un segmento con gestos emocionales.
+
+En vez del bucle codicioso ("el más largo que entre, repetir"), el relleno se
+resuelve como una mochila 0/1 sobre una línea de tiempo cuantizada (10 ms): cada
+gesto aparece como copias con valor = su duración menos una penalización por
+repetición creciente, así se prefieren combinaciones variadas que llenen más
+tiempo. La tabla de la mochila se resuelve una vez por emoción y sirve para
+cualquier duración; además los planes se memorizan por (emoción, duración
+cuantizada), de modo que un segmento repetido cuesta una búsqueda en un dict.
+Lo que la penalización deja sin cubrir (segmentos largos con pocos gestos) se
+completa repitiendo gestos enteros, no estirando la última pose de un recorte.
+
+    python -m app.application.stories.gesture_planner bench
+"""
+import argparse
+import math
+import os
+import random
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from app.application.stories.gesture_library import GestureLibrary, get_gesture_library
+from app.domain.entities.gesto_plantilla import GestoInstancia, GestoPlantilla
+
+QUANTUM = 0.01            # s por unidad de la línea de tiempo
+VARIETY_PENALTY = 0.25    # s que "cuesta" cada repetición extra de un mismo gesto
+MAX_PLANES = 4096
+
+
+@dataclass(frozen=True)
+class _Tabla:
+    total: int
+    items: List[Tuple[int, float, int, GestoPlantilla]]  # (unidades, valor, repetición, gesto)
+    dp: np.ndarray
+    take: np.ndarray
+
+
+class GesturePlanner:
+    def __init__(self, library: GestureLibrary, quantum: float = QUANTUM,
+                 variety_penalty: float = VARIETY_PENALTY, max_planes: int = MAX_PLANES,
+                 horizonte: float = 10.0):
+        self.library = library
+        self.quantum = quantum
+        self.variety_penalty = variety_penalty
+        self.max_planes = max_planes
+        # Duración (s) hasta la que se resuelve de entrada la tabla de cada emoción
+        self.horizonte = int(round(horizonte / quantum))
+        self._version = library.version
+        self._buckets: Dict[str, List[Tuple[int, GestoPlantilla]]] = {}
+        self._tablas: Dict[str, _Tabla] = {}
+        self._planes: "OrderedDict[Tuple[str, int], Tuple[GestoPlantilla, ...]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    # ------------------ Caché ------------------
+    def _vigente(self) -> None:
+        if self.library.version != self._version:
+            with self._lock:
+                self._buckets.clear()
+                self._tablas.clear()
+                self._planes.clear()
+                self._version = self.library.version
+
+    def _unidades(self, duration: float) -> int:
+        # Hacia arriba: la suma de un plan nunca se pasa del segmento real
+        return max(1, math.ceil(duration / self.quantum - 1e-9))
+
+    def buckets(self, emotion: str) -> List[Tuple[int, GestoPlantilla]]:
+        """(duración en unidades, gesto) de la emoción, de más largo a más corto."""
+        buckets = self._buckets.get(emotion)
+        if buckets is None:
+            buckets = [(self._unidades(g.duration), g) for g in reversed(self.library.por_emocion(emotion))]
+            self._buckets[emotion] = buckets
+        return buckets
+
+    # ------------------ Plan ------------------
+    def planificar(self, emotion: str, duration: float) -> Tuple[GestoPlantilla, ...]:
+        """Gestos (completos) a encadenar para llenar `duration`; puede sobrar menos de un gesto."""
+        self._vigente()
+        unidades = int(math.floor(duration / self.quantum + 1e-9))
+        key = (emotion, unidades)
+        with self._lock:
+            # Búsqueda y subida en el LRU juntas: otro hilo puede desalojar la clave entre las dos
+            plan = self._planes.get(key)
+            if plan is not None:
+                self._planes.move_to_end(key)
+                return plan
+        plan = self._resolver(emotion, unidades)
+        with self._lock:
+            self._planes[key] = plan
+            while len(self._planes) > self.max_planes:
+                self._planes.popitem(last=False)
+        return plan
+
+    def _tabla(self, emotion: str, total: int) -> "_Tabla":
+        """
+        Mochila 0/1 de la emoción resuelta una vez hasta >= total unidades: la
+        misma tabla responde cualquier duración menor (dp[t] = mejor valor con
+        peso exacto t), así que cada segmento solo reconstruye su plan.
+        """
+        tabla = self._tablas.get(emotion)
+        if tabla is not None and tabla.total >= total:
+            return tabla
+        total = max(total, 2 * tabla.total if tabla else self.horizonte)
+        penalty = self.variety_penalty / self.quantum
+        # Copias 0/1: la k-ésima repetición vale w - k * penalty (menos un poco por gesto,
+        # para preferir menos gestos más largos a igual tiempo cubierto)
+        items = [
+            (w, w - k * penalty - 1e-3, k, g)
+            for w, g in self.buckets(emotion) if w <= total
+            for k in range(total // w)
+            if k == 0 or w - k * penalty > 0
+        ]
+        dp = np.full(total + 1, -np.inf)
+        dp[0] = 0.0
+        take = np.zeros((len(items), total + 1), dtype=bool)
+        for i, (w, v, _, _) in enumerate(items):
+            cand = dp[:-w] + v
+            mejor = cand > dp[w:]
+            take[i, w:] = mejor
+            dp[w:] = np.where(mejor, cand, dp[w:])
+        tabla = _Tabla(total, items, dp, take)
+        with self._lock:
+            self._tablas[emotion] = tabla
+        return tabla
+
+    def _resolver(self, emotion: str, total: int) -> Tuple[GestoPlantilla, ...]:
+        if total <= 0 or not self.buckets(emotion):
+            return ()
+        tabla = self._tabla(emotion, total)
+        t = int(np.argmax(tabla.dp[:total + 1]))
+        elegidos = []
+        for i in range(len(tabla.items) - 1, -1, -1):
+            if t == 0:
+                break
+            if tabla.take[i, t]:
+                elegidos.append(tabla.items[i])
+                t -= tabla.items[i][0]
+        # Primero una pasada de gestos distintos (de más largo a más corto), después las repeticiones
+        elegidos.sort(key=lambda it: (it[2], -it[0]))
+        return tuple(g for _, _, _, g in elegidos)
+
+    def rellenar(self, emotion: str, start: float, duration: float) -> List[GestoInstancia]:
+        """
+        Instancias que cubren [start, start + duration]: el plan óptimo; el
+        tiempo que la penalización no deja cubrir se llena repitiendo gestos
+        completos (el más largo que entre, como el algoritmo anterior) y solo lo
+        que queda por debajo del gesto más corto va a un recorte del más largo.
+        """
+        instancias = []
+        t = start
+        fin = start + duration
+        for plantilla in self.planificar(emotion, duration):
+            instancias.append(plantilla.instancia(t))
+            t += plantilla.duration
+        while True:
+            plantilla = self.library.mas_larga_hasta(emotion, fin - t + 1e-9)
+            if plantilla is None or plantilla.duration <= 0:
+                break
+            instancias.append(plantilla.instancia(t))
+            t += plantilla.duration
+        resto = fin - t
+        if resto > 1e-6:
+            mas_larga = self.library.mas_larga(emotion)
+            if mas_larga is not None:
+                instancias.append(mas_larga.recorte(t, resto))
+        return instancias
+
+
+@lru_cache(maxsize=None)
+def _planner(folder: str) -> GesturePlanner:
+    return GesturePlanner(get_gesture_library(folder))
+
+
+def get_gesture_planner(folder: str) -> GesturePlanner:
+    """Planificador compartido de la carpeta (sobre la misma biblioteca que get_gesture_library)."""
+    planner = _planner(os.path.abspath(folder))
+    planner.library.refrescar()
+    return planner
+
+
+# ------------------ Benchmark ------------------
+def _greedy_anterior(gestures: List[GestoPlantilla], duration: float) -> List[GestoPlantilla]:
+    """El relleno codicioso original (lista filtrada + max en cada vuelta), sin el recorte final."""
+    elegidos = []
+    remaining = duration
+    while remaining > 0:
+        filtrados = [g for g in gestures if g.duration <= remaining]
+        if not filtrados:
+            break
+        g = max(filtrados, key=lambda x: x.duration)
+        elegidos.append(g)
+        remaining -= g.duration
+    return elegidos
+
+
+def _biblioteca_sintetica(folder: str, n: int, emociones: List[str], seed: int = 0) -> None:
+    import json
+
+    rng = random.Random(seed)
+    for i in range(n):
+        duration = round(rng.uniform(0.6, 4.0), 2)
+        frames = {f"p{j}": {"timestamp": round(duration * j / 4, 3)} for j in range(5)}
+        gesture = {"gesture_id": f"g{i}", "labels": [rng.choice(emociones)], "duration": duration, "frames": frames}
+        with open(os.path.join(folder, f"g{i}.json"), "w", encoding="utf-8") as f:
+            json.dump(gesture, f)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Planificador de gestos")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    bench = sub.add_parser("bench", help="Compara el relleno codicioso con el planificador")
+    bench.add_argument("--gestures", default=None, help="Carpeta de gestos emocionales (por defecto, sintética)")
+    bench.add_argument("--n", type=int, default=300, help="Gestos de la biblioteca sintética")
+    bench.add_argument("--segments", type=int, default=2000)
+    args = parser.parse_args()
+
+    emociones = ["alegria", "tristeza", "enojo", "miedo", "sorpresa"]
+    tmp = None
+    folder = args.gestures
+    if folder is None:
+        tmp = tempfile.TemporaryDirectory()
+        folder = tmp.name
+        _biblioteca_sintetica(folder, args.n, emociones)
+    library = GestureLibrary(folder)
+    emociones = [e for e in emociones if library.por_emocion(e)] or list(library._indice.por_emocion)
+    rng = random.Random(1)
+    segmentos = [(rng.choice(emociones), round(rng.uniform(0.5, 10.0), 3)) for _ in range(args.segments)]
+
+    def medir(fn) -> Tuple[float, float, float]:
+        t0 = time.perf_counter()
+        planes = [fn(e, d) for e, d in segmentos]
+        us = (time.perf_counter() - t0) / len(segmentos) * 1e6
+        cubierto = sum(sum(g.duration for g in p) for p in planes) / sum(d for _, d in segmentos)
+        repetidos = sum(len(p) - len({g.gesture_id for g in p}) for p in planes) / len(segmentos)
+        return us, cubierto, repetidos
+
+    planner = GesturePlanner(library)
+    filas = [
+        ("codicioso anterior", lambda e, d: _greedy_anterior(library.por_emocion(e), d)),
+        ("planificador (frío)", planner.planificar),
+        ("planificador (memo)", planner.planificar),
+    ]
+    print(f"{len(library.gestures)} gestos, {len(segmentos)} segmentos de 0.5-10 s")
+    print(f"  {'':22s} {'µs/segmento':>12s} {'cubierto':>9s} {'repetidos':>10s}")
+    for nombre, fn in filas:
+        us, cubierto, repetidos = medir(fn)
+        print(f"  {nombre:22s} {us:12.1f} {cubierto:9.1%} {repetidos:10.2f}")
+    if tmp is not None:
+        tmp.cleanup()
+
+
+if __name__ == "__main__":
+    main()
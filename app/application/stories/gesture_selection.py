@@ -1,18 +1,8 @@
 from pydub import AudioSegment
-import json
 import os
-import requests
-
-CONCEPTNET_URL = "http://api.conceptnet.io/c/es/"
-
-def load_gestures(folder):
-    gestures = {}
-    for file in os.listdir(folder):
-        if file.endswith(".json"):
-            with open(os.path.join(folder, file), "r", encoding="utf-8") as f:
-                gesture = json.load(f)
-                gestures[gesture["gesture_id"]] = gesture
-    return gestures
+from app.application.stories.gesture_library import GestureLibrary, get_gesture_library
+from app.application.stories.gesture_planner import get_gesture_planner
+from app.application.stories.keyword_expansion import EXPANSIONS_DB, get_expansion_store
 
 def add_segment_data(emotions_data, audio_dir):
     current_time = 0.0
@@ -34,29 +24,33 @@ def add_segment_data(emotions_data, audio_dir):
 
     return emotions_data
 
-def query_conceptnet(word):
-    url = f"{CONCEPTNET_URL}{word}"
-    response = requests.get(url)
-    if response.status_code == 200:
-        return response.json()
-    return None
-
-def select_contextual_gesture(sentence, contextual_gestures_library):
-    words = sentence.split()
-    for gesture_id, gesture in contextual_gestures_library.items():
-        for keyword in gesture["keywords"]:
-            if keyword in words:
-                contextual_position = sentence.index(keyword)
-                return gesture, contextual_position
-    return None, None
-
-def filtered_emotional_gestures(emotion, emotional_gestures_library):
-    filtered_gestures = [gesture for gesture in emotional_gestures_library.values() if emotion in gesture["labels"]]
-    return filtered_gestures
-
-def select_gestures(gestures_path, audio_dir, emotions_data, min_silence_len=500, silence_thresh=-40):
-    emotional_gestures_library = load_gestures(gestures_path + '/emotions')
-    contextual_gestures_library = load_gestures(gestures_path + '/context')
+def query_conceptnet(word, expansions_db=EXPANSIONS_DB):
+    # Base local importada de ConceptNet (keyword_expansion.py), sin red
+    return list(get_expansion_store(expansions_db).expandir(word))
+
+def select_contextual_gesture(sentence, contextual_gestures_library: GestureLibrary):
+    """
+    Entre todas las coincidencias se prefieren las palabras clave propias antes
+    que sus expansiones, luego la frase más larga (más específica), el orden de
+    la biblioteca y la primera aparición. La posición es la del match en la
+    oración, no la de la primera subcadena igual.
+    """
+    matches = contextual_gestures_library.buscar_keywords(sentence)
+    if not matches:
+        return None, None
+    best = min(matches, key=lambda m: (m.payload[3], -m.palabras, m.payload[0], m.payload[1], m.inicio))
+    return best.payload[2], best.inicio
+
+def filtered_emotional_gestures(emotion, emotional_gestures_library: GestureLibrary):
+    return emotional_gestures_library.por_emocion(emotion)
+
+def select_gestures(gestures_path, audio_dir, emotions_data, min_silence_len=500, silence_thresh=-40,
+                    expansions_db=EXPANSIONS_DB):
+    emotional_gestures_library = get_gesture_library(gestures_path + '/emotions')
+    planner = get_gesture_planner(gestures_path + '/emotions')
+    contextual_gestures_library = get_gesture_library(
+        gestures_path + '/context', expansiones=get_expansion_store(expansions_db)
+    )
 
     segments_data = add_segment_data(emotions_data, audio_dir)
     
@@ -71,30 +65,31 @@ def select_gestures(gestures_path, audio_dir, emotions_data, min_silence_len=500
 
         contextual_moment = 0
         contextual_duration = 0
+        contextual_instance = None
 
         if contextual_gesture:
             segment_start = segment_complete["start"]
             segment_end = segment_complete["end"]
             segment_duration = segment_complete["duration"]
 
-            contextual_duration = contextual_gesture["duration"]
+            contextual_duration = contextual_gesture.duration
 
             if contextual_duration > segment_duration:
-                print(f"Contextual gesture '{contextual_gesture['gesture_id']}' exceeds segment. Compressing positions...")
-                
-                compression_factor = segment_duration / contextual_duration
+                print(f"Contextual gesture '{contextual_gesture.gesture_id}' exceeds segment. Compressing positions...")
 
-                for position, position_data in contextual_gesture["frames"].items():
-                    position_data["timestamp"] *= compression_factor
-
-                contextual_gesture["duration"] = segment_duration
+                # La plantilla no se toca: la instancia lleva la escala
+                compression_factor = segment_duration / contextual_duration
                 contextual_moment = segment_start
+                contextual_instance = contextual_gesture.instancia(
+                    contextual_moment, compression_factor, duration=segment_duration
+                )
             else:
                 contextual_moment = segment_start + (contextual_position / len(data["sentence"])) * segment_complete["duration"]
                 
                 if contextual_moment + contextual_duration > segment_end:
                     contextual_moment = segment_end - contextual_duration
 
+                contextual_instance = contextual_gesture.instancia(contextual_moment)
                 segments.append({
                     "start": segment_start, 
                     "end": contextual_moment,       
@@ -111,7 +106,7 @@ def select_gestures(gestures_path, audio_dir, emotions_data, min_silence_len=500
         emotional_gestures = filtered_emotional_gestures(emotion, emotional_gestures_library)
 
         if contextual_gesture and not emotional_gestures or not segments:
-            selected_gestures.append(contextual_gesture)
+            selected_gestures.append(contextual_instance)
             data["gestures"] = selected_gestures
             continue
 
@@ -122,55 +117,13 @@ def select_gestures(gestures_path, audio_dir, emotions_data, min_silence_len=500
         for idx, segment in enumerate(segments):
             total_duration = segment["duration"]
             start_segment = segment["start"]
-            remaining_time = total_duration
-
-            while remaining_time > 0:
-                filtered_duration_gestures = [
-                    gesture for gesture in emotional_gestures
-                    if gesture["duration"] <= remaining_time
-                ]
-
-                if filtered_duration_gestures:
-                    selected_gesture = max(filtered_duration_gestures, key=lambda g: g["duration"])
-                    remaining_time -= selected_gesture["duration"]
-                else:
-                    original_gesture = max(emotional_gestures, key=lambda g: g["duration"])
-                    positions = sorted(original_gesture["frames"].items(), key=lambda x: x[1]["timestamp"])
-                    cut_positions = []
-                    accumulated_duration = 0
-
-                    for i in range(len(positions)):
-                        name_position, position_data = positions[i]
-                        timestamp = position_data["timestamp"]
-
-                        if i + 1 < len(positions):
-                            next_timestamp = positions[i + 1][1]["timestamp"]
-                            position_duration = next_timestamp - timestamp
-                        else:
-                            position_duration = remaining_time - accumulated_duration
-
-                        if accumulated_duration + position_duration > remaining_time:
-                            position_duration = remaining_time - accumulated_duration
-
-                        cut_positions.append((name_position, position_data))
-                        accumulated_duration += position_duration
-
-                        if accumulated_duration >= remaining_time:
-                            break
-
-                    selected_gesture = {
-                        "gesture_id": f"{original_gesture['gesture_id']}_mod",
-                        "labels": original_gesture["labels"],
-                        "duration": accumulated_duration,
-                        "frames": dict(cut_positions)
-                    }
-
-                    remaining_time -= accumulated_duration
-
-                selected_gestures.append(selected_gesture)
-
-            if idx == 0 and contextual_gesture:
-                selected_gestures.append(contextual_gesture)
+
+            # Relleno óptimo (mochila sobre 10 ms, memorizado por emoción y duración)
+            if total_duration > 0:
+                selected_gestures.extend(planner.rellenar(emotion, start_segment, total_duration))
+
+            if idx == 0 and contextual_instance:
+                selected_gestures.append(contextual_instance)
 
         data["gestures"] = selected_gestures
 
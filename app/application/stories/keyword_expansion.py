@@ -0,0 +1,261 @@
+# app/application/stories/keyword_expansion.py
+"""
+Expansión offline de palabras clave (sinónimos y términos relacionados).
+
+En lugar de consultar api.conceptnet.io palabra por palabra, las relaciones
+en español se importan una vez desde un dump de ConceptNet a un SQLite local:
+
+    python -m app.application.stories.keyword_expansion importar conceptnet-assertions-5.7.0.csv.gz
+    python -m app.application.stories.keyword_expansion consultar corazón alegría
+    python -m app.application.stories.keyword_expansion bench
+
+La biblioteca de gestos contextuales agrega las expansiones de cada palabra
+clave al autómata de búsqueda cuando se indexa, así que la oración se sigue
+recorriendo una sola vez. Las consultas se memorizan por palabra clave. Si la
+base aparece o se vuelve a importar, get_expansion_store entrega un store nuevo
+y la biblioteca rehace su índice con él.
+"""
+import argparse
+import gzip
+import json
+import logging
+import os
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+from functools import lru_cache
+from typing import Dict, Iterator, Optional, Sequence, Tuple
+
+from app.application.stories.keyword_matcher import normalizar
+
+log = logging.getLogger(__name__)
+
+EXPANSIONS_DB = "data/conceptnet_es.db"
+MAX_EXPANSIONES = 8
+CACHE_MAX = 4096
+
+# Relación → sentido: "ambos" se guarda en las dos direcciones; "fin" solo fin → inicio
+# (FormOf: "corazones" es forma de "corazón", la palabra clave es el lema)
+RELACIONES: Dict[str, str] = {
+    "Synonym": "ambos",
+    "SimilarTo": "ambos",
+    "RelatedTo": "ambos",
+    "FormOf": "fin",
+}
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS expansion (
+    termino TEXT NOT NULL,      -- normalizado (minúsculas, sin tildes)
+    relacionado TEXT NOT NULL,  -- tal como viene en ConceptNet
+    relacion TEXT NOT NULL,
+    peso REAL NOT NULL,
+    PRIMARY KEY (termino, relacionado)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS meta (clave TEXT PRIMARY KEY, valor TEXT NOT NULL);
+"""
+
+
+class KeywordExpansionStore:
+    """Lectura del SQLite de expansiones; sin archivo, no expande nada."""
+
+    def __init__(self, path: str = EXPANSIONS_DB, max_expansiones: int = MAX_EXPANSIONES,
+                 cache_max: int = CACHE_MAX):
+        self.path = path
+        self.max_expansiones = max_expansiones
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        if os.path.exists(path):
+            self._conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True, check_same_thread=False)
+        else:
+            log.info("Sin base de expansiones en %s: las palabras clave no se expanden", path)
+        self._expandir = lru_cache(maxsize=cache_max)(self._consultar)
+
+    def expandir(self, keyword: str) -> Tuple[str, ...]:
+        """Términos relacionados con `keyword`, de mayor a menor peso."""
+        return self._expandir(keyword)
+
+    def _consultar(self, keyword: str) -> Tuple[str, ...]:
+        if self._conn is None:
+            return ()
+        with self._lock:
+            filas = self._conn.execute(
+                "SELECT relacionado FROM expansion WHERE termino = ? ORDER BY peso DESC, relacionado LIMIT ?",
+                (normalizar(keyword), self.max_expansiones),
+            ).fetchall()
+        return tuple(r for (r,) in filas)
+
+    def __len__(self) -> int:
+        if self._conn is None:
+            return 0
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM expansion").fetchone()[0]
+
+    def cerrar(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+_Firma = Optional[Tuple[int, int, int]]
+_stores: Dict[str, Tuple[_Firma, KeywordExpansionStore]] = {}
+_stores_lock = threading.Lock()
+
+
+def _firma(path: str) -> _Firma:
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return st.st_ino, st.st_mtime_ns, st.st_size
+
+
+def get_expansion_store(path: str = EXPANSIONS_DB) -> KeywordExpansionStore:
+    """
+    Store compartido por proceso (una conexión y un caché por archivo). Se
+    revisa el archivo en cada llamada: si apareció o se reimportó, se abre un
+    store nuevo (el anterior queda para quien lo siga usando).
+    """
+    path = os.path.abspath(path)
+    firma = _firma(path)
+    with _stores_lock:
+        actual = _stores.get(path)
+        if actual is None or actual[0] != firma:
+            actual = _stores[path] = (firma, KeywordExpansionStore(path))
+        return actual[1]
+
+
+# ------------------ Importación ------------------
+def _termino(uri: str) -> str:
+    # /c/es/pan_dulce/n/... → "pan dulce"
+    return uri.split("/")[3].replace("_", " ")
+
+
+def leer_dump(path: str, lang: str = "es",
+              relaciones: Dict[str, str] = RELACIONES) -> Iterator[Tuple[str, str, str, float]]:
+    """(término, relacionado, relación, peso) del dump de aserciones de ConceptNet (CSV con tabs, .gz o no)."""
+    prefijo = f"/c/{lang}/"
+    abrir = gzip.open if path.endswith(".gz") else open
+    with abrir(path, "rt", encoding="utf-8") as f:
+        for linea in f:
+            campos = linea.rstrip("\n").split("\t")
+            if len(campos) < 5 or not campos[2].startswith(prefijo) or not campos[3].startswith(prefijo):
+                continue
+            sentido = relaciones.get(campos[1][3:])  # "/r/Synonym"
+            if sentido is None:
+                continue
+            inicio, fin = _termino(campos[2]), _termino(campos[3])
+            if normalizar(inicio) == normalizar(fin):
+                continue
+            try:
+                info = json.loads(campos[4])
+                peso = float(info.get("weight", 1.0)) if isinstance(info, dict) else 1.0
+            except (TypeError, ValueError):
+                peso = 1.0
+            relacion = campos[1][3:]
+            yield fin, inicio, relacion, peso
+            if sentido == "ambos":
+                yield inicio, fin, relacion, peso
+
+
+def importar(dump: str, db: str = EXPANSIONS_DB, lang: str = "es",
+             relaciones: Sequence[str] = tuple(RELACIONES), min_peso: float = 0.0,
+             lote: int = 10000) -> int:
+    """Arma el SQLite desde el dump (en un archivo temporal que reemplaza al anterior); devuelve las filas."""
+    seleccion = {r: RELACIONES.get(r, "ambos") for r in relaciones}
+    os.makedirs(os.path.dirname(os.path.abspath(db)), exist_ok=True)
+    tmp = f"{db}.tmp"
+    if os.path.exists(tmp):
+        os.unlink(tmp)
+    conn = sqlite3.connect(tmp)
+    try:
+        conn.executescript("PRAGMA journal_mode = OFF; PRAGMA synchronous = OFF;" + _ESQUEMA)
+        sql = ("INSERT INTO expansion VALUES (?, ?, ?, ?) ON CONFLICT (termino, relacionado) "
+               "DO UPDATE SET peso = max(peso, excluded.peso)")
+        filas = []
+        for termino, relacionado, relacion, peso in leer_dump(dump, lang, seleccion):
+            if peso < min_peso:
+                continue
+            filas.append((normalizar(termino), relacionado, relacion, peso))
+            if len(filas) >= lote:
+                conn.executemany(sql, filas)
+                filas.clear()
+        conn.executemany(sql, filas)
+        total = conn.execute("SELECT COUNT(*) FROM expansion").fetchone()[0]
+        conn.executemany("INSERT OR REPLACE INTO meta VALUES (?, ?)", [
+            ("fuente", os.path.basename(dump)), ("lang", lang),
+            ("relaciones", ",".join(seleccion)), ("importado", time.strftime("%Y-%m-%dT%H:%M:%S")),
+        ])
+        conn.commit()
+        conn.execute("VACUUM")
+    finally:
+        conn.close()
+    os.replace(tmp, db)
+    return total
+
+
+# ------------------ CLI ------------------
+def _dump_sintetico(path: str, n: int, seed: int = 0) -> None:
+    rng = random.Random(seed)
+    relaciones = list(RELACIONES)
+    with gzip.open(path, "wt", encoding="utf-8") as f:
+        for i in range(n):
+            a, b = f"palabra{rng.randrange(n // 4)}", f"palabra{rng.randrange(n // 4)}"
+            rel = rng.choice(relaciones)
+            f.write(f"/a/x\t/r/{rel}\t/c/es/{a}/n\t/c/es/{b}\t{json.dumps({'weight': rng.uniform(0.5, 4)})}\n")
+            f.write(f"/a/y\t/r/{rel}\t/c/en/{a}\t/c/es/{b}\t{{}}\n")  # otro idioma: se descarta
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Expansión offline de palabras clave (ConceptNet)")
+    parser.add_argument("--db", default=EXPANSIONS_DB)
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    imp = sub.add_parser("importar", help="Crea la base desde un dump de aserciones de ConceptNet")
+    imp.add_argument("dump", help="conceptnet-assertions-*.csv(.gz)")
+    imp.add_argument("--lang", default="es")
+    imp.add_argument("--relaciones", nargs="+", default=list(RELACIONES))
+    imp.add_argument("--min-peso", type=float, default=1.0)
+    con = sub.add_parser("consultar", help="Muestra las expansiones de cada palabra")
+    con.add_argument("palabras", nargs="+")
+    bench = sub.add_parser("bench", help="Mide consultas sobre una base sintética")
+    bench.add_argument("--aserciones", type=int, default=200000)
+    bench.add_argument("--consultas", type=int, default=20000)
+    bench.add_argument("--keywords", type=int, default=500, help="Palabras clave distintas consultadas")
+    args = parser.parse_args()
+
+    if args.cmd == "importar":
+        t0 = time.perf_counter()
+        total = importar(args.dump, args.db, args.lang, args.relaciones, args.min_peso)
+        print(f"{total} expansiones en {args.db} ({time.perf_counter() - t0:.1f} s)")
+    elif args.cmd == "consultar":
+        store = KeywordExpansionStore(args.db)
+        for palabra in args.palabras:
+            print(f"{palabra}: {', '.join(store.expandir(palabra)) or '-'}")
+    else:
+        with tempfile.TemporaryDirectory() as tmp:
+            dump, db = os.path.join(tmp, "dump.csv.gz"), os.path.join(tmp, "exp.db")
+            _dump_sintetico(dump, args.aserciones)
+            t0 = time.perf_counter()
+            total = importar(dump, db)
+            print(f"importar: {total} expansiones en {time.perf_counter() - t0:.2f} s")
+            rng = random.Random(1)
+            keywords = [f"palabra{rng.randrange(args.aserciones // 4)}" for _ in range(args.keywords)]
+            palabras = [rng.choice(keywords) for _ in range(args.consultas)]
+            store = KeywordExpansionStore(db, cache_max=0)
+            t0 = time.perf_counter()
+            for palabra in palabras:
+                store.expandir(palabra)
+            print(f"  {'sqlite':18s} {(time.perf_counter() - t0) / len(palabras) * 1e6:8.2f} µs/consulta")
+            store.cerrar()
+            store = KeywordExpansionStore(db)
+            for nombre in ("caché (frío)", "caché (caliente)"):
+                t0 = time.perf_counter()
+                for palabra in palabras:
+                    store.expandir(palabra)
+                print(f"  {nombre:18s} {(time.perf_counter() - t0) / len(palabras) * 1e6:8.2f} µs/consulta")
+            store.cerrar()
+
+
+if __name__ == "__main__":
+    main()
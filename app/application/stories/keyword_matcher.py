@@ -0,0 +1,102 @@
+# app/application/stories/keyword_matcher.py
+"""
+Búsqueda de palabras clave (y frases) de los gestos contextuales en una oración.
+
+Autómata Aho–Corasick a nivel de palabra: se arma una vez con todas las
+palabras clave de la biblioteca, ya normalizadas (minúsculas, sin tildes), y
+cada oración se recorre una sola vez. Al trabajar con palabras enteras nunca
+hay coincidencias dentro de otra palabra, y el costo no depende de cuántas
+palabras clave tenga la biblioteca.
+"""
+import re
+import unicodedata
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Tuple
+
+_PALABRA = re.compile(r"\w+")
+
+
+def normalizar(texto: str) -> str:
+    """Minúsculas y sin marcas diacríticas: "Corazón" → "corazon"."""
+    descompuesto = unicodedata.normalize("NFD", texto.casefold())
+    return "".join(c for c in descompuesto if not unicodedata.combining(c))
+
+
+def tokenizar(texto: str) -> List[Tuple[str, int, int]]:
+    """(palabra normalizada, inicio, fin) con posiciones de caracteres en el texto original."""
+    return [(normalizar(m.group()), m.start(), m.end()) for m in _PALABRA.finditer(texto)]
+
+
+@dataclass(frozen=True)
+class KeywordMatch:
+    keyword: str         # tal como está en la biblioteca
+    palabra_inicio: int  # índice de la primera palabra en la oración
+    palabra_fin: int     # índice de la última palabra (inclusive)
+    inicio: int          # posición en caracteres dentro de la oración
+    fin: int
+    payload: Any
+
+    @property
+    def palabras(self) -> int:
+        return self.palabra_fin - self.palabra_inicio + 1
+
+
+class KeywordMatcher:
+    def __init__(self, keywords: Iterable[Tuple[str, Any]]):
+        """keywords: (palabra clave o frase, payload) — el payload vuelve en cada match."""
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[int]] = [[]]
+        self._patrones: List[Tuple[str, int, Any]] = []  # (keyword, n palabras, payload)
+        for keyword, payload in keywords:
+            palabras = [p for p, _, _ in tokenizar(keyword)]
+            if palabras:
+                self._agregar(palabras, len(self._patrones))
+                self._patrones.append((keyword, len(palabras), payload))
+        self._enlazar()
+
+    def __len__(self) -> int:
+        return len(self._patrones)
+
+    def _agregar(self, palabras: List[str], patron: int) -> None:
+        nodo = 0
+        for palabra in palabras:
+            siguiente = self._goto[nodo].get(palabra)
+            if siguiente is None:
+                siguiente = len(self._goto)
+                self._goto[nodo][palabra] = siguiente
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            nodo = siguiente
+        self._out[nodo].append(patron)
+
+    def _enlazar(self) -> None:
+        cola = deque(self._goto[0].values())
+        while cola:
+            nodo = cola.popleft()
+            for palabra, hijo in self._goto[nodo].items():
+                f = self._fail[nodo]
+                while f and palabra not in self._goto[f]:
+                    f = self._fail[f]
+                destino = self._goto[f].get(palabra, 0)
+                self._fail[hijo] = destino if destino != hijo else 0
+                # Las salidas del sufijo más largo también terminan aquí
+                self._out[hijo] = self._out[hijo] + self._out[self._fail[hijo]]
+                cola.append(hijo)
+
+    def buscar(self, texto: str) -> List[KeywordMatch]:
+        """Todas las coincidencias, en orden de la palabra donde terminan."""
+        tokens = tokenizar(texto)
+        matches = []
+        nodo = 0
+        for i, (palabra, _, fin) in enumerate(tokens):
+            while nodo and palabra not in self._goto[nodo]:
+                nodo = self._fail[nodo]
+            nodo = self._goto[nodo].get(palabra, 0)
+            for patron in self._out[nodo]:
+                keyword, n, payload = self._patrones[patron]
+                inicio = i - n + 1
+                matches.append(KeywordMatch(keyword, inicio, i, tokens[inicio][1], fin, payload))
+        return matches
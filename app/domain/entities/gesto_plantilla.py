@@ -0,0 +1,135 @@
+# app/domain/entities/gesto_plantilla.py
+"""
+Gestos de la biblioteca como plantillas inmutables + instancias livianas.
+
+La plantilla se arma una vez al cargar el archivo (tuplas y MappingProxyType,
+no se puede modificar). Seleccionar un gesto para un cuento solo crea una
+GestoInstancia que apunta a la plantilla con su inicio, escala temporal y
+recorte; el dict con los frames se genera recién al serializar.
+"""
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+_CAMPOS = ("gesture_id", "labels", "duration", "frames", "keywords")
+
+
+def _congelar(valor: Any) -> Any:
+    if isinstance(valor, dict):
+        return MappingProxyType({k: _congelar(v) for k, v in valor.items()})
+    if isinstance(valor, list):
+        return tuple(_congelar(v) for v in valor)
+    return valor
+
+
+def _descongelar(valor: Any) -> Any:
+    if isinstance(valor, Mapping):
+        return {k: _descongelar(v) for k, v in valor.items()}
+    if isinstance(valor, tuple):
+        return [_descongelar(v) for v in valor]
+    return valor
+
+
+@dataclass(frozen=True)
+class GestoPlantilla:
+    gesture_id: str
+    labels: Tuple[str, ...]
+    duration: float
+    # (nombre, frame) en el orden del archivo; cada frame trae su "timestamp"
+    frames: Tuple[Tuple[str, Mapping], ...]
+    keywords: Tuple[str, ...] = ()
+    # Índices de `frames` ordenados por timestamp (para recortar)
+    orden: Tuple[int, ...] = ()
+    extra: Mapping = field(default_factory=lambda: MappingProxyType({}))
+    # Claves del archivo en su orden: la salida repite exactamente ese conjunto
+    claves: Tuple[str, ...] = _CAMPOS[:4]
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "GestoPlantilla":
+        frames = tuple((nombre, _congelar(frame)) for nombre, frame in data["frames"].items())
+        return cls(
+            gesture_id=data["gesture_id"],
+            labels=tuple(data.get("labels", ())),
+            duration=data["duration"],
+            frames=frames,
+            keywords=tuple(data.get("keywords", ())),
+            orden=tuple(sorted(range(len(frames)), key=lambda i: frames[i][1]["timestamp"])),
+            extra=_congelar({k: v for k, v in data.items() if k not in _CAMPOS}),
+            claves=tuple(data),
+        )
+
+    def instancia(self, start: float = 0.0, scale: float = 1.0,
+                  duration: Optional[float] = None) -> "GestoInstancia":
+        """Instancia completa, con los timestamps multiplicados por `scale`."""
+        return GestoInstancia(self, start, self.duration * scale if duration is None else duration, scale)
+
+    def recorte(self, start: float, max_duration: float) -> "GestoInstancia":
+        """
+        Las primeras posiciones (por timestamp) que entran en max_duration; la
+        última se estira o acorta hasta completar el tiempo.
+        """
+        acumulado = 0.0
+        n = 0
+        for j, i in enumerate(self.orden):
+            if j + 1 < len(self.orden):
+                duracion = self.frames[self.orden[j + 1]][1]["timestamp"] - self.frames[i][1]["timestamp"]
+            else:
+                duracion = max_duration - acumulado
+            if acumulado + duracion > max_duration:
+                duracion = max_duration - acumulado
+            n += 1
+            acumulado += duracion
+            if acumulado >= max_duration:
+                break
+        return GestoInstancia(self, start, acumulado, 1.0, n, "_mod")
+
+
+@dataclass(frozen=True)
+class GestoInstancia:
+    plantilla: GestoPlantilla
+    start: float
+    duration: float
+    scale: float = 1.0
+    # Si está definido: solo las primeras `hasta` posiciones por timestamp
+    hasta: Optional[int] = None
+    sufijo: str = ""
+
+    @property
+    def gesture_id(self) -> str:
+        return self.plantilla.gesture_id + self.sufijo
+
+    def to_dict(self) -> Dict:
+        """
+        Mismo formato que el gesto en movements.txt antes de las instancias: un
+        gesto completo sale con las claves de su archivo (en el mismo orden) y un
+        recorte solo con gesture_id, labels, duration y frames. `start` no se
+        escribe: el orden de la lista ya marca la secuencia.
+        """
+        p = self.plantilla
+        if self.hasta is None:
+            seleccion = p.frames
+        else:
+            seleccion = [p.frames[i] for i in p.orden[:self.hasta]]
+        frames = {}
+        for nombre, frame in seleccion:
+            frame = _descongelar(frame)
+            if self.scale != 1.0:
+                frame["timestamp"] *= self.scale
+            frames[nombre] = frame
+        valores = {
+            "gesture_id": self.gesture_id,
+            "labels": list(p.labels),
+            "duration": self.duration,
+            "frames": frames,
+            "keywords": list(p.keywords),
+        }
+        if self.hasta is not None:
+            return {k: valores[k] for k in _CAMPOS[:4]}
+        return {k: valores[k] if k in valores else _descongelar(p.extra[k]) for k in p.claves}
+
+
+def serializar_gesto(obj: Any) -> Dict:
+    """`default` para json.dump: las instancias se materializan al escribir."""
+    if isinstance(obj, GestoInstancia):
+        return obj.to_dict()
+    raise TypeError(f"{type(obj).__name__} no es serializable")
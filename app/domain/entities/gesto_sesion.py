@@ -1,6 +1,7 @@
 from dataclasses import dataclass, field
 from datetime import datetime
 from typing import List, Optional, Dict
+import base64
 import uuid
 from app.domain.enums.gesture_type import GestureType
 
@@ -8,7 +9,11 @@ from app.domain.enums.gesture_type import GestureType
 class FrameData:
     timestamp: float
     pose: Dict
-    image_base64: str  # ← OBLIGATORIO para el video
+    image_jpeg: bytes  # ← OBLIGATORIO para el video (JPEG crudo, sin base64)
+
+    @property
+    def image_base64(self) -> str:
+        return base64.b64encode(self.image_jpeg).decode()
 
 @dataclass
 class GestoSesion:
@@ -17,10 +22,13 @@ class GestoSesion:
     emocion: Optional[str] = None
     palabras_clave: List[str] = field(default_factory=list)
     duracion_segundos: float = 5.0
+    perfil_calibracion: Optional[str] = None
 
     frames: List[FrameData] = field(default_factory=list)
     grabando: bool = False
     finalizado: bool = False
     cuenta_regresiva: Optional[int] = None
     inicio_grabacion: Optional[datetime] = None
-    creado_en: datetime = field(default_factory=datetime.utcnow)
\ No newline at end of file
+    creado_en: datetime = field(default_factory=datetime.utcnow)
+    # Frames persistidos; en lecturas solo-metadata `frames` viene vacío y esto no
+    frames_guardados: int = 0
\ No newline at end of file
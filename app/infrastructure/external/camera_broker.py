@@ -0,0 +1,306 @@
+# app/infrastructure/external/camera_broker.py
+"""
+Broker de cámara en memoria compartida.
+
+Un proceso dueño de la cámara publica frames + landmarks en un ring de slots de
+`multiprocessing.shared_memory`; cualquier número de workers de la API o
+sesiones de grabación se suscriben por nombre y leen sin pasar frames por pipes.
+
+    python -m app.infrastructure.external.camera_broker --name loly_cam --source camera --cam 1
+"""
+import argparse
+import logging
+import math
+import multiprocessing as mp
+import os
+import time
+from multiprocessing import resource_tracker, shared_memory
+from typing import Optional
+
+import cv2
+import numpy as np
+
+from app.infrastructure.external.video_capture import NUM_POSE_LANDMARKS, LandmarksFrame
+
+log = logging.getLogger(__name__)
+
+MAGIC = 0x4C4F4C59  # "LOLY"
+VERSION = 1
+# Cabecera: magic, version, capacity, height, width, latest_seq, writer_pid, reservado
+H_MAGIC, H_VERSION, H_CAPACITY, H_HEIGHT, H_WIDTH, H_LATEST, H_PID = range(7)
+HEADER_FIELDS = 8
+
+
+# ------------------ Layout ------------------
+class _RingLayout:
+    """Vistas numpy sobre el bloque compartido. Cada slot usa un seqlock (seq -1 = escribiendo)."""
+
+    def __init__(self, buf, capacity: int, height: int, width: int):
+        offset = 0
+
+        def take(dtype, shape):
+            nonlocal offset
+            arr = np.ndarray(shape, dtype=dtype, buffer=buf, offset=offset)
+            offset += arr.nbytes
+            offset = (offset + 63) // 64 * 64  # alinear a línea de caché
+            return arr
+
+        self.header = take(np.int64, (HEADER_FIELDS,))
+        self.seqs = take(np.int64, (capacity,))
+        self.timestamps = take(np.float64, (capacity,))
+        self.has_pose = take(np.uint8, (capacity,))
+        self.landmarks = take(np.float32, (capacity, NUM_POSE_LANDMARKS, 4))
+        self.images = take(np.uint8, (capacity, height, width, 3))
+        self.nbytes = offset
+
+    @staticmethod
+    def size(capacity: int, height: int, width: int) -> int:
+        parts = [
+            HEADER_FIELDS * 8, capacity * 8, capacity * 8, capacity,
+            capacity * NUM_POSE_LANDMARKS * 4 * 4, capacity * height * width * 3,
+        ]
+        return sum((p + 63) // 64 * 64 for p in parts)
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    # Un suscriptor no es dueño del bloque: no debe quedar en el resource_tracker,
+    # que si no lo borraría al salir el proceso
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)  # Python >= 3.13
+    except TypeError:
+        pass
+    shm = shared_memory.SharedMemory(name=name)
+    if os.name == "posix":
+        # Antes de 3.13 el attach siempre registra: se deshace (sin tocar nada global).
+        # El broker corre en su propio proceso, así que no comparte ese registro
+        resource_tracker.unregister(shm._name, "shared_memory")
+    return shm
+
+
+# ------------------ Fuentes ------------------
+class SyntheticFrameSource:
+    """
+    Fuente sintética para pruebas sin cámara ni MediaPipe: una imagen con un
+    degradado en movimiento y un esqueleto que mueve los brazos en seno.
+    """
+
+    def __init__(self, width: int = 640, height: int = 480, fps: float = 30.0):
+        self.width, self.height, self.fps = width, height, fps
+        self._image = np.zeros((height, width, 3), dtype=np.uint8)
+        self._ramp = np.linspace(0, 255, width, dtype=np.float32)
+        self._landmarks = np.zeros((NUM_POSE_LANDMARKS, 4), dtype=np.float32)
+        self._landmarks[:, 3] = 1.0
+        self._start = time.time()
+        self._next = self._start
+
+    def read(self) -> Optional[LandmarksFrame]:
+        # Respetar el fps como lo haría una cámara
+        delay = self._next - time.time()
+        if delay > 0:
+            time.sleep(delay)
+        self._next = max(self._next + 1.0 / self.fps, time.time())
+        now = time.time()
+        t = now - self._start
+
+        self._image[:, :, 0] = ((self._ramp + t * 60) % 256).astype(np.uint8)
+        self._image[:, :, 1] = 64
+        self._image[:, :, 2] = int(127 + 127 * math.sin(t))
+
+        lm = self._landmarks
+        lm[:, 0], lm[:, 1], lm[:, 2] = 0.5, 0.5, 0.0
+        lm[0, :2] = (0.5 + 0.03 * math.sin(t), 0.25)             # nariz
+        lm[9, :2], lm[10, :2] = (0.48, 0.3), (0.52, 0.3)           # boca
+        lm[11, :2], lm[12, :2] = (0.6, 0.4), (0.4, 0.4)            # hombros
+        lm[15, :2] = (0.75, 0.4 + 0.2 * math.sin(2 * t))           # muñeca izq
+        lm[16, :2] = (0.25, 0.4 + 0.2 * math.cos(2 * t))           # muñeca der
+
+        return LandmarksFrame(
+            raw=self._image,
+            image_size=(self.width, self.height),
+            landmarks=lm,
+            timestamp=now,
+        )
+
+    def release(self) -> None:
+        pass
+
+
+def _build_source(kind: str, cam_index: int, width: int, height: int, fps: float):
+    if kind == "synthetic":
+        return SyntheticFrameSource(width=width, height=height, fps=fps)
+    from app.infrastructure.external.video_capture import VideoCapture
+    return VideoCapture(cam_index=cam_index, reuse_buffers=True)
+
+
+# ------------------ Broker ------------------
+def run_broker(name: str, kind: str = "camera", cam_index: int = 1, width: int = 1280,
+               height: int = 720, fps: float = 30.0, stop_event=None) -> None:
+    """Bucle del broker: lee de la fuente y publica en el bloque `name` (ya creado)."""
+    shm = shared_memory.SharedMemory(name=name)
+    capacity = int(np.ndarray((HEADER_FIELDS,), np.int64, shm.buf)[H_CAPACITY])
+    ring = _RingLayout(shm.buf, capacity, height, width)
+    source = _build_source(kind, cam_index, width, height, fps)
+    ring.header[H_PID] = os.getpid()
+    seq = int(ring.header[H_LATEST])
+    log.info("Broker de cámara '%s' publicando %dx%d (%s)", name, width, height, kind)
+
+    try:
+        while stop_event is None or not stop_event.is_set():
+            frame = source.read()
+            if frame is None:
+                time.sleep(0.01)
+                continue
+
+            seq += 1
+            i = seq % capacity
+            # El slot más viejo se reutiliza siempre: un suscriptor lento no frena al broker,
+            # solo ve su seqlock cambiar y vuelve a leer el último
+            ring.seqs[i] = -1
+            if frame.raw.shape[:2] == (height, width):
+                np.copyto(ring.images[i], frame.raw)
+            else:
+                cv2.resize(frame.raw, (width, height), dst=ring.images[i])
+            ring.timestamps[i] = frame.timestamp or time.time()
+            ring.has_pose[i] = frame.landmarks is not None
+            if frame.landmarks is not None:
+                ring.landmarks[i] = frame.landmarks
+            ring.seqs[i] = seq
+            ring.header[H_LATEST] = seq
+    finally:
+        source.release()
+        del ring
+        shm.close()
+
+
+class CameraBroker:
+    """Crea el bloque compartido y lanza run_broker en un proceso aparte."""
+
+    def __init__(self, name: str, source: str = "camera", cam_index: int = 1,
+                 width: int = 1280, height: int = 720, fps: float = 30.0, capacity: int = 8):
+        self.name = name
+        self.kwargs = dict(kind=source, cam_index=cam_index, width=width, height=height, fps=fps)
+        self.capacity = capacity
+        self.shm: Optional[shared_memory.SharedMemory] = None
+        self._process: Optional[mp.Process] = None
+        self._stop = mp.Event()
+
+    def create(self) -> None:
+        width, height = self.kwargs["width"], self.kwargs["height"]
+        size = _RingLayout.size(self.capacity, height, width)
+        self.shm = shared_memory.SharedMemory(name=self.name, create=True, size=size)
+        ring = _RingLayout(self.shm.buf, self.capacity, height, width)
+        ring.seqs[:] = 0
+        ring.header[:] = (MAGIC, VERSION, self.capacity, height, width, 0, 0, 0)
+        del ring
+
+    def start(self) -> "CameraBroker":
+        if self.shm is None:
+            self.create()
+        self._process = mp.Process(
+            target=run_broker, args=(self.name,), kwargs={**self.kwargs, "stop_event": self._stop},
+            name=f"camera-broker-{self.name}", daemon=True,
+        )
+        self._process.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._process is not None:
+            self._process.join(timeout=2.0)
+            if self._process.is_alive():
+                self._process.terminate()
+        if self.shm is not None:
+            self.shm.close()
+            self.shm.unlink()
+            self.shm = None
+
+
+# ------------------ Suscriptor ------------------
+class CameraSubscriber:
+    """
+    Lector del broker compatible con VideoCapture.read().
+
+    Copia el último slot publicado a un frame propio (una sola copia en memoria,
+    sin serializar) y valida con el seqlock del slot que el broker no lo haya
+    sobrescrito a mitad de la copia. Cada frame devuelto tiene sus propios
+    buffers: el consumidor puede guardarlo.
+    """
+
+    def __init__(self, name: str, draw_landmarks: bool = True, poll_interval: float = 0.002):
+        self.shm = _attach(name)
+        header = np.ndarray((HEADER_FIELDS,), np.int64, self.shm.buf)
+        if header[H_MAGIC] != MAGIC or header[H_VERSION] != VERSION:
+            raise ValueError(f"'{name}' no es un bloque del broker de cámara")
+        capacity, height, width = int(header[H_CAPACITY]), int(header[H_HEIGHT]), int(header[H_WIDTH])
+        self.ring = _RingLayout(self.shm.buf, capacity, height, width)
+        self.draw_landmarks = draw_landmarks
+        self.poll_interval = poll_interval
+        self._last_seq = 0
+        self.torn_reads = 0
+
+    def read(self, timeout: float = 1.0) -> Optional[LandmarksFrame]:
+        ring = self.ring
+        capacity = len(ring.seqs)
+        deadline = time.time() + timeout
+        while True:
+            seq = int(ring.header[H_LATEST])
+            if seq > self._last_seq:
+                i = seq % capacity
+                if int(ring.seqs[i]) == seq:
+                    image = ring.images[i].copy()
+                    has_pose = bool(ring.has_pose[i])
+                    landmarks = ring.landmarks[i].copy() if has_pose else None
+                    timestamp = float(ring.timestamps[i])
+                    if int(ring.seqs[i]) == seq:
+                        self._last_seq = seq
+                        return LandmarksFrame(
+                            raw=image,
+                            image_size=image.shape[:2][::-1],
+                            landmarks=landmarks,
+                            timestamp=timestamp,
+                            draw_landmarks=self.draw_landmarks,
+                        )
+                # Lectura rota (el broker escribía el slot): se reintenta, dentro del mismo timeout
+                self.torn_reads += 1
+                if time.time() >= deadline:
+                    return None
+                continue
+            if time.time() >= deadline:
+                return None
+            time.sleep(self.poll_interval)
+
+    def release(self) -> None:
+        if self.shm is not None:
+            del self.ring
+            self.shm.close()
+            self.shm = None
+
+    def __del__(self):
+        self.release()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Broker de cámara en memoria compartida")
+    parser.add_argument("--name", default="loly_cam")
+    parser.add_argument("--source", choices=["camera", "synthetic"], default="camera")
+    parser.add_argument("--cam", type=int, default=1)
+    parser.add_argument("--width", type=int, default=1280)
+    parser.add_argument("--height", type=int, default=720)
+    parser.add_argument("--fps", type=float, default=30.0)
+    parser.add_argument("--capacity", type=int, default=8)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s | %(name)s | %(levelname)s | %(message)s")
+    broker = CameraBroker(args.name, source=args.source, cam_index=args.cam, width=args.width,
+                          height=args.height, fps=args.fps, capacity=args.capacity)
+    broker.create()
+    try:
+        run_broker(args.name, **broker.kwargs)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        broker.stop()
+
+
+if __name__ == "__main__":
+    main()
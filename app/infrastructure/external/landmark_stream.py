@@ -0,0 +1,254 @@
+# app/infrastructure/external/landmark_stream.py
+"""
+Formato binario para grabar y reproducir streams de landmarks sin cámara.
+
+Layout (little endian, cada bloque alineado a 64 bytes):
+
+    cabecera (64 B)  magic, versión, n_frames, offset del índice, ancho, alto, fps
+    datos            JPEGs concatenados (opcionales)
+    índice           timestamps f8[N] | has_pose u1[N] | landmarks f4[N, 33, 4] | jpeg_offsets u8[N + 1]
+
+El índice va al final para poder escribir en streaming; al leer, el archivo se
+mapea con mmap y los arrays son vistas sobre él, así que abrir una captura larga
+no carga nada en memoria.
+
+    python -m app.infrastructure.external.landmark_stream record captura.lmk --seconds 10 --jpeg-quality 80
+    python -m app.infrastructure.external.landmark_stream info captura.lmk
+"""
+import argparse
+import mmap
+import struct
+import time
+from typing import List, Optional
+
+import cv2
+import numpy as np
+
+from app.infrastructure.external.video_capture import NUM_POSE_LANDMARKS, LandmarksFrame
+
+MAGIC = b"LOLYLMK1"
+VERSION = 1
+HEADER = struct.Struct("<8sIIQQIId")  # magic, version, flags, n_frames, index_offset, width, height, fps
+HEADER_SIZE = 64
+ALIGN = 64
+
+
+def _align(n: int) -> int:
+    return (n + ALIGN - 1) // ALIGN * ALIGN
+
+
+# ------------------ Escritura ------------------
+class LandmarkStreamWriter:
+    """Escribe frames uno a uno; el índice se vuelca en close()."""
+
+    def __init__(self, path: str, width: int, height: int, fps: float = 30.0):
+        self.path = path
+        self.width, self.height, self.fps = width, height, fps
+        self._f = open(path, "wb")
+        self._f.write(b"\0" * HEADER_SIZE)
+        self._timestamps: List[float] = []
+        self._has_pose: List[bool] = []
+        self._landmarks: List[np.ndarray] = []
+        self._offsets: List[int] = [HEADER_SIZE]
+        self._empty = np.full((NUM_POSE_LANDMARKS, 4), np.nan, dtype=np.float32)
+
+    def write(self, timestamp: float, landmarks: Optional[np.ndarray], jpeg: Optional[bytes] = None) -> None:
+        self._timestamps.append(timestamp)
+        self._has_pose.append(landmarks is not None)
+        self._landmarks.append(self._empty if landmarks is None else np.array(landmarks, dtype=np.float32))
+        if jpeg:
+            self._f.write(jpeg)
+        self._offsets.append(self._f.tell())
+
+    def write_frame(self, frame: LandmarksFrame, jpeg_quality: Optional[int] = None) -> None:
+        jpeg = None
+        if jpeg_quality is not None:
+            ok, buf = cv2.imencode(".jpg", frame.raw, [cv2.IMWRITE_JPEG_QUALITY, jpeg_quality])
+            jpeg = buf.tobytes() if ok else None
+        self.write(frame.timestamp or time.time(), frame.landmarks, jpeg)
+
+    def close(self) -> None:
+        if self._f.closed:
+            return
+        f = self._f
+        n = len(self._timestamps)
+        index_offset = _align(f.tell())
+        f.write(b"\0" * (index_offset - f.tell()))
+        for arr in (
+            np.asarray(self._timestamps, dtype="<f8"),
+            np.asarray(self._has_pose, dtype=np.uint8),
+            np.stack(self._landmarks).astype("<f4") if n else np.empty((0, NUM_POSE_LANDMARKS, 4), "<f4"),
+            np.asarray(self._offsets, dtype="<u8"),
+        ):
+            f.write(arr.tobytes())
+            f.write(b"\0" * (_align(f.tell()) - f.tell()))
+        f.seek(0)
+        f.write(HEADER.pack(MAGIC, VERSION, 0, n, index_offset, self.width, self.height, self.fps))
+        f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# ------------------ Lectura ------------------
+class LandmarkStream:
+    """Captura grabada, mapeada en memoria."""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            magic, version, _, n, index_offset, width, height, fps = HEADER.unpack(f.read(HEADER.size))
+            if magic != MAGIC or version != VERSION:
+                raise ValueError(f"{path} no es una captura de landmarks válida")
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.width, self.height, self.fps = width, height, fps
+        self.n_frames = n
+
+        offset = index_offset
+
+        def take(dtype, shape):
+            nonlocal offset
+            arr = np.ndarray(shape, dtype=dtype, buffer=self._mm, offset=offset)
+            offset = _align(offset + arr.nbytes)
+            return arr
+
+        self.timestamps = take("<f8", (n,))
+        self.has_pose = take(np.uint8, (n,))
+        self.landmarks = take("<f4", (n, NUM_POSE_LANDMARKS, 4))
+        self.jpeg_offsets = take("<u8", (n + 1,))
+
+    def __len__(self) -> int:
+        return self.n_frames
+
+    def jpeg(self, i: int) -> Optional[bytes]:
+        start, end = int(self.jpeg_offsets[i]), int(self.jpeg_offsets[i + 1])
+        return self._mm[start:end] if end > start else None
+
+    def close(self) -> None:
+        for name in ("timestamps", "has_pose", "landmarks", "jpeg_offsets"):
+            self.__dict__.pop(name, None)
+        try:
+            self._mm.close()
+        except BufferError:
+            # Algún LandmarksFrame todavía apunta a los landmarks; el mmap se libera con él
+            pass
+
+
+# ------------------ Reproducción ------------------
+class ReplayCapture:
+    """
+    Fuente compatible con VideoCapture.read() a partir de una captura grabada.
+
+    realtime=True respeta los tiempos originales; realtime=False entrega frames
+    tan rápido como se pidan (para perfilar mapper, filtros y GestureRecorder).
+    Los timestamps se re-basan al reloj actual, igual que los de una cámara.
+    """
+
+    def __init__(self, path: str, realtime: bool = True, loop: bool = False, draw_landmarks: bool = True):
+        self.stream = LandmarkStream(path)
+        self.realtime = realtime
+        self.loop = loop
+        self.draw_landmarks = draw_landmarks
+        self._image = np.zeros((self.stream.height, self.stream.width, 3), dtype=np.uint8)
+        self._blank = True
+        self._i = 0
+        self._t0_wall: Optional[float] = None
+        self._t0_stream = 0.0
+
+    def read(self) -> Optional[LandmarksFrame]:
+        s = self.stream
+        if self._i >= len(s):
+            if not self.loop or not len(s):
+                return None
+            self._i = 0
+            self._t0_wall = None
+        i = self._i
+        self._i += 1
+
+        if self._t0_wall is None:
+            self._t0_wall, self._t0_stream = time.time(), float(s.timestamps[0])
+        timestamp = self._t0_wall + (float(s.timestamps[i]) - self._t0_stream)
+        if self.realtime:
+            delay = timestamp - time.time()
+            if delay > 0:
+                time.sleep(delay)
+
+        jpeg = s.jpeg(i)
+        if jpeg is not None:
+            decoded = cv2.imdecode(np.frombuffer(jpeg, np.uint8), cv2.IMREAD_COLOR)
+            if decoded is not None:
+                if decoded.shape == self._image.shape:
+                    np.copyto(self._image, decoded)
+                else:
+                    self._image = decoded
+                self._blank = False
+        elif not self._blank:
+            self._image[:] = 0
+            self._blank = True
+
+        return LandmarksFrame(
+            raw=self._image,
+            image_size=self._image.shape[:2][::-1],
+            landmarks=s.landmarks[i] if s.has_pose[i] else None,
+            timestamp=timestamp,
+            draw_landmarks=self.draw_landmarks,
+        )
+
+    def release(self) -> None:
+        self.stream.close()
+
+
+# ------------------ CLI ------------------
+def _record(args) -> None:
+    from app.infrastructure.external.video_capture import VideoCapture
+
+    capture = VideoCapture(cam_index=args.cam, reuse_buffers=True)
+    writer = None
+    end = time.time() + args.seconds
+    try:
+        while time.time() < end:
+            frame = capture.read()
+            if frame is None:
+                continue
+            if writer is None:
+                w, h = frame.image_size
+                writer = LandmarkStreamWriter(args.path, w, h, args.fps)
+            writer.write_frame(frame, args.jpeg_quality)
+    finally:
+        capture.release()
+        if writer is not None:
+            writer.close()
+
+
+def _info(args) -> None:
+    s = LandmarkStream(args.path)
+    n = len(s)
+    span = float(s.timestamps[-1] - s.timestamps[0]) if n > 1 else 0.0
+    with_jpeg = int(np.count_nonzero(np.diff(s.jpeg_offsets.astype(np.int64))))
+    print(f"{args.path}: {n} frames, {s.width}x{s.height}, {span:.2f}s "
+          f"({n / span if span else 0:.1f} fps), pose en {int(s.has_pose.sum())}, jpeg en {with_jpeg}")
+    s.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Grabar / inspeccionar capturas de landmarks")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    rec = sub.add_parser("record")
+    rec.add_argument("path")
+    rec.add_argument("--cam", type=int, default=1)
+    rec.add_argument("--seconds", type=float, default=10.0)
+    rec.add_argument("--fps", type=float, default=30.0)
+    rec.add_argument("--jpeg-quality", type=int, default=None)
+    rec.set_defaults(func=_record)
+    info = sub.add_parser("info")
+    info.add_argument("path")
+    info.set_defaults(func=_info)
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+# app/infrastructure/external/pose_inference.py
+import logging
+import time
+from typing import Dict, Optional, Tuple
+
+import cv2
+import mediapipe as mp
+import numpy as np
+
+log = logging.getLogger(__name__)
+
+mp_pose = mp.solutions.pose
+
+
+def build_pose(model_complexity: int = 1):
+    return mp_pose.Pose(
+        model_complexity=model_complexity,
+        enable_segmentation=False,
+        min_detection_confidence=0.5,
+        min_tracking_confidence=0.5
+    )
+
+def fill_landmarks(out: np.ndarray, landmark_list) -> np.ndarray:
+    """Copia los landmarks de MediaPipe a un array (33, 4) ya reservado."""
+    out.reshape(-1)[:] = [v for lm in landmark_list.landmark for v in (lm.x, lm.y, lm.z, lm.visibility)]
+    return out
+
+
+# ------------------ Inferencia fija ------------------
+class PoseEstimator:
+    """Frame completo, complejidad fija: el comportamiento original de VideoCapture."""
+
+    def __init__(self, model_complexity: int = 1, pose=None):
+        self.pose = pose if pose is not None else build_pose(model_complexity)
+        self._rgb: Optional[np.ndarray] = None
+        self.last_latency = 0.0
+
+    def process(self, frame_bgr: np.ndarray, out: np.ndarray) -> bool:
+        """Corre la pose sobre frame_bgr; llena `out` (33, 4) y devuelve si hubo detección."""
+        t0 = time.perf_counter()
+        self._rgb = cv2.cvtColor(frame_bgr, cv2.COLOR_BGR2RGB, dst=self._rgb)
+        result = self.pose.process(self._rgb)
+        self.last_latency = time.perf_counter() - t0
+        if not result.pose_landmarks:
+            return False
+        fill_landmarks(out, result.pose_landmarks)
+        return True
+
+
+# ------------------ Inferencia adaptativa ------------------
+class AdaptivePoseEstimator:
+    """
+    Inferencia pensada para equipos sin GPU:
+
+    - Reduce la imagen a `inference_width` antes de pasarla a MediaPipe.
+    - La ROI la sigue el propio grafo de MediaPipe (static_image_mode=False):
+      recorta alrededor de los landmarks del frame anterior y solo corre el
+      detector cuando pierde a la persona. Siempre recibe el frame completo,
+      así el tracker nunca mezcla sistemas de coordenadas distintos.
+    - Mide la latencia por frame (EWMA) y ajusta model_complexity para
+      respetar el presupuesto de `target_fps` (sin contar la carga del modelo
+      ni su primer frame, que trae el warm-up). Tras bajar de nivel, ese nivel
+      queda como techo durante `ceiling_cooldown` segundos y después se puede
+      volver a probar (un pico pasajero no degrada el modelo para siempre).
+
+    Los landmarks se devuelven normalizados al frame completo.
+    """
+
+    def __init__(self, inference_width: int = 640, target_fps: float = 30.0,
+                 initial_complexity: int = 1, min_complexity: int = 0, max_complexity: int = 2,
+                 budget_fraction: float = 0.8, cooldown_frames: int = 30,
+                 ceiling_cooldown: float = 60.0, pose_factory=build_pose):
+        self.inference_width = inference_width
+        self.budget = budget_fraction / target_fps
+        self.min_complexity = min_complexity
+        self.max_complexity = max_complexity
+        self.complexity = initial_complexity
+        self.cooldown_frames = cooldown_frames
+        self.ceiling_cooldown = ceiling_cooldown
+        self._pose_factory = pose_factory
+        self._models: Dict[int, object] = {}
+
+        self._small: Optional[np.ndarray] = None
+        self._rgb: Optional[np.ndarray] = None
+        self._frames_since_switch = 0
+        # Techo temporal tras una bajada: (nivel, monotonic hasta el que rige)
+        self._ceiling: Optional[Tuple[int, float]] = None
+        self.latency_ewma: Optional[float] = None
+        self.last_latency = 0.0
+
+    def _model(self):
+        if self.complexity not in self._models:
+            log.info("Cargando modelo de pose con complejidad %d", self.complexity)
+            self._models[self.complexity] = self._pose_factory(self.complexity)
+        return self._models[self.complexity]
+
+    def _ceiling_now(self) -> int:
+        if self._ceiling is not None and time.monotonic() < self._ceiling[1]:
+            return min(self._ceiling[0], self.max_complexity)
+        self._ceiling = None
+        return self.max_complexity
+
+    def _adapt(self, latency: float) -> None:
+        self._frames_since_switch += 1
+        if self._frames_since_switch == 1:
+            # Primer frame del modelo: incluye el warm-up del grafo, no representa la latencia
+            return
+        a = 0.1
+        self.latency_ewma = latency if self.latency_ewma is None else (1 - a) * self.latency_ewma + a * latency
+        if self._frames_since_switch < self.cooldown_frames:
+            return
+        if self.latency_ewma > self.budget and self.complexity > self.min_complexity:
+            self._switch(self.complexity - 1)
+        elif self.latency_ewma < 0.5 * self.budget and self.complexity < self._ceiling_now():
+            self._switch(self.complexity + 1)
+
+    def _switch(self, complexity: int) -> None:
+        if complexity < self.complexity:
+            # No volver a subir enseguida a un nivel que no cumplió el presupuesto
+            self._ceiling = (complexity, time.monotonic() + self.ceiling_cooldown)
+        self._set_complexity(complexity)
+
+    def _set_complexity(self, complexity: int) -> None:
+        log.info("Pose: complejidad %d → %d (latencia media %.1f ms, presupuesto %.1f ms)",
+                 self.complexity, complexity, self.latency_ewma * 1000, self.budget * 1000)
+        self.complexity = complexity
+        self._frames_since_switch = 0
+        self.latency_ewma = None
+
+    def process(self, frame_bgr: np.ndarray, out: np.ndarray) -> bool:
+        # Construir el grafo (tras un cambio de complejidad) no cuenta como latencia de inferencia
+        model = self._model()
+        t0 = time.perf_counter()
+        h, w = frame_bgr.shape[:2]
+        image = frame_bgr
+        if w > self.inference_width:
+            size = (self.inference_width, max(1, round(h * self.inference_width / w)))
+            # Mismo tamaño en todos los frames: dst se reutiliza
+            self._small = cv2.resize(frame_bgr, size, dst=self._small, interpolation=cv2.INTER_AREA)
+            image = self._small
+        self._rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB, dst=self._rgb)
+
+        result = model.process(self._rgb)
+        found = bool(result.pose_landmarks)
+        if found:
+            fill_landmarks(out, result.pose_landmarks)
+
+        self.last_latency = time.perf_counter() - t0
+        self._adapt(self.last_latency)
+        return found
@@ -0,0 +1,203 @@
+# app/infrastructure/external/threaded_capture.py
+import logging
+import threading
+import time
+from typing import List, Optional
+
+import cv2
+import numpy as np
+
+from app.infrastructure.external.pose_inference import PoseEstimator
+from app.infrastructure.external.video_capture import NUM_POSE_LANDMARKS, LandmarksFrame
+
+log = logging.getLogger(__name__)
+
+# Estados de un slot del ring
+FREE, GRABBING, PENDING, INFERRING, READY = range(5)
+
+
+class FrameSlot:
+    """Buffers reutilizables de un frame: imagen BGR y landmarks (33, 4)."""
+
+    def __init__(self, index: int):
+        self.index = index
+        self.state = FREE
+        self.seq = 0
+        self.timestamp = 0.0
+        self.image: Optional[np.ndarray] = None
+        self.landmarks = np.empty((NUM_POSE_LANDMARKS, 4), dtype=np.float32)
+        self.has_pose = False
+        # Lectores copiando el slot: el grabber no lo recicla mientras sea > 0
+        self.readers = 0
+
+    def to_frame(self, draw_landmarks: bool = True) -> LandmarksFrame:
+        """Frame con buffers propios (copias): sigue válido aunque el slot se recicle."""
+        return LandmarksFrame(
+            raw=self.image.copy(),
+            image_size=self.image.shape[:2][::-1],
+            landmarks=self.landmarks.copy() if self.has_pose else None,
+            timestamp=self.timestamp,
+            draw_landmarks=draw_landmarks,
+        )
+
+
+class FrameRing:
+    """
+    Ring acotado de slots preasignados.
+
+    El productor siempre obtiene un slot libre o el READY más antiguo (nunca el
+    último publicado ni uno que se está leyendo), así que la memoria no crece y
+    los frames viejos se descartan en lugar de encolarse. wait_newer() marca el
+    slot como en lectura hasta done(): el consumidor copia lo que necesita y lo
+    suelta, nunca se queda con una referencia al slot.
+    """
+
+    def __init__(self, capacity: int = 4):
+        # grab + pendiente + inferencia + último publicado ocupan 4 slots
+        if capacity < 4:
+            raise ValueError("El ring necesita al menos 4 slots")
+        self.slots: List[FrameSlot] = [FrameSlot(i) for i in range(capacity)]
+        self.cond = threading.Condition()
+        self._seq = 0
+        self._latest: Optional[FrameSlot] = None
+
+    def _candidates(self) -> List[FrameSlot]:
+        candidates = [s for s in self.slots if s.state == FREE and not s.readers]
+        if not candidates:
+            candidates = [s for s in self.slots
+                          if s.state == READY and s is not self._latest and not s.readers]
+        return candidates
+
+    def acquire(self) -> FrameSlot:
+        with self.cond:
+            # Solo espera si un lector retiene el único slot reciclable (dura lo que una copia)
+            candidates = self._candidates()
+            while not candidates:
+                self.cond.wait()
+                candidates = self._candidates()
+            slot = min(candidates, key=lambda s: s.seq)
+            slot.state = GRABBING
+            return slot
+
+    def release(self, slot: FrameSlot) -> None:
+        with self.cond:
+            slot.state = FREE
+            self.cond.notify_all()  # acquire() puede estar esperando un slot
+
+    def publish(self, slot: FrameSlot) -> None:
+        with self.cond:
+            self._seq += 1
+            slot.seq = self._seq
+            slot.state = READY
+            self._latest = slot
+            self.cond.notify_all()
+
+    def wait_newer(self, seq: int, timeout: Optional[float] = None) -> Optional[FrameSlot]:
+        """
+        Devuelve el último slot publicado con seq > `seq` (marcado en lectura:
+        llamar a done() después de copiarlo), o None si vence el timeout.
+        """
+        with self.cond:
+            ok = self.cond.wait_for(
+                lambda: self._latest is not None and self._latest.seq > seq, timeout
+            )
+            if not ok:
+                return None
+            self._latest.readers += 1
+            return self._latest
+
+    def done(self, slot: FrameSlot) -> None:
+        with self.cond:
+            slot.readers -= 1
+            self.cond.notify_all()
+
+
+class ThreadedVideoCapture:
+    """
+    Captura desacoplada compatible con VideoCapture.read().
+
+    - Un hilo grabber lee la cámara sin parar y deja siempre el frame más nuevo.
+    - Un hilo de inferencia corre MediaPipe sobre ese frame; si llega otro antes
+      de que termine, el anterior se descarta (no se encola).
+    - read() devuelve el último frame procesado que el consumidor aún no vio,
+      copiado a buffers propios (el consumidor puede guardarlo o pasarlo a otro
+      hilo sin que el grabber lo pise).
+
+    El timestamp de cada frame es el del grab, no el del final del procesamiento.
+    """
+
+    def __init__(self, cam_index: int = 1, draw_landmarks: bool = True,
+                 capacity: int = 4, cap=None, estimator=None):
+        self.cap = cap if cap is not None else cv2.VideoCapture(cam_index)
+        self.estimator = estimator or PoseEstimator()
+        self.draw_landmarks = draw_landmarks
+        self.ring = FrameRing(capacity)
+
+        self.dropped = 0
+        self._pending: Optional[FrameSlot] = None
+        self._pending_cond = threading.Condition()
+        self._last_seq = 0
+        self._running = True
+        self._grabber = threading.Thread(target=self._grab_loop, name="capture-grabber", daemon=True)
+        self._worker = threading.Thread(target=self._inference_loop, name="capture-inference", daemon=True)
+        self._grabber.start()
+        self._worker.start()
+
+    # ------------------ Hilos ------------------
+    def _grab_loop(self) -> None:
+        while self._running:
+            slot = self.ring.acquire()
+            if not self.cap.grab():
+                self.ring.release(slot)
+                time.sleep(0.01)
+                continue
+            slot.timestamp = time.time()
+            ok, image = self.cap.retrieve(slot.image)
+            if not ok:
+                self.ring.release(slot)
+                continue
+            slot.image = image
+
+            with self._pending_cond:
+                if self._pending is not None:
+                    # La inferencia no alcanzó a tomarlo: se descarta el más viejo
+                    self.ring.release(self._pending)
+                    self.dropped += 1
+                slot.state = PENDING
+                self._pending = slot
+                self._pending_cond.notify()
+
+    def _inference_loop(self) -> None:
+        while self._running:
+            with self._pending_cond:
+                if not self._pending_cond.wait_for(lambda: self._pending is not None, timeout=0.5):
+                    continue
+                slot = self._pending
+                self._pending = None
+                slot.state = INFERRING
+
+            try:
+                slot.has_pose = self.estimator.process(slot.image, slot.landmarks)
+            except Exception:
+                log.exception("Error en la inferencia de pose")
+                self.ring.release(slot)
+                continue
+
+            self.ring.publish(slot)
+
+    # ------------------ API ------------------
+    def read(self, timeout: float = 1.0) -> Optional[LandmarksFrame]:
+        slot = self.ring.wait_newer(self._last_seq, timeout)
+        if slot is None:
+            return None
+        try:
+            self._last_seq = slot.seq
+            return slot.to_frame(self.draw_landmarks)
+        finally:
+            self.ring.done(slot)
+
+    def release(self) -> None:
+        self._running = False
+        self._grabber.join(timeout=1.0)
+        self._worker.join(timeout=1.0)
+        self.cap.release()
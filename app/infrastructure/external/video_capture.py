@@ -1,59 +1,114 @@
-from dataclasses import dataclass
-from typing import Dict, Optional, Tuple
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+import time
 import cv2
 import mediapipe as mp
+import numpy as np
+from app.infrastructure.external.pose_inference import PoseEstimator
 
 mp_pose = mp.solutions.pose
 mp_face = mp.solutions.face_mesh
 mp_drawing = mp.solutions.drawing_utils
 mp_drawing_styles = mp.solutions.drawing_styles
 
+NUM_POSE_LANDMARKS = 33
+POSE_CONNECTIONS = tuple(mp_pose.POSE_CONNECTIONS)
+
+def draw_landmarks_array(image: np.ndarray, landmarks: np.ndarray, min_visibility: float = 0.5) -> np.ndarray:
+    """Dibuja el esqueleto desde el array (33, 4) sobre una imagen de cualquier resolución."""
+    h, w = image.shape[:2]
+    pts = (landmarks[:, :2] * (w, h)).astype(np.int32).tolist()
+    vis = (landmarks[:, 3] >= min_visibility).tolist()
+    for a, b in POSE_CONNECTIONS:
+        if vis[a] and vis[b]:
+            cv2.line(image, pts[a], pts[b], (224, 224, 224), 2)
+    for p, v in zip(pts, vis):
+        if v:
+            cv2.circle(image, p, 3, (0, 0, 255), -1)
+    return image
+
 @dataclass
 class LandmarksFrame:
     raw: any                                      # frame original BGR
-    annotated: any = None                         # ← NUEVO: frame con landmarks dibujados
     image_size: Tuple[int, int] = (0, 0)
-    pose_landmarks: Optional[Dict[int, Tuple[float, float, float]]] = None
+    landmarks: Optional[np.ndarray] = None        # (33, 4) float32: x, y, z, visibility
     face_landmarks: Optional[Dict[int, Tuple[float, float, float]]] = None
+    timestamp: Optional[float] = None             # time.time() del momento de captura
+    draw_landmarks: bool = True
+    _annotated: Optional[np.ndarray] = field(default=None, repr=False)
+
+    @property
+    def annotated(self) -> np.ndarray:
+        """Frame completo con landmarks; se dibuja solo si alguien lo pide."""
+        if self._annotated is None:
+            self._annotated = self.raw.copy()
+            if self.draw_landmarks and self.landmarks is not None:
+                draw_landmarks_array(self._annotated, self.landmarks)
+        return self._annotated
+
+    def render_preview(self, size: Tuple[int, int] = (640, 480), out: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Reduce el frame a `size` (en `out` si se pasa, sin reservar memoria) y dibuja
+        los landmarks sobre la imagen chica en vez de sobre la de resolución completa.
+        """
+        preview = cv2.resize(self.raw, size, dst=out, interpolation=cv2.INTER_AREA)
+        if self.draw_landmarks and self.landmarks is not None:
+            draw_landmarks_array(preview, self.landmarks)
+        return preview
+
+    @property
+    def pose_landmarks(self) -> Optional[Dict[int, Tuple[float, float, float]]]:
+        """Vista dict {i: (x, y, z)} para código antiguo; se construye bajo demanda."""
+        if self.landmarks is None:
+            return None
+        return {i: (float(x), float(y), float(z)) for i, (x, y, z, _) in enumerate(self.landmarks)}
 
 class VideoCapture:
-    def __init__(self, cam_index: int = 1, draw_landmarks: bool = True):  # ← ahora por defecto True
+    """
+    Captura síncrona: cámara + MediaPipe en el hilo que llama a read().
+
+    Con reuse_buffers=True la imagen y los landmarks se leen sobre un pool fijo de
+    buffers (sin reservar memoria por frame); cada LandmarksFrame es válido hasta
+    que su buffer vuelve a usarse, `pool_size` lecturas después.
+    """
+
+    def __init__(self, cam_index: int = 1, draw_landmarks: bool = True,  # ← ahora por defecto True
+                 reuse_buffers: bool = False, pool_size: int = 3, estimator=None):
         self.cap = cv2.VideoCapture(cam_index)
         self.draw_landmarks = draw_landmarks
-        self.pose = mp_pose.Pose(
-            model_complexity=1,
-            enable_segmentation=False,
-            min_detection_confidence=0.5,
-            min_tracking_confidence=0.5
-        )
+        self.reuse_buffers = reuse_buffers
+        n = pool_size if reuse_buffers else 1
+        self._images: List[Optional[np.ndarray]] = [None] * n
+        # Buffers reutilizados: los landmarks de un frame son válidos hasta que se recicla su slot
+        self._landmarks = [np.empty((NUM_POSE_LANDMARKS, 4), dtype=np.float32) for _ in range(n)]
+        self._next = 0
+        # PoseEstimator (frame completo) o AdaptivePoseEstimator (resolución + complejidad automática)
+        self.estimator = estimator or PoseEstimator()
 
     def read(self) -> Optional[LandmarksFrame]:
-        ok, frame_bgr = self.cap.read()
+        i = self._next
+        self._next = (i + 1) % len(self._landmarks)
+
+        ok, frame_bgr = self.cap.read(self._images[i]) if self.reuse_buffers else self.cap.read()
         if not ok:
             return None
+        captured_at = time.time()
+        if self.reuse_buffers:
+            self._images[i] = frame_bgr
 
-        rgb = cv2.cvtColor(frame_bgr, cv2.COLOR_BGR2RGB)
-        pose_result = self.pose.process(rgb)
-
-        # Convertir landmarks a dict
-        pose_dict = None
-        if pose_result.pose_landmarks:
-            pose_dict = {i: (lm.x, lm.y, lm.z) for i, lm in enumerate(pose_result.pose_landmarks.landmark)}
-
-        # Frame anotado (con landmarks)
-        annotated = frame_bgr.copy()
-        if self.draw_landmarks and pose_result.pose_landmarks:
-            mp_drawing.draw_landmarks(
-                annotated,
-                pose_result.pose_landmarks,
-                mp_pose.POSE_CONNECTIONS,
-                landmark_drawing_spec=mp_drawing_styles.get_default_pose_landmarks_style()
-            )
+        found = self.estimator.process(frame_bgr, self._landmarks[i])
+        landmarks = self._landmarks[i] if found else None
 
+        # cap.read() ya entrega un array propio (o del pool): no hace falta copiarlo,
+        # y el frame anotado solo se dibuja si alguien lo usa
         return LandmarksFrame(
-            raw=frame_bgr.copy(),
-            annotated=annotated,           # ← este es el que usamos en el stream
+            raw=frame_bgr,
             image_size=frame_bgr.shape[:2][::-1],
-            pose_landmarks=pose_dict,
-            face_landmarks=None
-        )
\ No newline at end of file
+            landmarks=landmarks,
+            face_landmarks=None,
+            timestamp=captured_at,
+            draw_landmarks=self.draw_landmarks,
+        )
+
+    def release(self) -> None:
+        self.cap.release()
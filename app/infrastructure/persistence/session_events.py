@@ -0,0 +1,163 @@
+# app/infrastructure/persistence/session_events.py
+"""
+Eventos de estado de una sesión de grabación (countdown, grabando, frames,
+finished, preview...), publicados por el grabador y consumidos por el endpoint
+SSE sin tocar el store de sesiones.
+
+El grabador publica desde hilos de trabajo; los suscriptores son corrutinas
+del event loop de la API.
+"""
+import asyncio
+import json
+import threading
+from abc import ABC, abstractmethod
+from collections import defaultdict
+from typing import AsyncIterator, Dict, Set
+
+# Tras este evento la sesión ya no existe
+EVENTO_FIN = "eliminada"
+# Después de cualquiera de estos no llega nada más útil: la suscripción termina
+# (no queda una conexión / pubsub abierto por cliente indefinidamente). "finished"
+# no está: detrás suele venir "preview"; la espera la acota EventosSesion.
+EVENTOS_TERMINALES = frozenset({"preview", EVENTO_FIN})
+
+
+class Suscripcion(ABC):
+    """Flujo asíncrono de eventos {"type": ..., "data": ...} de una sesión."""
+
+    async def iniciar(self) -> None:
+        """Deja la suscripción activa; los eventos publicados desde aquí no se pierden."""
+
+    @abstractmethod
+    def __aiter__(self) -> AsyncIterator[dict]:
+        ...
+
+    @abstractmethod
+    async def cerrar(self) -> None:
+        ...
+
+
+class SessionEventBus(ABC):
+    @abstractmethod
+    def publicar(self, sesion_id: str, evento: dict) -> None:
+        """Thread-safe; nunca bloquea al que publica."""
+
+    @abstractmethod
+    def suscribir(self, sesion_id: str) -> Suscripcion:
+        """Debe llamarse desde el event loop que va a consumir los eventos."""
+
+
+# ------------------ En proceso ------------------
+class _MemorySuscripcion(Suscripcion):
+    def __init__(self, bus: "MemoryEventBus", sesion_id: str, max_pendientes: int):
+        self.bus = bus
+        self.sesion_id = sesion_id
+        self.loop = asyncio.get_running_loop()
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_pendientes)
+        self.descartados = 0
+
+    def entregar(self, evento: dict) -> None:
+        self.loop.call_soon_threadsafe(self._put, evento)
+
+    def _put(self, evento: dict) -> None:
+        # Cliente lento: se pierde el evento más viejo, nunca se frena al grabador
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.descartados += 1
+        self.queue.put_nowait(evento)
+
+    async def __aiter__(self):
+        while True:
+            evento = await self.queue.get()
+            yield evento
+            if evento.get("type") in EVENTOS_TERMINALES:
+                return
+
+    async def cerrar(self) -> None:
+        self.bus._quitar(self)
+
+
+class MemoryEventBus(SessionEventBus):
+    def __init__(self, max_pendientes: int = 64):
+        self.max_pendientes = max_pendientes
+        self._subs: Dict[str, Set[_MemorySuscripcion]] = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def publicar(self, sesion_id: str, evento: dict) -> None:
+        with self._lock:
+            subs = list(self._subs.get(sesion_id, ()))
+        for sub in subs:
+            try:
+                sub.entregar(evento)
+            except RuntimeError:
+                pass  # su event loop ya cerró
+
+    def suscribir(self, sesion_id: str) -> Suscripcion:
+        sub = _MemorySuscripcion(self, sesion_id, self.max_pendientes)
+        with self._lock:
+            self._subs[sesion_id].add(sub)
+        return sub
+
+    def _quitar(self, sub: _MemorySuscripcion) -> None:
+        with self._lock:
+            subs = self._subs.get(sub.sesion_id)
+            if subs is not None:
+                subs.discard(sub)
+                if not subs:
+                    del self._subs[sub.sesion_id]
+
+
+# ------------------ Redis ------------------
+class _RedisSuscripcion(Suscripcion):
+    def __init__(self, client, canal: str):
+        self.client = client
+        self.canal = canal
+        self.pubsub = client.pubsub(ignore_subscribe_messages=True)
+
+    async def iniciar(self) -> None:
+        await self.pubsub.subscribe(self.canal)
+
+    async def __aiter__(self):
+        while True:
+            msg = await self.pubsub.get_message(timeout=1.0)
+            if msg is None:
+                continue
+            evento = json.loads(msg["data"])
+            yield evento
+            if evento.get("type") in EVENTOS_TERMINALES:
+                return
+
+    async def cerrar(self) -> None:
+        await self.pubsub.aclose()
+
+
+class RedisEventBus(SessionEventBus):
+    """Pub/sub de Redis: el grabador y el cliente SSE pueden estar en workers distintos."""
+
+    def __init__(self, url: str):
+        import redis
+
+        self.redis = redis.from_url(url)
+        self._url = url
+        self._async_client = None
+
+    def _canal(self, sesion_id: str) -> str:
+        return f"gesto_sesion:{sesion_id}:eventos"
+
+    def publicar(self, sesion_id: str, evento: dict) -> None:
+        self.redis.publish(self._canal(sesion_id), json.dumps(evento))
+
+    def suscribir(self, sesion_id: str) -> Suscripcion:
+        import redis.asyncio
+
+        if self._async_client is None:
+            self._async_client = redis.asyncio.from_url(self._url)
+        return _RedisSuscripcion(self._async_client, self._canal(sesion_id))
+
+
+def build_event_bus(kind: str, redis_url: str) -> SessionEventBus:
+    if kind == "memory":
+        return MemoryEventBus()
+    if kind == "redis":
+        return RedisEventBus(redis_url)
+    raise ValueError(f"SESSION_EVENTS desconocido: {kind!r} (se esperaba 'redis' o 'memory')")
@@ -0,0 +1,283 @@
+# app/infrastructure/persistence/session_store.py
+"""
+Almacenamiento de sesiones de grabación de gestos.
+
+- RedisSessionStore: compartido entre workers/procesos (metadata en hash,
+  frames en listas append-only, todo con el mismo TTL).
+- MemorySessionStore: dentro del proceso, sin red ni serialización; para
+  instalaciones de una sola máquina y un solo worker.
+"""
+import json
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass, field, replace
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+from app.domain.entities.gesto_sesion import FrameData, GestoSesion
+from app.domain.enums.gesture_type import GestureType
+from app.infrastructure.video.pose_codec import decode_pose_frame, encode_pose_frame
+
+SESION_TTL = timedelta(minutes=30)
+
+
+class SessionStore(ABC):
+    @abstractmethod
+    def crear(self, sesion: GestoSesion) -> None:
+        """Escribe la sesión completa, reemplazando metadata y frames."""
+
+    @abstractmethod
+    def guardar_estado(self, sesion: GestoSesion) -> None:
+        """Actualiza solo la metadata (flags, cuenta regresiva...); no toca los frames."""
+
+    @abstractmethod
+    def agregar_frame(self, sesion_id: str, frame: FrameData) -> None:
+        """Agrega un frame al final; costo constante."""
+
+    @abstractmethod
+    def obtener_estado(self, sesion_id: str) -> Optional[GestoSesion]:
+        """Solo metadata: `frames` vacío y `frames_guardados` con el conteo."""
+
+    @abstractmethod
+    def obtener(self, sesion_id: str) -> Optional[GestoSesion]:
+        """Sesión completa con sus frames."""
+
+    @abstractmethod
+    def eliminar(self, sesion_id: str) -> None:
+        ...
+
+
+# ------------------ Redis ------------------
+class RedisSessionStore(SessionStore):
+    """
+    Tres claves por sesión que comparten TTL:
+
+        gesto_sesion:{id}         hash con la metadata (cada campo en JSON) + n_frames
+        gesto_sesion:{id}:frames  lista de poses, 15 bytes por frame (pose_codec)
+        gesto_sesion:{id}:images  lista de JPEG crudos, alineada con :frames
+
+    Agregar un frame es un RPUSH + HINCRBY + EXPIRE en un pipeline: el costo no
+    depende de cuántos frames lleve la grabación. obtener_estado() lee solo el
+    hash, para consultas de estado durante la grabación.
+    """
+
+    def __init__(self, url: str, ttl: timedelta = SESION_TTL):
+        import redis
+
+        self.redis = redis.from_url(url)
+        self.ttl = ttl
+
+    def _key(self, sid): return f"gesto_sesion:{sid}"
+    def _frames_key(self, sid): return f"gesto_sesion:{sid}:frames"
+    def _images_key(self, sid): return f"gesto_sesion:{sid}:images"
+
+    def _metadata(self, sesion: GestoSesion) -> dict:
+        data = {
+            "id": sesion.id,
+            "tipo": sesion.tipo.value,
+            "emocion": sesion.emocion,
+            "palabras_clave": sesion.palabras_clave,
+            "duracion_segundos": sesion.duracion_segundos,
+            "perfil_calibracion": sesion.perfil_calibracion,
+            "grabando": sesion.grabando,
+            "finalizado": sesion.finalizado,
+            "cuenta_regresiva": sesion.cuenta_regresiva,
+            "inicio_grabacion": sesion.inicio_grabacion.isoformat() if sesion.inicio_grabacion else None,
+            "creado_en": sesion.creado_en.isoformat(),
+        }
+        return {k: json.dumps(v) for k, v in data.items()}
+
+    def _expire(self, pipe, sid) -> None:
+        pipe.expire(self._key(sid), self.ttl)
+        pipe.expire(self._frames_key(sid), self.ttl)
+        pipe.expire(self._images_key(sid), self.ttl)
+
+    def crear(self, sesion: GestoSesion) -> None:
+        sid = sesion.id
+        pipe = self.redis.pipeline()
+        pipe.delete(self._key(sid), self._frames_key(sid), self._images_key(sid))
+        pipe.hset(self._key(sid), mapping={**self._metadata(sesion), "n_frames": len(sesion.frames)})
+        if sesion.frames:
+            pipe.rpush(self._frames_key(sid), *(encode_pose_frame(f.timestamp, f.pose) for f in sesion.frames))
+            pipe.rpush(self._images_key(sid), *(f.image_jpeg for f in sesion.frames))
+        self._expire(pipe, sid)
+        pipe.execute()
+
+    def guardar_estado(self, sesion: GestoSesion) -> None:
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.hset(self._key(sesion.id), mapping=self._metadata(sesion))
+        self._expire(pipe, sesion.id)
+        pipe.execute()
+
+    def agregar_frame(self, sesion_id: str, frame: FrameData) -> None:
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.rpush(self._frames_key(sesion_id), encode_pose_frame(frame.timestamp, frame.pose))
+        pipe.rpush(self._images_key(sesion_id), frame.image_jpeg)
+        pipe.hincrby(self._key(sesion_id), "n_frames", 1)
+        self._expire(pipe, sesion_id)
+        pipe.execute()
+
+    @staticmethod
+    def _sesion(raw: dict, frames: list) -> GestoSesion:
+        n_frames = int(raw.pop(b"n_frames", 0))
+        data = {k.decode(): json.loads(v) for k, v in raw.items()}
+        return GestoSesion(
+            id=data["id"],
+            tipo=GestureType(data["tipo"]),
+            emocion=data["emocion"],
+            palabras_clave=data["palabras_clave"],
+            duracion_segundos=data["duracion_segundos"],
+            perfil_calibracion=data.get("perfil_calibracion"),
+            frames=frames,
+            grabando=data["grabando"],
+            finalizado=data["finalizado"],
+            cuenta_regresiva=data["cuenta_regresiva"],
+            inicio_grabacion=datetime.fromisoformat(data["inicio_grabacion"]) if data["inicio_grabacion"] else None,
+            creado_en=datetime.fromisoformat(data["creado_en"].replace("Z", "+00:00")),
+            frames_guardados=n_frames,
+        )
+
+    def obtener_estado(self, sesion_id: str) -> Optional[GestoSesion]:
+        raw = self.redis.hgetall(self._key(sesion_id))
+        if not raw: return None
+        return self._sesion(raw, [])
+
+    def obtener(self, sesion_id: str) -> Optional[GestoSesion]:
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.hgetall(self._key(sesion_id))
+        pipe.lrange(self._frames_key(sesion_id), 0, -1)
+        pipe.lrange(self._images_key(sesion_id), 0, -1)
+        raw, raw_frames, images = pipe.execute()
+        if not raw: return None
+
+        frames = []
+        for entry, image in zip(raw_frames, images):
+            timestamp, pose = decode_pose_frame(entry)
+            frames.append(FrameData(timestamp=timestamp, pose=pose, image_jpeg=image))
+        return self._sesion(raw, frames)
+
+    def eliminar(self, sesion_id: str) -> None:
+        self.redis.delete(self._key(sesion_id), self._frames_key(sesion_id), self._images_key(sesion_id))
+
+
+# ------------------ En proceso ------------------
+@dataclass
+class _Entrada:
+    sesion: GestoSesion               # metadata; sus frames viven en `frames`
+    frames: List[FrameData] = field(default_factory=list)
+    bytes: int = 0                    # tamaño aproximado (imágenes) para el tope de memoria
+    expira: float = 0.0
+
+
+class MemorySessionStore(SessionStore):
+    """
+    Sesiones en un dict del proceso, con TTL (renovado en cada escritura, como
+    el EXPIRE de Redis) y desalojo LRU por cantidad de sesiones y por bytes de
+    imagen. Los frames se guardan como objetos: no hay serialización.
+
+    Solo sirve con un único worker: otro proceso no ve estas sesiones.
+    """
+
+    def __init__(self, ttl: timedelta = SESION_TTL, max_sesiones: int = 64,
+                 max_bytes: int = 256 * 1024 * 1024):
+        self.ttl = ttl.total_seconds()
+        self.max_sesiones = max_sesiones
+        self.max_bytes = max_bytes
+        self._entradas: "OrderedDict[str, _Entrada]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    # --- internos (con el lock tomado) ---
+    def _vigente(self, sesion_id: str, now: float) -> Optional[_Entrada]:
+        entrada = self._entradas.get(sesion_id)
+        if entrada is None:
+            return None
+        if entrada.expira <= now:
+            self._quitar(sesion_id)
+            return None
+        self._entradas.move_to_end(sesion_id)
+        return entrada
+
+    def _quitar(self, sesion_id: str) -> None:
+        entrada = self._entradas.pop(sesion_id, None)
+        if entrada is not None:
+            self._bytes -= entrada.bytes
+
+    def _desalojar(self, now: float) -> None:
+        for sid in [sid for sid, e in self._entradas.items() if e.expira <= now]:
+            self._quitar(sid)
+        # La sesión recién escrita es la más reciente: nunca se desaloja a sí misma
+        while len(self._entradas) > 1 and (
+            len(self._entradas) > self.max_sesiones or self._bytes > self.max_bytes
+        ):
+            self._quitar(next(iter(self._entradas)))
+
+    # --- API ---
+    def crear(self, sesion: GestoSesion) -> None:
+        now = time.monotonic()
+        frames = list(sesion.frames)
+        with self._lock:
+            self._quitar(sesion.id)
+            entrada = _Entrada(
+                sesion=replace(sesion, frames=[]),
+                frames=frames,
+                bytes=sum(len(f.image_jpeg) for f in frames),
+                expira=now + self.ttl,
+            )
+            self._entradas[sesion.id] = entrada
+            self._bytes += entrada.bytes
+            self._desalojar(now)
+
+    def guardar_estado(self, sesion: GestoSesion) -> None:
+        now = time.monotonic()
+        with self._lock:
+            entrada = self._vigente(sesion.id, now)
+            if entrada is None:
+                # Igual que HSET en Redis: si no existía, queda creada sin frames
+                self._entradas[sesion.id] = entrada = _Entrada(sesion=sesion)
+            entrada.sesion = replace(sesion, frames=[])
+            entrada.expira = now + self.ttl
+
+    def agregar_frame(self, sesion_id: str, frame: FrameData) -> None:
+        now = time.monotonic()
+        with self._lock:
+            entrada = self._vigente(sesion_id, now)
+            if entrada is None:
+                return
+            entrada.frames.append(frame)
+            entrada.bytes += len(frame.image_jpeg)
+            self._bytes += len(frame.image_jpeg)
+            entrada.expira = now + self.ttl
+            if self._bytes > self.max_bytes:
+                self._desalojar(now)
+
+    def obtener_estado(self, sesion_id: str) -> Optional[GestoSesion]:
+        with self._lock:
+            entrada = self._vigente(sesion_id, time.monotonic())
+            if entrada is None:
+                return None
+            return replace(entrada.sesion, frames_guardados=len(entrada.frames))
+
+    def obtener(self, sesion_id: str) -> Optional[GestoSesion]:
+        with self._lock:
+            entrada = self._vigente(sesion_id, time.monotonic())
+            if entrada is None:
+                return None
+            # Copia de la lista (no de los frames): quien la reciba puede mutarla sin tocar el store
+            frames = list(entrada.frames)
+            return replace(entrada.sesion, frames=frames, frames_guardados=len(frames))
+
+    def eliminar(self, sesion_id: str) -> None:
+        with self._lock:
+            self._quitar(sesion_id)
+
+
+def build_session_store(kind: str, redis_url: str, ttl: timedelta = SESION_TTL,
+                        max_sesiones: int = 64, max_mb: int = 256) -> SessionStore:
+    if kind == "memory":
+        return MemorySessionStore(ttl=ttl, max_sesiones=max_sesiones, max_bytes=max_mb * 1024 * 1024)
+    if kind == "redis":
+        return RedisSessionStore(redis_url, ttl=ttl)
+    raise ValueError(f"SESSION_STORE desconocido: {kind!r} (se esperaba 'redis' o 'memory')")
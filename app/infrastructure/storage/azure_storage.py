@@ -1,11 +1,17 @@
 # src/infrastructure/storage/azure_storage.py
-from azure.storage.blob import BlobServiceClient
+from azure.storage.blob import BlobBlock, BlobSasPermissions, BlobServiceClient, ContentSettings, generate_blob_sas
 from config.settings import settings
 from app.infrastructure.storage.enums.container import Container
 from app.domain.enums.gesture_type import GestureType
+import base64
 import uuid
+from datetime import datetime, timedelta, timezone
+from urllib.parse import quote
 
-from typing import Optional, List, Dict
+from typing import BinaryIO, Optional, List, Dict, Union
+
+# Bloques de la subida por partes: memoria acotada para archivos grandes (videos)
+BLOCK_SIZE = 4 * 1024 * 1024
 
 class AzureStorageService:
     def __init__(self, connection_string: str = settings.AZURE_STORAGE_CONNECTION_STRING):
@@ -28,18 +34,65 @@ class AzureStorageService:
         self,
         data: bytes,
         filename: str,
-        tipo: GestureType
+        tipo: GestureType,
+        metadata: Optional[Dict[str, str]] = None
     ) -> str:
         prefijo = f"{tipo.value}/"
-        return self._subir(Container.GESTOS, data, f"{prefijo}{filename}")
+        return self._subir(Container.GESTOS, data, f"{prefijo}{filename}", metadata)
+
+    # === SUBIR TEMPORAL (previews, URL con SAS de lectura que expira) ===
+    def subir_temporal(
+        self,
+        data: Union[bytes, BinaryIO],
+        filename: str,
+        expires_in_hours: float = 1,
+        content_type: Optional[str] = None
+    ) -> str:
+        blob_name = f"preview/{filename}"
+        url = self._subir(Container.GESTOS, data, blob_name, content_type=content_type)
+        account_key = getattr(self.blob_service_client.credential, "account_key", None)
+        if not account_key:
+            return url
+        sas = generate_blob_sas(
+            account_name=self.blob_service_client.account_name,
+            container_name=Container.GESTOS.value,
+            blob_name=blob_name,
+            account_key=account_key,
+            permission=BlobSasPermissions(read=True),
+            expiry=datetime.now(timezone.utc) + timedelta(hours=expires_in_hours),
+        )
+        return f"{url}?{sas}"
 
     # === MÉTODO PRIVADO GENÉRICO ===
-    def _subir(self, container: Container, data: bytes, blob_name: str) -> str:
+    def _subir(self, container: Container, data: Union[bytes, BinaryIO], blob_name: str,
+               metadata: Optional[Dict[str, str]] = None, content_type: Optional[str] = None) -> str:
         client = self._get_container_client(container)
         blob_client = client.get_blob_client(blob_name)
-        blob_client.upload_blob(data, overwrite=True)
+        # La metadata de Azure viaja en headers HTTP: solo ASCII
+        if metadata:
+            metadata = {k: quote(v, safe=" ,") for k, v in metadata.items() if v}
+        content_settings = ContentSettings(content_type=content_type) if content_type else None
+        if isinstance(data, (bytes, bytearray)):
+            blob_client.upload_blob(data, overwrite=True, metadata=metadata or None,
+                                    content_settings=content_settings)
+        else:
+            self._subir_por_bloques(blob_client, data, metadata, content_settings)
         return blob_client.url
 
+    @staticmethod
+    def _subir_por_bloques(blob_client, stream: BinaryIO, metadata: Optional[Dict[str, str]],
+                           content_settings: Optional[ContentSettings]) -> None:
+        """Sube un archivo abierto de a BLOCK_SIZE (stage_block + commit) sin leerlo entero."""
+        bloques = []
+        while True:
+            chunk = stream.read(BLOCK_SIZE)
+            if not chunk:
+                break
+            block_id = base64.b64encode(f"{len(bloques):08d}".encode()).decode()
+            blob_client.stage_block(block_id, chunk)
+            bloques.append(BlobBlock(block_id=block_id))
+        blob_client.commit_block_list(bloques, metadata=metadata or None, content_settings=content_settings)
+
     # === LISTAR GESTOS POR TIPO ===
     def listar_gestos_por_tipo(self, tipo: GestureType) -> List[Dict]:
         container_client = self._get_container_client(Container.GESTOS)
@@ -0,0 +1,163 @@
+# app/infrastructure/video/calibration.py
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+# ------------------ Tablas de calibración por defecto ------------------
+CAL_TABLES = {
+    "pitch": [(39.0,0), (47.0,50), (57.0,100)],          # plano ZY
+    "yaw":   [(-18.0,0), (0.0,50), (18.0,100)],         # plano XZ
+    "roll":  [(83.0,0), (90.0,50), (97.0,100)],          # plano XY (ojo: si cambias método recalibra)
+    "AL_v":  [(114.0,0), (90.0,50), (70.0,100)],         # XY
+    "AL_h":  [(70.0,0), (90.0,50), (114.0,100)],         # ZX
+    "AR_v":  [(-114.0,0), (-90.0,50), (-70.0,100)],      # XY
+    "AR_h":  [(-70.0,0), (-90.0,50), (-114.0,100)],      # ZX
+}
+
+DEFAULT_PROFILE_NAME = "default"
+
+
+# ------------------ Tabla compilada ------------------
+class CompiledTable:
+    """
+    Tabla (ángulo, valor) ordenada una sola vez al cargar.
+    lookup / lookup_batch dan exactamente el mismo resultado que interp_lookup.
+    """
+
+    def __init__(self, table: List[Tuple[float, int]]):
+        table = sorted(((float(a), int(v)) for a, v in table), key=lambda p: p[0])
+        self.points: Tuple[Tuple[float, int], ...] = tuple(table)
+        self._xs = [a for a, _ in table]
+        self._ys = [v for _, v in table]
+        self.xs = np.array(self._xs, dtype=float)
+        self.ys = np.array(self._ys, dtype=float)
+        self.xs.flags.writeable = False
+        self.ys.flags.writeable = False
+
+    def lookup(self, angle: float) -> int:
+        xs, ys = self._xs, self._ys
+        if not xs:
+            return 50
+        if angle <= xs[0]:
+            return ys[0]
+        if angle >= xs[-1]:
+            return ys[-1]
+        # Primer tramo (a1, a2] que contiene el ángulo
+        j = bisect_left(xs, angle) - 1
+        if j < 0 or j + 1 >= len(xs):  # NaN
+            return ys[-1]
+        a1, a2 = xs[j], xs[j + 1]
+        v1, v2 = ys[j], ys[j + 1]
+        t = (angle - a1) / (a2 - a1)
+        return int(round(v1 + t*(v2 - v1)))
+
+    def lookup_batch(self, angles: np.ndarray) -> np.ndarray:
+        xs, ys = self.xs, self.ys
+        if not len(xs):
+            return np.full(angles.shape, 50.0)
+
+        j = np.clip(np.searchsorted(xs, angles, side="left") - 1, 0, max(len(xs) - 2, 0))
+        k = np.minimum(j + 1, len(xs) - 1)
+        a1 = xs[j]; v1 = ys[j]
+        a2 = xs[k]; v2 = ys[k]
+        span = np.where(a2 == a1, 1.0, a2 - a1)
+        out = np.rint(v1 + ((angles - a1) / span) * (v2 - v1))
+
+        out = np.where(angles <= xs[0], ys[0], out)
+        out = np.where(angles >= xs[-1], ys[-1], out)
+        # NaN no cae en ningún tramo: interp_lookup devuelve el último valor
+        return np.where(np.isnan(angles), ys[-1], out)
+
+
+# ------------------ Perfiles ------------------
+@dataclass(frozen=True)
+class CalibrationProfile:
+    name: str
+    tables: Dict[str, CompiledTable]
+
+    @classmethod
+    def from_tables(cls, name: str, tables: Dict[str, list], base: Optional[Dict[str, list]] = None) -> "CalibrationProfile":
+        """Compila un perfil. Los canales que falten se toman de `base` (CAL_TABLES por defecto)."""
+        merged = dict(base if base is not None else CAL_TABLES)
+        merged.update(tables)
+        unknown = set(merged) - set(CAL_TABLES)
+        if unknown:
+            raise ValueError(f"Canales de calibración desconocidos en '{name}': {sorted(unknown)}")
+        return cls(name=name, tables={ch: CompiledTable(t) for ch, t in merged.items()})
+
+    def __getitem__(self, channel: str) -> CompiledTable:
+        return self.tables[channel]
+
+
+DEFAULT_PROFILE = CalibrationProfile.from_tables(DEFAULT_PROFILE_NAME, CAL_TABLES)
+
+
+class CalibrationRegistry:
+    """
+    Perfiles de calibración por robot, cargados desde un JSON:
+
+        {"profiles": {"loly_01": {"pitch": [[39, 0], [47, 50], [57, 100]], ...}}}
+
+    El archivo se vuelve a leer cuando cambia su mtime (revisado como mucho cada
+    `check_interval` segundos), así que se puede recalibrar sin reiniciar la API.
+    """
+
+    def __init__(self, path: Optional[str] = None, default_name: str = DEFAULT_PROFILE_NAME,
+                 check_interval: float = 2.0):
+        self.path = path
+        self.default_name = default_name
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._profiles: Dict[str, CalibrationProfile] = {DEFAULT_PROFILE_NAME: DEFAULT_PROFILE}
+        self._mtime: Optional[float] = None
+        self._last_check = 0.0
+        if path:
+            self.reload()
+
+    def reload(self) -> None:
+        """Relee el archivo y reemplaza todos los perfiles de una vez."""
+        with self._lock:
+            self._last_check = time.monotonic()
+            if not self.path or not os.path.exists(self.path):
+                self._mtime = None
+                return
+            mtime = os.path.getmtime(self.path)
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+
+            profiles = {DEFAULT_PROFILE_NAME: DEFAULT_PROFILE}
+            for name, tables in data.get("profiles", {}).items():
+                profiles[name] = CalibrationProfile.from_tables(
+                    name, {ch: [tuple(p) for p in t] for ch, t in tables.items()}
+                )
+            self._profiles = profiles
+            self._mtime = mtime
+
+    def _refresh_if_stale(self) -> None:
+        if not self.path or time.monotonic() - self._last_check < self.check_interval:
+            return
+        self._last_check = time.monotonic()
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError:
+            return
+        if mtime != self._mtime:
+            self.reload()
+
+    def get(self, name: Optional[str] = None) -> CalibrationProfile:
+        self._refresh_if_stale()
+        profiles = self._profiles
+        name = name or self.default_name
+        if name not in profiles:
+            raise KeyError(f"Perfil de calibración '{name}' no existe")
+        return profiles[name]
+
+    def names(self) -> List[str]:
+        self._refresh_if_stale()
+        return sorted(self._profiles)
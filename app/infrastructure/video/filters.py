@@ -0,0 +1,201 @@
+# app/infrastructure/video/filters.py
+import math
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from app.infrastructure.video.keyframes import descomprimir_gesto
+from app.infrastructure.video.mapper import SERVO_CHANNELS, pose_to_servo_row, servo_row_to_pose
+
+# ------------------ Configuración ------------------
+# Tipos de filtro por canal
+NONE, EMA, ONE_EURO, KALMAN = 0, 1, 2, 3
+FILTER_TYPES = {"none": NONE, "ema": EMA, "one_euro": ONE_EURO, "kalman": KALMAN}
+
+# Parámetros en unidades de servo (0..100) y segundos
+DEFAULT_CHANNEL_CONFIG = {
+    "type": "one_euro",
+    "alpha": 0.5,         # ema
+    "min_cutoff": 1.5,    # one_euro (Hz)
+    "beta": 0.05,         # one_euro
+    "d_cutoff": 1.0,      # one_euro (Hz)
+    "q": 50.0,            # kalman: ruido de proceso (aceleración)
+    "r": 4.0,             # kalman: ruido de medida (servo²)
+    "hysteresis": 1.5,    # deadzone con histéresis, en unidades de servo
+}
+
+DEFAULT_FILTER_CONFIG: Dict[str, dict] = {
+    "default": DEFAULT_CHANNEL_CONFIG,
+}
+
+# Sin suavizado ni deadzone: la salida es la fila del mapper tal cual
+SIN_FILTRO: Dict[str, dict] = {"default": {"type": "none", "hysteresis": 0.0}}
+
+FALLBACK_DT = 1.0 / 30.0
+
+
+def config_por_tipo(tipo: str) -> Dict[str, dict]:
+    """Config con el mismo filtro en los 7 canales ("none" = SIN_FILTRO)."""
+    if tipo == "none":
+        return SIN_FILTRO
+    if tipo not in FILTER_TYPES:
+        raise ValueError(f"Tipo de filtro desconocido: {tipo!r} (se esperaba uno de {sorted(FILTER_TYPES)})")
+    return {"default": {"type": tipo}}
+
+
+def _smoothing_factor(dt: float, cutoff: np.ndarray) -> np.ndarray:
+    r = 2.0 * math.pi * cutoff * dt
+    return r / (r + 1.0)
+
+
+# ------------------ Banco de filtros ------------------
+class ServoFilterBank:
+    """
+    Filtro temporal en streaming para los 7 canales de servo (orden SERVO_CHANNELS).
+
+    Cada canal tiene su propio tipo (none / ema / one_euro / kalman) y una deadzone
+    con histéresis: la salida solo se mueve cuando el valor filtrado se aleja más de
+    `hysteresis` unidades del último valor enviado. Todo el estado vive en arrays
+    preasignados y cada update es O(1).
+
+    config: {"default": {...}, "pitch": {...}, ...}; los canales sin entrada usan "default".
+    """
+
+    def __init__(self, config: Optional[Dict[str, dict]] = None):
+        config = config or DEFAULT_FILTER_CONFIG
+        base = {**DEFAULT_CHANNEL_CONFIG, **config.get("default", {})}
+        unknown = set(config) - set(SERVO_CHANNELS) - {"default"}
+        if unknown:
+            raise ValueError(f"Canales de filtro desconocidos: {sorted(unknown)}")
+
+        n = len(SERVO_CHANNELS)
+        per_channel = [{**base, **config.get(ch, {})} for ch in SERVO_CHANNELS]
+        try:
+            self._type = np.array([FILTER_TYPES[c["type"]] for c in per_channel])
+        except KeyError as e:
+            raise ValueError(f"Tipo de filtro desconocido: {e}") from None
+        self._is_ema = self._type == EMA
+        self._is_euro = self._type == ONE_EURO
+        self._is_kalman = self._type == KALMAN
+
+        def param(name):
+            return np.array([float(c[name]) for c in per_channel])
+
+        self._alpha = param("alpha")
+        self._min_cutoff = param("min_cutoff")
+        self._beta = param("beta")
+        self._d_cutoff = param("d_cutoff")
+        self._q = param("q")
+        self._r = param("r")
+        self._hysteresis = param("hysteresis")
+
+        # Estado
+        self._x = np.zeros(n)        # última salida filtrada (ema / one_euro)
+        self._dx = np.zeros(n)       # derivada filtrada (one_euro)
+        self._kx = np.zeros(n)       # kalman: posición
+        self._kv = np.zeros(n)       # kalman: velocidad
+        self._p00 = np.zeros(n)      # kalman: covarianza
+        self._p01 = np.zeros(n)
+        self._p11 = np.zeros(n)
+        self._held = np.zeros(n)     # salida con histéresis
+        self._z = np.zeros(n)
+        self._out = np.zeros(n, dtype=np.uint8)
+        self._t: Optional[float] = None
+
+    def reset(self) -> None:
+        self._t = None
+
+    def update(self, values, t: float) -> np.ndarray:
+        """Filtra una fila de 7 servos capturada en el instante t (segundos)."""
+        z = self._z
+        z[:] = values
+
+        if self._t is None:
+            self._x[:] = z
+            self._dx[:] = 0.0
+            self._kx[:] = z
+            self._kv[:] = 0.0
+            self._p00[:] = self._r
+            self._p01[:] = 0.0
+            self._p11[:] = self._q
+            self._held[:] = z
+            self._t = t
+            np.clip(np.rint(z), 0, 255, out=z)
+            self._out[:] = z
+            return self._out
+
+        dt = t - self._t
+        if dt <= 0:
+            dt = FALLBACK_DT
+        self._t = t
+
+        # Exponencial
+        ema = self._x + self._alpha * (z - self._x)
+
+        # One-Euro
+        dx = (z - self._x) / dt
+        dx_hat = self._dx + _smoothing_factor(dt, self._d_cutoff) * (dx - self._dx)
+        cutoff = self._min_cutoff + self._beta * np.abs(dx_hat)
+        euro = self._x + _smoothing_factor(dt, cutoff) * (z - self._x)
+        self._dx[:] = dx_hat
+
+        # Kalman de velocidad constante (predicción + corrección)
+        kx = self._kx + dt * self._kv
+        q = self._q
+        p00 = self._p00 + dt * (2 * self._p01 + dt * self._p11) + q * dt**3 / 3
+        p01 = self._p01 + dt * self._p11 + q * dt**2 / 2
+        p11 = self._p11 + q * dt
+        s = p00 + self._r
+        k0 = p00 / s
+        k1 = p01 / s
+        innov = z - kx
+        self._kx[:] = kx + k0 * innov
+        self._kv += k1 * innov
+        self._p00[:] = (1 - k0) * p00
+        self._p01[:] = (1 - k0) * p01
+        self._p11[:] = p11 - k1 * p01
+
+        filtered = self._x
+        filtered[:] = z
+        np.copyto(filtered, ema, where=self._is_ema)
+        np.copyto(filtered, euro, where=self._is_euro)
+        np.copyto(filtered, self._kx, where=self._is_kalman)
+
+        # Deadzone con histéresis
+        move = np.abs(filtered - self._held) >= self._hysteresis
+        np.copyto(self._held, filtered, where=move)
+
+        np.clip(np.rint(self._held), 0, 255, out=z)
+        self._out[:] = z
+        return self._out
+
+    # ------------------ Helpers ------------------
+    def filter_pose(self, pose: Dict, t: float) -> Dict:
+        """Igual que update pero sobre el dict de to_loly_pose."""
+        return servo_row_to_pose(self.update(pose_to_servo_row(pose), t))
+
+    def apply_batch(self, timestamps, servos: np.ndarray) -> np.ndarray:
+        """Filtra una grabación completa (N, 7) desde un estado limpio."""
+        servos = np.asarray(servos)
+        out = np.empty((len(servos), len(SERVO_CHANNELS)), dtype=np.uint8)
+        self.reset()
+        for i, (t, row) in enumerate(zip(timestamps, servos)):
+            out[i] = self.update(row, float(t))
+        return out
+
+
+def filtrar_movimientos(movimientos, config: Optional[Dict[str, dict]] = None) -> List[Dict]:
+    """
+    Aplica el filtro offline a un gesto guardado (lista de {"time": t, **pose}
+    o el formato de keyframes que sube AprobarGesto). Devuelve una lista nueva.
+    """
+    movimientos = descomprimir_gesto(movimientos)
+    if not movimientos:
+        return []
+    times = [m["time"] for m in movimientos]
+    servos = np.array([pose_to_servo_row(m) for m in movimientos])
+    filtered = ServoFilterBank(config).apply_batch(times, servos)
+    return [
+        {**m, **servo_row_to_pose(row)}
+        for m, row in zip(movimientos, filtered)
+    ]
@@ -1,21 +1,73 @@
 # app/infrastructure/video/gesture_recorder.py
+import logging
 import time
-import base64
-import cv2
+from collections import deque
 from app.infrastructure.external.video_capture import VideoCapture
-from app.infrastructure.video.mapper import to_loly_pose
+from app.infrastructure.video.mapper import PoseMapper, servo_row_to_pose
+from app.infrastructure.video.calibration import CalibrationRegistry
+from app.infrastructure.video.filters import SIN_FILTRO, ServoFilterBank
+from app.infrastructure.video.preview_stream import PreviewHub
+from app.infrastructure.video.jpeg_pool import JpegEncodePool
+from app.infrastructure.video.preview_cache import PreviewVideoCache
 from app.domain.entities.gesto_sesion import GestoSesion, FrameData
 from datetime import datetime
 
+log = logging.getLogger(__name__)
+
 class GestureRecorder:
-    def __init__(self, cam_index=1):
-        self.capture = VideoCapture(cam_index=cam_index, draw_debug=False)
+    def __init__(self, cam_index=1, calibracion: CalibrationRegistry | None = None,
+                 filtro_config: dict | None = None, capture=None, previews: PreviewHub | None = None,
+                 encode_workers: int = 2, encode_max_in_flight: int = 4,
+                 videos: PreviewVideoCache | None = None, capture_factory=None):
+        # `capture` permite inyectar cualquier fuente con read() -> LandmarksFrame.
+        # Con `capture_factory` cada grabación abre su propia fuente y la libera al terminar
+        self.capture_factory = capture_factory
+        self.capture = None if capture_factory else capture or VideoCapture(cam_index=cam_index, reuse_buffers=True)
+        self.calibracion = calibracion or CalibrationRegistry()
+        # Sin config no se filtra: las poses quedan como las entrega el mapper
+        self.filtro_config = SIN_FILTRO if filtro_config is None else filtro_config
+        # Preview binario (MJPEG / WebSocket) para clientes que no usan el SSE
+        self.previews = previews
+        # Compresión del preview fuera del bucle de captura
+        self.encode_workers = encode_workers
+        self.encode_max_in_flight = encode_max_in_flight
+        # Video de preview codificado mientras se graba (listo al terminar)
+        self.videos = videos
+
+    def stream_with_countdown(self, sesion: GestoSesion, gestor, con_imagen: bool = True):
+        """
+        Cuenta regresiva + grabación; va cediendo eventos para el SSE.
+        Con con_imagen=False los eventos "frame" no llevan el JPEG en base64
+        (grabación en segundo plano, el preview se sirve por MJPEG/WebSocket).
+        """
+        # Perfil del robot destino (el registro recoge cambios del archivo sin reiniciar)
+        perfil = self.calibracion.get(sesion.perfil_calibracion)
+        # Suavizado temporal por canal, con estado limpio en cada grabación
+        filtro = ServoFilterBank(self.filtro_config)
+        mapper = PoseMapper(perfil)
+        canal = self.previews.reclamar(sesion.id) if self.previews else None
+        encoder = JpegEncodePool(workers=self.encode_workers, max_in_flight=self.encode_max_in_flight)
+        video = self.videos.grabando(sesion.id) if self.videos else None
+        capture = None
+        try:
+            capture = self.capture_factory() if self.capture_factory else self.capture
+            yield from self._grabar(sesion, gestor, capture, filtro, mapper, canal, encoder, video, con_imagen)
+        finally:
+            if self.capture_factory and capture is not None:
+                capture.release()
+            encoder.shutdown(wait=False)
+            if video is not None:
+                self.videos.abortar(sesion.id, video)  # no-op si ya terminó
+            if canal is not None:
+                self.previews.cerrar(sesion.id)
 
-    def stream_with_countdown(self, sesion: GestoSesion, gestor):
+    def _grabar(self, sesion: GestoSesion, gestor, capture, filtro: ServoFilterBank, mapper: PoseMapper,
+                canal, encoder: JpegEncodePool, video, con_imagen: bool):
         # Cuenta regresiva
         for i in range(3, 0, -1):
             sesion.cuenta_regresiva = i
-            gestor.guardar(sesion)
+            gestor.guardar_estado(sesion)
+            gestor.publicar(sesion.id, "countdown", i)
             yield {"type": "countdown", "data": i}
             time.sleep(1)
 
@@ -24,33 +76,68 @@ class GestureRecorder:
         sesion.grabando = True
         sesion.inicio_grabacion = datetime.utcnow()
         sesion.frames = []
-        gestor.guardar(sesion)
+        gestor.guardar(sesion)  # escritura completa: descarta frames de un intento anterior
+        gestor.publicar(sesion.id, "grabando", sesion.duracion_segundos)
 
+        # El bucle solo captura, mapea y encola; el preview se comprime en el pool
+        # y los frames se guardan en orden a medida que su JPEG está listo
+        pendientes = deque()
+        anterior = None
         start = time.time()
         while time.time() - start < sesion.duracion_segundos:
-            frame = self.capture.read()
-            if not frame or not frame.pose_landmarks:
+            frame = capture.read()
+            if not frame or frame.landmarks is None:
                 continue
 
-            timestamp = time.time() - start
-            pose_robot = to_loly_pose(frame.pose_landmarks, frame.image_size)
+            # Tiempo de captura del frame, no el del final del procesamiento
+            timestamp = (frame.timestamp or time.time()) - start
+            if timestamp < 0:
+                continue
+            servos = filtro.update(mapper.map(frame.landmarks), timestamp)
+            pose_robot = servo_row_to_pose(servos)
+            time_left = round(sesion.duracion_segundos - (time.time() - start), 1)
 
-            # Usar la imagen YA ANOTADA por VideoCapture
-            _, buffer = cv2.imencode('.jpg', cv2.resize(frame.annotated, (640, 480)))
-            b64 = base64.b64encode(buffer).decode()
+            on_preview = None
+            if canal is not None:
+                on_preview = lambda img, t=timestamp, tl=time_left: canal.publicar(img, t, tl)
+            futuro = encoder.submit(frame, con_base64=con_imagen, on_preview=on_preview)
+            if futuro is None:
+                # Pool saturado: la pose se guarda igual, con la imagen del frame anterior
+                futuro = anterior
+                if futuro is None:
+                    continue
+            anterior = futuro
+            pendientes.append((timestamp, pose_robot, time_left, futuro))
 
-            sesion.frames.append(FrameData(timestamp, pose_robot, b64))
-            gestor.guardar(sesion)
+            yield from self._entregar(pendientes, sesion, gestor, video, con_imagen, esperar=False)
 
-            yield {
-                "type": "frame",
-                "data": {
-                    "image": b64,
-                    "time_left": round(sesion.duracion_segundos - (time.time() - start), 1)
-                }
-            }
+        yield from self._entregar(pendientes, sesion, gestor, video, con_imagen, esperar=True)
+        if video is not None:
+            self.videos.terminar(sesion.id, video)
+        if encoder.dropped:
+            log.info("Sesión %s: %d de %d frames sin imagen propia (pool de JPEG saturado)",
+                     sesion.id, encoder.dropped, encoder.dropped + encoder.submitted)
 
         sesion.grabando = False
         sesion.finalizado = True
-        gestor.guardar(sesion)
-        yield {"type": "finished", "data": len(sesion.frames)}
\ No newline at end of file
+        gestor.guardar_estado(sesion)
+        gestor.publicar(sesion.id, "finished", len(sesion.frames))
+        yield {"type": "finished", "data": len(sesion.frames)}
+
+    def _entregar(self, pendientes: deque, sesion: GestoSesion, gestor, video, con_imagen: bool, esperar: bool):
+        """Persiste los frames pendientes cuyo JPEG ya está listo, respetando el orden de captura."""
+        while pendientes and (esperar or pendientes[0][3].done()):
+            timestamp, pose_robot, time_left, futuro = pendientes.popleft()
+            encoded = futuro.result()
+
+            frame_data = FrameData(timestamp, pose_robot, encoded.jpeg)
+            sesion.frames.append(frame_data)
+            gestor.agregar_frame(sesion.id, frame_data)
+            if video is not None:
+                video.agregar(timestamp, encoded.jpeg)
+            gestor.publicar(sesion.id, "frames", len(sesion.frames))
+
+            data = {"time_left": time_left}
+            if con_imagen:
+                data["image"] = encoded.image_base64
+            yield {"type": "frame", "data": data}
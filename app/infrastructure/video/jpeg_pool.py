@@ -0,0 +1,100 @@
+# app/infrastructure/video/jpeg_pool.py
+"""
+Pool de hilos para el preview de la grabación (resize + landmarks + JPEG).
+
+El bucle de captura solo copia el frame a un slot propio del pool ("pin": el
+buffer de la cámara se recicla enseguida) y encola; si no hay slot libre el
+frame se descarta y se cuenta, así la captura nunca espera a la compresión.
+cv2.resize e imencode sueltan el GIL, así que los hilos trabajan en paralelo.
+"""
+import base64
+import queue
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from app.infrastructure.external.video_capture import NUM_POSE_LANDMARKS, LandmarksFrame
+
+
+@dataclass(frozen=True)
+class EncodedFrame:
+    jpeg: bytes
+    image_base64: Optional[str] = None
+
+
+class _Slot:
+    """Copia fija de un frame mientras se codifica."""
+
+    def __init__(self):
+        self.image: Optional[np.ndarray] = None
+        self.landmarks = np.empty((NUM_POSE_LANDMARKS, 4), dtype=np.float32)
+        self.has_pose = False
+        self.draw_landmarks = True
+        self.preview: Optional[np.ndarray] = None
+
+    def load(self, frame: LandmarksFrame) -> None:
+        if self.image is None or self.image.shape != frame.raw.shape:
+            self.image = np.empty_like(frame.raw)
+        np.copyto(self.image, frame.raw)
+        self.has_pose = frame.landmarks is not None
+        if self.has_pose:
+            np.copyto(self.landmarks, frame.landmarks)
+        self.draw_landmarks = frame.draw_landmarks
+
+    def as_frame(self) -> LandmarksFrame:
+        return LandmarksFrame(
+            raw=self.image,
+            image_size=self.image.shape[:2][::-1],
+            landmarks=self.landmarks if self.has_pose else None,
+            draw_landmarks=self.draw_landmarks,
+        )
+
+
+class JpegEncodePool:
+    """
+    submit(frame) → Future[EncodedFrame], o None si ya hay `max_in_flight`
+    frames en curso (el frame se descarta y suma a `dropped`).
+    """
+
+    def __init__(self, workers: int = 2, max_in_flight: int = 4,
+                 size: Tuple[int, int] = (640, 480), quality: int = 95):
+        self.size = size
+        self.quality = quality
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="jpeg-encode")
+        self._free: "queue.SimpleQueue[_Slot]" = queue.SimpleQueue()
+        for _ in range(max_in_flight):
+            self._free.put(_Slot())
+        self.submitted = 0
+        self.dropped = 0
+
+    def submit(self, frame: LandmarksFrame, con_base64: bool = False,
+               on_preview: Optional[Callable[[np.ndarray], None]] = None) -> Optional[Future]:
+        """
+        `on_preview(imagen)` se llama en el hilo del pool con el preview ya
+        dibujado, antes de comprimir (para el canal de preview en vivo).
+        """
+        try:
+            slot = self._free.get_nowait()
+        except queue.Empty:
+            self.dropped += 1
+            return None
+        slot.load(frame)
+        self.submitted += 1
+        return self._executor.submit(self._encode, slot, con_base64, on_preview)
+
+    def _encode(self, slot: _Slot, con_base64: bool, on_preview) -> EncodedFrame:
+        try:
+            slot.preview = slot.as_frame().render_preview(self.size, out=slot.preview)
+            if on_preview is not None:
+                on_preview(slot.preview)
+            _, buf = cv2.imencode(".jpg", slot.preview, [cv2.IMWRITE_JPEG_QUALITY, self.quality])
+            jpeg = buf.tobytes()
+        finally:
+            self._free.put(slot)
+        return EncodedFrame(jpeg, base64.b64encode(jpeg).decode() if con_base64 else None)
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._executor.shutdown(wait=wait)
@@ -0,0 +1,118 @@
+# app/infrastructure/video/keyframes.py
+"""
+Compresión por keyframes de gestos guardados.
+
+Sobre la grilla fija del robot, cada canal de servo se reduce por separado con
+Ramer–Douglas–Peucker (error vertical, en unidades de servo). Los keyframes son
+un subconjunto de la grilla, así que la interpolación lineal entre ellos queda
+a <= max_error de la señal original en cualquier instante, no solo en los
+ticks: se puede descomprimir a cualquier frecuencia (en los ticks originales el
+error sigue siendo <= max_error; entre ellos se suma el redondeo a entero).
+
+Formato guardado (JSON compacto):
+    {"format": "keyframes/v1", "tick_hz": 25.0, "ticks": M, "max_error": 1,
+     "channels": {"pitch": [[tick, valor], ...], ...}}
+"""
+import json
+from typing import Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+from app.infrastructure.video.mapper import SERVO_CHANNELS, pose_to_servo_row, servo_row_to_pose
+
+FORMAT = "keyframes/v1"
+DEFAULT_MAX_ERROR = 1
+
+
+def rdp_indices(values: np.ndarray, max_error: float) -> np.ndarray:
+    """Índices (ordenados, incluye extremos) de los keyframes de una serie muestreada en la grilla."""
+    v = np.asarray(values, dtype=np.float64)
+    n = len(v)
+    if n <= 2:
+        return np.arange(n)
+    keep = np.zeros(n, dtype=bool)
+    keep[0] = keep[-1] = True
+    stack = [(0, n - 1)]
+    while stack:
+        a, b = stack.pop()
+        if b - a < 2:
+            continue
+        inner = np.arange(a + 1, b)
+        linea = v[a] + (v[b] - v[a]) * (inner - a) / (b - a)
+        err = np.abs(v[a + 1:b] - linea)
+        k = int(np.argmax(err))
+        if err[k] > max_error:
+            m = a + 1 + k
+            keep[m] = True
+            stack.append((a, m))
+            stack.append((m, b))
+    return np.flatnonzero(keep)
+
+
+def comprimir_servos(servos: np.ndarray, tick_hz: float, max_error: int = DEFAULT_MAX_ERROR) -> Dict:
+    """servos (M, 7) sobre la grilla de tick_hz → gesto en formato keyframes."""
+    servos = np.asarray(servos, dtype=np.uint8)
+    channels = {}
+    for c, name in enumerate(SERVO_CHANNELS):
+        idx = rdp_indices(servos[:, c], max_error)
+        channels[name] = [[int(i), int(servos[i, c])] for i in idx]
+    return {
+        "format": FORMAT,
+        "tick_hz": float(tick_hz),
+        "ticks": int(len(servos)),
+        "max_error": int(max_error),
+        "channels": channels,
+    }
+
+
+def es_keyframes(data) -> bool:
+    return isinstance(data, dict) and data.get("format") == FORMAT
+
+
+def expandir_servos(data: Dict, rate_hz: Optional[float] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """Gesto en formato keyframes → (tiempos (M,), servos (M, 7) uint8) a rate_hz (por defecto su tick_hz)."""
+    tick_hz = float(data["tick_hz"])
+    rate_hz = rate_hz or tick_hz
+    fin = (data["ticks"] - 1) / tick_hz
+    grid = np.arange(int(np.floor(fin * rate_hz + 1e-9)) + 1) / rate_hz
+    out = np.empty((len(grid), len(SERVO_CHANNELS)), dtype=np.uint8)
+    for c, name in enumerate(SERVO_CHANNELS):
+        kf = np.asarray(data["channels"][name], dtype=np.float64).reshape(-1, 2)
+        out[:, c] = np.rint(np.interp(grid, kf[:, 0] / tick_hz, kf[:, 1]))
+    return grid, out
+
+
+def descomprimir_gesto(data: Union[Dict, List[Dict]], rate_hz: Optional[float] = None) -> List[Dict]:
+    """
+    Gesto guardado → lista de {"time", "duration", **pose}. Acepta también el
+    formato viejo (lista de frames), que se devuelve tal cual.
+    """
+    if not es_keyframes(data):
+        return data
+    grid, rows = expandir_servos(data, rate_hz)
+    duration = round(1.0 / (rate_hz or float(data["tick_hz"])), 6)
+    return [
+        {"time": round(float(t), 4), "duration": duration, **servo_row_to_pose(row)}
+        for t, row in zip(grid, rows)
+    ]
+
+
+def comprimir_movimientos(movimientos: List[Dict], tick_hz: float,
+                          max_error: int = DEFAULT_MAX_ERROR) -> Tuple[bytes, Dict]:
+    """
+    Movimientos uniformes (salida de movimientos_uniformes) → (JSON compacto,
+    estadísticas {"ratio_compresion", "error_maximo", "keyframes"}). El ratio
+    es contra el JSON de frames completos que se guardaba antes.
+    """
+    servos = np.array([pose_to_servo_row(m) for m in movimientos], dtype=np.uint8).reshape(-1, len(SERVO_CHANNELS))
+    data = comprimir_servos(servos, tick_hz, max_error)
+    payload = json.dumps(data, separators=(",", ":")).encode()
+
+    _, reconstruido = expandir_servos(data)
+    error = int(np.abs(reconstruido.astype(np.int16) - servos.astype(np.int16)).max()) if len(servos) else 0
+    original = len(json.dumps(movimientos, ensure_ascii=False, indent=2).encode())
+    return payload, {
+        "ratio_compresion": round(original / len(payload), 2),
+        "error_maximo": error,
+        "keyframes": sum(len(v) for v in data["channels"].values()),
+    }
@@ -1,6 +1,8 @@
 import math
 import numpy as np
-from typing import Dict, Tuple
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple, Union
+from app.infrastructure.video.calibration import CAL_TABLES, DEFAULT_PROFILE, CalibrationProfile, CompiledTable
 
 # Índices de MediaPipe Pose
 NOSE = 0
@@ -10,15 +12,24 @@ L_WRIST, R_WRIST       = 15, 16
 L_HIP, R_HIP           = 23, 24
 
 # ------------------ Tablas de calibración ------------------
-CAL_TABLES = {
-    "pitch": [(39.0,0), (47.0,50), (57.0,100)],          # plano ZY
-    "yaw":   [(-18.0,0), (0.0,50), (18.0,100)],         # plano XZ
-    "roll":  [(83.0,0), (90.0,50), (97.0,100)],          # plano XY (ojo: si cambias método recalibra)
-    "AL_v":  [(114.0,0), (90.0,50), (70.0,100)],         # XY
-    "AL_h":  [(70.0,0), (90.0,50), (114.0,100)],         # ZX
-    "AR_v":  [(-114.0,0), (-90.0,50), (-70.0,100)],      # XY
-    "AR_h":  [(-70.0,0), (-90.0,50), (-114.0,100)],      # ZX
-}
+# CAL_TABLES y los perfiles por robot viven en calibration.py
+
+# Orden de los canales en las matrices de servos (N, 7)
+SERVO_CHANNELS = ("pitch", "yaw", "roll", "AL_v", "AL_h", "AR_v", "AR_h")
+
+# Landmarks de los que depende cada canal (mismo orden que SERVO_CHANNELS)
+CHANNEL_LANDMARKS = (
+    (NOSE, L_SHOULDER, R_SHOULDER),
+    (NOSE, L_SHOULDER, R_SHOULDER),
+    (MOUTH_L, MOUTH_R),
+    (L_SHOULDER, L_WRIST),
+    (L_SHOULDER, L_WRIST),
+    (R_SHOULDER, R_WRIST),
+    (R_SHOULDER, R_WRIST),
+)
+
+# Visibilidad mínima de MediaPipe para confiar en un landmark
+DEFAULT_MIN_VISIBILITY = 0.5
 
 # ------------------ Utilidades ------------------
 def _normalize(v: np.ndarray) -> np.ndarray:
@@ -142,14 +153,16 @@ def raw_AR_h(pose):
     return project_and_angle(v, 0, 2)  # (X,Z)
 
 # ------------------ Salida final ------------------
-def to_loly_pose(pose_lm: Dict[int, Tuple[float,float,float]], size: Tuple[int,int]) -> Dict:
-    pitch = interp_lookup(raw_pitch(pose_lm), CAL_TABLES["pitch"])
-    yaw   = interp_lookup(raw_yaw(pose_lm),   CAL_TABLES["yaw"])
-    roll  = interp_lookup(raw_roll(pose_lm),  CAL_TABLES["roll"])
-    Lv    = interp_lookup(raw_AL_v(pose_lm),  CAL_TABLES["AL_v"])
-    Lh    = interp_lookup(raw_AL_h(pose_lm),  CAL_TABLES["AL_h"])
-    Rv    = interp_lookup(raw_AR_v(pose_lm),  CAL_TABLES["AR_v"])
-    Rh    = interp_lookup(raw_AR_h(pose_lm),  CAL_TABLES["AR_h"])
+def to_loly_pose(pose_lm: Dict[int, Tuple[float,float,float]], size: Tuple[int,int],
+                 profile: Optional[CalibrationProfile] = None) -> Dict:
+    cal = profile or DEFAULT_PROFILE
+    pitch = cal["pitch"].lookup(raw_pitch(pose_lm))
+    yaw   = cal["yaw"].lookup(raw_yaw(pose_lm))
+    roll  = cal["roll"].lookup(raw_roll(pose_lm))
+    Lv    = cal["AL_v"].lookup(raw_AL_v(pose_lm))
+    Lh    = cal["AL_h"].lookup(raw_AL_h(pose_lm))
+    Rv    = cal["AR_v"].lookup(raw_AR_v(pose_lm))
+    Rh    = cal["AR_h"].lookup(raw_AR_h(pose_lm))
 
     pitch = apply_deadzone_servo(pitch)
     yaw   = apply_deadzone_servo(yaw)
@@ -164,3 +177,234 @@ def to_loly_pose(pose_lm: Dict[int, Tuple[float,float,float]], size: Tuple[int,i
         "wing_L": {"vertical": Lv, "horizontal": Lh},
         "wing_R": {"vertical": Rv, "horizontal": Rh}
     }
+
+def pose_to_servo_row(pose: Dict) -> List[int]:
+    """Convierte el dict de to_loly_pose a la fila de servos en orden SERVO_CHANNELS."""
+    return [
+        pose["head"]["pitch"], pose["head"]["yaw"], pose["head"]["row"],
+        pose["wing_L"]["vertical"], pose["wing_L"]["horizontal"],
+        pose["wing_R"]["vertical"], pose["wing_R"]["horizontal"],
+    ]
+
+def servo_row_to_pose(row) -> Dict:
+    """Inversa de pose_to_servo_row: fila de 7 servos → dict de to_loly_pose."""
+    pitch, yaw, roll, Lv, Lh, Rv, Rh = (int(v) for v in row)
+    return {
+        "head": {"pitch": pitch, "yaw": yaw, "row": roll},
+        "wing_L": {"vertical": Lv, "horizontal": Lh},
+        "wing_R": {"vertical": Rv, "horizontal": Rh}
+    }
+
+# ------------------ Versión por lotes ------------------
+def _norm_rows(v: np.ndarray) -> np.ndarray:
+    return np.sqrt(np.sum(v * v, axis=-1))
+
+def _normalize_rows(v: np.ndarray) -> np.ndarray:
+    n = _norm_rows(v)
+    ok = n > 1e-6
+    return np.where(ok[:, None], v / np.where(ok, n, 1.0)[:, None], v)
+
+def _project_and_angle_batch(v: np.ndarray, i: int, j: int) -> np.ndarray:
+    """Equivalente vectorizado de project_and_angle sobre filas (N, 3)."""
+    pi, pj = v[:, i], v[:, j]
+    n = np.sqrt(pi * pi + pj * pj)
+    ok = n >= 1e-6
+    safe = np.where(ok, n, 1.0)
+    return np.where(ok, np.degrees(np.arctan2(pj / safe, pi / safe)), 0.0)
+
+def _to_0_180_batch(deg: np.ndarray) -> np.ndarray:
+    a = np.mod(deg + 360.0, 360.0)
+    return np.where(a > 180.0, 360.0 - a, a)
+
+@lru_cache(maxsize=64)
+def _compiled(table: Tuple[Tuple[float, int], ...]) -> CompiledTable:
+    return CompiledTable(list(table))
+
+def interp_lookup_batch(angles: np.ndarray, table: Union[CompiledTable, list[tuple[float,int]]]) -> np.ndarray:
+    """
+    Equivalente vectorizado de interp_lookup (mismo redondeo y mismos extremos).
+    Acepta una CompiledTable; una lista se compila una sola vez y queda en caché.
+    """
+    if not isinstance(table, CompiledTable):
+        table = _compiled(tuple((a, v) for a, v in table))
+    return table.lookup_batch(angles)
+
+def raw_angles_batch(landmarks: np.ndarray) -> np.ndarray:
+    """
+    Ángulos crudos (N, 7) en orden SERVO_CHANNELS a partir de landmarks (N, 33, >=3).
+    Un landmark con NaN se trata como ausente y el canal usa el mismo valor por
+    defecto que las funciones raw_* por frame.
+    """
+    lm = np.asarray(landmarks, dtype=np.float64)[:, :, :3]
+    missing = np.isnan(lm).any(axis=2)
+
+    nose = lm[:, NOSE]
+    Ls = lm[:, L_SHOULDER]; Rs = lm[:, R_SHOULDER]
+    Lw = lm[:, L_WRIST];    Rw = lm[:, R_WRIST]
+    ml = lm[:, MOUTH_L];    mr = lm[:, MOUTH_R]
+
+    out = np.empty((lm.shape[0], len(SERVO_CHANNELS)), dtype=np.float64)
+
+    # Cabeza
+    head_missing = missing[:, [NOSE, L_SHOULDER, R_SHOULDER]].any(axis=1)
+    dy = (Ls[:, 1] + Rs[:, 1]) / 2 - nose[:, 1]
+    out[:, 0] = np.where(head_missing, 127.0,
+                         _to_0_180_batch(np.degrees(np.arctan2(dy, 0.4))))
+
+    dx = nose[:, 0] - (Ls[:, 0] + Rs[:, 0]) / 2
+    dz = _norm_rows(Rs - Ls)
+    out[:, 1] = np.where(head_missing, 0.0, np.degrees(np.arctan2(dx, dz)))
+
+    u = mr - ml
+    u[:, 2] = 0.0
+    roll_missing = missing[:, [MOUTH_L, MOUTH_R]].any(axis=1) | (_norm_rows(u[:, :2]) < 1e-6)
+    out[:, 2] = np.where(roll_missing, 90.0, _project_and_angle_batch(u, 0, 1))
+
+    # Brazos
+    left_missing = missing[:, [L_SHOULDER, L_WRIST]].any(axis=1)
+    vL = _normalize_rows(Ls - Lw)
+    out[:, 3] = np.where(left_missing, 90.0, _project_and_angle_batch(vL, 0, 1))
+    out[:, 4] = np.where(left_missing, 90.0, _project_and_angle_batch(vL, 0, 2))
+
+    right_missing = missing[:, [R_SHOULDER, R_WRIST]].any(axis=1)
+    vR = _normalize_rows(Rw - Rs)
+    out[:, 5] = np.where(right_missing, -90.0, _project_and_angle_batch(vR, 0, 1))
+    out[:, 6] = np.where(right_missing, -90.0, _project_and_angle_batch(vR, 0, 2))
+    return out
+
+def channel_visibility_mask(landmarks: np.ndarray, min_visibility: float = DEFAULT_MIN_VISIBILITY) -> np.ndarray:
+    """(N, 33, 4) → (N, 7) bool: True si todos los landmarks del canal son visibles."""
+    vis = np.asarray(landmarks)[:, :, 3]
+    out = np.empty((vis.shape[0], len(SERVO_CHANNELS)), dtype=bool)
+    for c, idx in enumerate(CHANNEL_LANDMARKS):
+        out[:, c] = (vis[:, idx] >= min_visibility).all(axis=1)
+    return out
+
+def _hold_last_valid(servos: np.ndarray, valid: np.ndarray) -> np.ndarray:
+    """Reemplaza cada valor no válido por el último válido del mismo canal."""
+    n = servos.shape[0]
+    idx = np.where(valid, np.arange(n)[:, None], -1)
+    np.maximum.accumulate(idx, axis=0, out=idx)
+    held = np.take_along_axis(servos, np.maximum(idx, 0), axis=0)
+    # Antes del primer valor válido no hay nada que sostener: se deja el calculado
+    return np.where(idx >= 0, held, servos)
+
+def to_loly_pose_batch(landmarks: np.ndarray, profile: Optional[CalibrationProfile] = None,
+                       min_visibility: Optional[float] = None) -> np.ndarray:
+    """
+    Versión por lotes de to_loly_pose para una grabación completa.
+
+    landmarks: array (N, 33, 3) o (N, 33, 4) con visibilidad.
+    Devuelve una matriz (N, 7) uint8 con los servos en orden SERVO_CHANNELS,
+    con los mismos valores que to_loly_pose frame a frame.
+
+    Con min_visibility (y visibilidad en la 4ª columna), un canal cuyos landmarks
+    no alcanzan ese umbral mantiene el último valor válido en vez de saltar.
+    """
+    landmarks = np.asarray(landmarks)
+    if landmarks.ndim != 3 or landmarks.shape[1] != 33 or landmarks.shape[2] < 3:
+        raise ValueError(f"Se esperaba un array (N, 33, 3), llegó {landmarks.shape}")
+
+    cal = profile or DEFAULT_PROFILE
+    angles = raw_angles_batch(landmarks)
+    servos = np.empty(angles.shape, dtype=np.float64)
+    for c, name in enumerate(SERVO_CHANNELS):
+        servos[:, c] = cal[name].lookup_batch(angles[:, c])
+
+    # Deadzone en espacio servo, igual que apply_deadzone_servo
+    servos = np.where(np.abs(servos - 50) < 2, 50, servos)
+
+    if min_visibility is not None and landmarks.shape[2] >= 4:
+        servos = _hold_last_valid(servos, channel_visibility_mask(landmarks, min_visibility))
+    return servos.astype(np.uint8)
+
+# ------------------ Un solo frame ------------------
+def _project_and_angle_xyz(x: float, y: float, z: float, i: int, j: int) -> float:
+    v = (x, y, z)
+    pi, pj = v[i], v[j]
+    n = math.sqrt(pi * pi + pj * pj)
+    if n < 1e-6:
+        return 0.0
+    return math.degrees(math.atan2(pj / n, pi / n))
+
+def _unit(x: float, y: float, z: float) -> Tuple[float, float, float]:
+    n = math.sqrt(x * x + y * y + z * z)
+    return (x / n, y / n, z / n) if n > 1e-6 else (x, y, z)
+
+def raw_angles_frame(lm: List[List[float]]) -> List[float]:
+    """
+    raw_angles_batch para un solo frame, con floats de Python: en el bucle en
+    vivo evita la docena de arrays temporales que crea la versión por lotes.
+    lm: filas [x, y, z, ...] (p. ej. landmarks.tolist()); NaN = ausente.
+    """
+    def ok(*idx):
+        return not any(c != c for i in idx for c in lm[i][:3])
+
+    nose, Ls, Rs = lm[NOSE], lm[L_SHOULDER], lm[R_SHOULDER]
+    Lw, Rw, ml, mr = lm[L_WRIST], lm[R_WRIST], lm[MOUTH_L], lm[MOUTH_R]
+    out = [127.0, 0.0, 90.0, 90.0, 90.0, -90.0, -90.0]
+
+    if ok(NOSE, L_SHOULDER, R_SHOULDER):
+        dy = (Ls[1] + Rs[1]) / 2 - nose[1]
+        out[0] = _to_0_180(math.degrees(math.atan2(dy, 0.4)))
+        dx = nose[0] - (Ls[0] + Rs[0]) / 2
+        ex, ey, ez = Rs[0] - Ls[0], Rs[1] - Ls[1], Rs[2] - Ls[2]
+        out[1] = math.degrees(math.atan2(dx, math.sqrt(ex * ex + ey * ey + ez * ez)))
+
+    if ok(MOUTH_L, MOUTH_R):
+        ux, uy = mr[0] - ml[0], mr[1] - ml[1]
+        if math.sqrt(ux * ux + uy * uy) >= 1e-6:
+            out[2] = _project_and_angle_xyz(ux, uy, 0.0, 0, 1)
+
+    if ok(L_SHOULDER, L_WRIST):
+        v = _unit(Ls[0] - Lw[0], Ls[1] - Lw[1], Ls[2] - Lw[2])
+        out[3] = _project_and_angle_xyz(*v, 0, 1)
+        out[4] = _project_and_angle_xyz(*v, 0, 2)
+
+    if ok(R_SHOULDER, R_WRIST):
+        v = _unit(Rw[0] - Rs[0], Rw[1] - Rs[1], Rw[2] - Rs[2])
+        out[5] = _project_and_angle_xyz(*v, 0, 1)
+        out[6] = _project_and_angle_xyz(*v, 0, 2)
+    return out
+
+class PoseMapper:
+    """
+    Mapper por frame sobre el array (33, 4) de LandmarksFrame.
+
+    Guarda la última salida válida de cada canal: si los landmarks de un canal
+    tienen visibilidad baja, el canal se queda quieto en lugar de irse a los
+    valores por defecto de raw_* (127.0, 90.0, -90.0).
+    """
+
+    def __init__(self, profile: Optional[CalibrationProfile] = None,
+                 min_visibility: float = DEFAULT_MIN_VISIBILITY):
+        self.profile = profile
+        self.min_visibility = min_visibility
+        self._last = np.zeros(len(SERVO_CHANNELS), dtype=np.uint8)
+        self._has_last = np.zeros(len(SERVO_CHANNELS), dtype=bool)
+
+    def reset(self) -> None:
+        self._has_last[:] = False
+
+    def map(self, landmarks: np.ndarray) -> np.ndarray:
+        """
+        (33, 4) → fila (7,) uint8 en orden SERVO_CHANNELS.
+        Camino escalar (mismos valores que to_loly_pose_batch); el lote queda
+        para importación y replay.
+        """
+        cal = self.profile or DEFAULT_PROFILE
+        lm = landmarks.tolist()
+        servos = np.empty(len(SERVO_CHANNELS), dtype=np.uint8)
+        for c, angle in enumerate(raw_angles_frame(lm)):
+            value = cal[SERVO_CHANNELS[c]].lookup(angle)
+            servos[c] = 50 if abs(value - 50) < 2 else value
+
+        if len(lm[0]) >= 4:
+            for c, idx in enumerate(CHANNEL_LANDMARKS):
+                if all(lm[i][3] >= self.min_visibility for i in idx):
+                    self._has_last[c] = True
+                elif self._has_last[c]:
+                    servos[c] = self._last[c]
+        np.copyto(self._last, servos, where=self._has_last)
+        return servos
+
@@ -0,0 +1,29 @@
+# app/infrastructure/video/pose_codec.py
+"""
+Codec binario de frames de pose: timestamp float64 + 7 servos uint8 en orden
+SERVO_CHANNELS (15 bytes), en lugar del dict anidado en JSON (~150 bytes).
+"""
+import struct
+from typing import Dict, Iterable, Tuple
+
+import numpy as np
+
+from app.infrastructure.video.mapper import SERVO_CHANNELS, pose_to_servo_row, servo_row_to_pose
+
+POSE_FRAME = struct.Struct(f"<d{len(SERVO_CHANNELS)}B")
+POSE_FRAME_DTYPE = np.dtype([("timestamp", "<f8"), ("servos", np.uint8, (len(SERVO_CHANNELS),))])
+
+
+def encode_pose_frame(timestamp: float, pose: Dict) -> bytes:
+    return POSE_FRAME.pack(timestamp, *pose_to_servo_row(pose))
+
+
+def decode_pose_frame(data: bytes) -> Tuple[float, Dict]:
+    timestamp, *row = POSE_FRAME.unpack(data)
+    return timestamp, servo_row_to_pose(row)
+
+
+def decode_pose_frames(entries: Iterable[bytes]) -> Tuple[np.ndarray, np.ndarray]:
+    """Decodifica muchos frames de una vez: (timestamps (N,), servos (N, 7) uint8)."""
+    arr = np.frombuffer(b"".join(entries), dtype=POSE_FRAME_DTYPE)
+    return arr["timestamp"], arr["servos"]
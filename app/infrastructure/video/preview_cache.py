@@ -0,0 +1,110 @@
+# app/infrastructure/video/preview_cache.py
+"""
+Videos de preview por sesión dentro del proceso que graba.
+
+El grabador abre un PreviewVideoWriter al empezar y lo cierra al terminar; el
+video queda aquí (archivo local + URL subida, si ya se subió) para que pedir
+el preview varias veces no vuelva a codificar ni a subir nada.
+"""
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+
+from app.infrastructure.video.video_encoder import PreviewVideoWriter
+
+log = logging.getLogger(__name__)
+
+
+@dataclass
+class PreviewVideo:
+    path: str
+    frames: int
+    content_type: str
+    url: Optional[str] = None
+    url_expira: float = 0.0
+
+    def url_vigente(self, margen: float = 60.0) -> Optional[str]:
+        return self.url if self.url and time.time() + margen < self.url_expira else None
+
+
+class PreviewVideoCache:
+    """LRU de PreviewVideo por sesión; los archivos desalojados se borran."""
+
+    def __init__(self, modo: str = "mp4v", fps: float = 30.0, max_entradas: int = 32):
+        self.modo = modo
+        self.fps = fps
+        self.max_entradas = max_entradas
+        self._videos: "OrderedDict[str, PreviewVideo]" = OrderedDict()
+        self._en_curso: dict = {}
+        self._lock = threading.Lock()
+
+    def grabando(self, sesion_id: str) -> PreviewVideoWriter:
+        """Writer para una grabación que empieza; reemplaza cualquier video anterior de la sesión."""
+        writer = PreviewVideoWriter(modo=self.modo, fps=self.fps)
+        with self._lock:
+            anterior = self._en_curso.pop(sesion_id, None)
+            self._en_curso[sesion_id] = writer
+            viejo = self._videos.pop(sesion_id, None)
+        if anterior is not None:
+            anterior.descartar()
+        if viejo is not None:
+            _borrar(viejo.path)
+        return writer
+
+    def terminar(self, sesion_id: str, writer: PreviewVideoWriter) -> Optional[PreviewVideo]:
+        with self._lock:
+            if self._en_curso.get(sesion_id) is not writer:
+                return None  # otra grabación lo reemplazó
+            del self._en_curso[sesion_id]
+        try:
+            path = writer.cerrar()
+        except Exception as e:
+            log.warning("Sesión %s: no se pudo generar el video de preview: %s", sesion_id, e)
+            writer.descartar()
+            return None
+        return self.guardar(sesion_id, PreviewVideo(path, writer.frames, writer.content_type))
+
+    def abortar(self, sesion_id: str, writer: PreviewVideoWriter) -> None:
+        """Grabación interrumpida: descarta el writer si sigue en curso."""
+        with self._lock:
+            if self._en_curso.get(sesion_id) is not writer:
+                return
+            del self._en_curso[sesion_id]
+        writer.descartar()
+
+    def guardar(self, sesion_id: str, video: PreviewVideo) -> PreviewVideo:
+        desalojados = []
+        with self._lock:
+            viejo = self._videos.pop(sesion_id, None)
+            if viejo is not None and viejo.path != video.path:
+                desalojados.append(viejo)
+            self._videos[sesion_id] = video
+            while len(self._videos) > self.max_entradas:
+                desalojados.append(self._videos.popitem(last=False)[1])
+        for v in desalojados:
+            _borrar(v.path)
+        return video
+
+    def obtener(self, sesion_id: str) -> Optional[PreviewVideo]:
+        with self._lock:
+            video = self._videos.get(sesion_id)
+            if video is not None:
+                self._videos.move_to_end(sesion_id)
+            return video
+
+    def eliminar(self, sesion_id: str) -> None:
+        with self._lock:
+            video = self._videos.pop(sesion_id, None)
+        if video is not None:
+            _borrar(video.path)
+
+
+def _borrar(path: str) -> None:
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
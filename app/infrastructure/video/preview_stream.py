@@ -0,0 +1,197 @@
+# app/infrastructure/video/preview_stream.py
+"""
+Preview en vivo de una grabación para clientes binarios (MJPEG / WebSocket).
+
+El grabador solo deja el último frame de preview en un PreviewChannel (una
+copia, nunca espera a nadie). Cada cliente pide "el siguiente frame más nuevo
+que el que ya vi": los intermedios se saltan solos, así que un teléfono lento
+baja su fps sin frenar la captura. La compresión JPEG corre en el hilo del
+cliente, con la calidad y escala que pidió; clientes con los mismos parámetros
+comparten el mismo JPEG.
+"""
+import struct
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional, Tuple
+
+import cv2
+import numpy as np
+
+# Cabecera de cada mensaje WebSocket: seq, timestamp (s desde el inicio), time_left (s)
+WS_HEADER = struct.Struct("<Idf")
+MJPEG_BOUNDARY = "frame"
+# Segundos sin frames tras los que un cliente deja de esperar (grabación que
+# nunca empezó, falló antes de publicar o corre en otro worker)
+IDLE_TIMEOUT = 30.0
+
+
+@dataclass(frozen=True)
+class PreviewOptions:
+    quality: int = 70
+    scale: float = 1.0
+    max_fps: Optional[float] = None
+
+    def __post_init__(self):
+        if not 1 <= self.quality <= 100:
+            raise ValueError("quality debe estar entre 1 y 100")
+        if not 0.05 <= self.scale <= 1.0:
+            raise ValueError("scale debe estar entre 0.05 y 1")
+
+
+@dataclass(frozen=True)
+class PreviewFrame:
+    seq: int
+    timestamp: float
+    time_left: float
+    jpeg: bytes
+
+
+class PreviewChannel:
+    """Último frame de preview de una sesión + espera de frames nuevos."""
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._image: Optional[np.ndarray] = None
+        self._seq = 0
+        self._timestamp = 0.0
+        self._time_left = 0.0
+        self._cache: Dict[Tuple[int, int, float], bytes] = {}
+        self.cerrado = False
+        # Lo usa un grabador (PreviewHub.reclamar) / clientes conectados (PreviewHub.abrir)
+        self.reclamado = False
+        self.clientes = 0
+
+    def publicar(self, image: np.ndarray, timestamp: float, time_left: float) -> None:
+        """Lo llama el grabador: copia la imagen (su buffer se reutiliza) y avisa."""
+        with self._cond:
+            if self._seq and timestamp < self._timestamp:
+                return  # llegó tarde desde el pool de codificación: ya hay uno más nuevo
+            if self._image is None or self._image.shape != image.shape:
+                self._image = np.empty_like(image)
+            np.copyto(self._image, image)
+            self._seq += 1
+            self._timestamp, self._time_left = timestamp, time_left
+            self._cache.clear()
+            self._cond.notify_all()
+
+    def cerrar(self) -> None:
+        with self._cond:
+            self.cerrado = True
+            self._cond.notify_all()
+
+    def esperar(self, ultimo_seq: int, options: PreviewOptions, timeout: float = 1.0) -> Optional[PreviewFrame]:
+        """Frame con seq > ultimo_seq codificado según `options`, o None si venció el timeout o cerró."""
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._seq > ultimo_seq or self.cerrado, timeout):
+                return None
+            if self._seq <= ultimo_seq:
+                return None
+            seq, timestamp, time_left = self._seq, self._timestamp, self._time_left
+            key = (seq, options.quality, options.scale)
+            jpeg = self._cache.get(key)
+            if jpeg is None:
+                image = self._image
+                if options.scale < 1.0:
+                    h, w = image.shape[:2]
+                    size = (max(1, round(w * options.scale)), max(1, round(h * options.scale)))
+                    image = cv2.resize(image, size, interpolation=cv2.INTER_AREA)
+                else:
+                    image = image.copy()  # se codifica fuera del lock
+
+        if jpeg is None:
+            _, buf = cv2.imencode(".jpg", image, [cv2.IMWRITE_JPEG_QUALITY, options.quality])
+            jpeg = buf.tobytes()
+            with self._cond:
+                if self._seq == seq:
+                    self._cache[key] = jpeg
+        return PreviewFrame(seq, timestamp, time_left, jpeg)
+
+    def frames(self, options: PreviewOptions, timeout: float = 1.0, idle_timeout: float = IDLE_TIMEOUT,
+               activa: Optional[Callable[[], bool]] = None):
+        """
+        Generador de frames para un cliente. Termina cuando el canal se cierra,
+        cuando pasan `idle_timeout` segundos sin frames nuevos o cuando
+        `activa()` (consultada solo mientras no llegan frames) devuelve False.
+        """
+        seq = 0
+        siguiente = 0.0
+        ultimo = time.monotonic()
+        while not self.cerrado:
+            if options.max_fps:
+                delay = siguiente - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+                siguiente = time.monotonic() + 1.0 / options.max_fps
+            frame = self.esperar(seq, options, timeout)
+            if frame is None:
+                if time.monotonic() - ultimo >= idle_timeout or (activa is not None and not activa()):
+                    return
+                continue
+            ultimo = time.monotonic()
+            seq = frame.seq
+            yield frame
+
+
+class PreviewHub:
+    """
+    Canales de preview por sesión dentro del proceso que captura.
+
+    Un cliente puede conectarse antes que el grabador (abrir); el grabador
+    toma el mismo canal (reclamar) y lo cierra al terminar. Si ningún grabador
+    lo reclama, el canal se descarta cuando se va el último cliente (soltar).
+    """
+
+    def __init__(self):
+        self._canales: Dict[str, PreviewChannel] = {}
+        self._lock = threading.Lock()
+
+    def _canal(self, sesion_id: str) -> PreviewChannel:
+        canal = self._canales.get(sesion_id)
+        if canal is None or canal.cerrado:
+            canal = self._canales[sesion_id] = PreviewChannel()
+        return canal
+
+    def abrir(self, sesion_id: str) -> PreviewChannel:
+        """Para un cliente: devolver luego con soltar()."""
+        with self._lock:
+            canal = self._canal(sesion_id)
+            canal.clientes += 1
+            return canal
+
+    def reclamar(self, sesion_id: str) -> PreviewChannel:
+        """Para el grabador: el canal vive hasta cerrar()."""
+        with self._lock:
+            canal = self._canal(sesion_id)
+            canal.reclamado = True
+            return canal
+
+    def soltar(self, sesion_id: str, canal: PreviewChannel) -> None:
+        with self._lock:
+            canal.clientes -= 1
+            if canal.clientes > 0 or canal.reclamado:
+                return
+            if self._canales.get(sesion_id) is canal:
+                del self._canales[sesion_id]
+        canal.cerrar()
+
+    def obtener(self, sesion_id: str) -> Optional[PreviewChannel]:
+        with self._lock:
+            return self._canales.get(sesion_id)
+
+    def cerrar(self, sesion_id: str) -> None:
+        with self._lock:
+            canal = self._canales.pop(sesion_id, None)
+        if canal is not None:
+            canal.cerrar()
+
+
+def mjpeg_part(frame: PreviewFrame) -> bytes:
+    return (
+        f"--{MJPEG_BOUNDARY}\r\nContent-Type: image/jpeg\r\nContent-Length: {len(frame.jpeg)}\r\n"
+        f"X-Timestamp: {frame.timestamp:.3f}\r\nX-Time-Left: {frame.time_left:.1f}\r\n\r\n"
+    ).encode() + frame.jpeg + b"\r\n"
+
+
+def ws_message(frame: PreviewFrame) -> bytes:
+    return WS_HEADER.pack(frame.seq, frame.timestamp, frame.time_left) + frame.jpeg
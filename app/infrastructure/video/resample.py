@@ -0,0 +1,70 @@
+# app/infrastructure/video/resample.py
+"""
+Remuestreo de una grabación (timestamps irregulares del bucle de captura) a la
+frecuencia fija del robot, para que la reproducción tenga tiempos exactos.
+"""
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from app.infrastructure.video.mapper import servo_row_to_pose
+
+DEFAULT_TICK_HZ = 25.0
+DEFAULT_MAX_GAP = 0.1    # huecos más largos que esto no se interpolan de punta a punta
+DEFAULT_MAX_HOLD = 0.25  # en un hueco largo se sostiene el último valor hasta este tiempo
+
+
+def resample_servos(timestamps, servos, rate_hz: float = DEFAULT_TICK_HZ,
+                    max_gap: float = DEFAULT_MAX_GAP, max_hold: float = DEFAULT_MAX_HOLD
+                    ) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    timestamps (N,) crecientes y servos (N, C) → (tiempos (M,), servos (M, C) uint8)
+    sobre la grilla t0 + k / rate_hz, que empieza en 0.
+
+    Entre muestras separadas por <= max_gap se interpola linealmente. En un hueco
+    más largo (frames sin landmarks) se mantiene el valor anterior durante
+    max_hold y luego se interpola hacia la muestra siguiente, sin saltos.
+    """
+    t = np.asarray(timestamps, dtype=np.float64)
+    v = np.asarray(servos, dtype=np.float64)
+    if t.ndim != 1 or v.ndim != 2 or len(t) != len(v):
+        raise ValueError(f"Se esperaba timestamps (N,) y servos (N, C), llegó {t.shape} y {v.shape}")
+    if len(t) == 0:
+        return np.empty(0), np.empty((0, v.shape[1]), dtype=np.uint8)
+
+    # Timestamps repetidos o desordenados: se queda la última muestra de cada instante
+    order = np.argsort(t, kind="stable")
+    t, v = t[order], v[order]
+    keep = np.append(t[1:] > t[:-1], True)
+    t, v = t[keep], v[keep]
+
+    step = 1.0 / rate_hz
+    n = int(np.floor((t[-1] - t[0]) / step + 1e-9)) + 1
+    grid = np.arange(n) * step
+    q = t[0] + grid
+    if len(t) == 1:
+        return grid, np.repeat(v, n, axis=0).astype(np.uint8)
+
+    i = np.clip(np.searchsorted(t, q, side="right") - 1, 0, len(t) - 2)
+    t_a, t_b = t[i], t[i + 1]
+    gap = t_b - t_a
+
+    # Inicio efectivo de la rampa: en huecos largos, después del hold
+    ramp_start = np.where(gap > max_gap, np.minimum(t_a + max_hold, t_b), t_a)
+    span = t_b - ramp_start
+    frac = np.divide(q - ramp_start, span, out=np.ones_like(q), where=span > 0)
+    frac = np.clip(frac, 0.0, 1.0)[:, None]
+
+    out = v[i] + frac * (v[i + 1] - v[i])
+    return grid, np.rint(out).astype(np.uint8)
+
+
+def movimientos_uniformes(timestamps, servos, rate_hz: float = DEFAULT_TICK_HZ,
+                          max_gap: float = DEFAULT_MAX_GAP, max_hold: float = DEFAULT_MAX_HOLD) -> List[Dict]:
+    """Como resample_servos pero en el formato de gesto guardado, con "duration" por frame."""
+    grid, rows = resample_servos(timestamps, servos, rate_hz, max_gap, max_hold)
+    duration = round(1.0 / rate_hz, 6)
+    return [
+        {"time": round(float(t), 4), "duration": duration, **servo_row_to_pose(row)}
+        for t, row in zip(grid, rows)
+    ]
@@ -1,38 +1,292 @@
 # app/infrastructure/video/video_encoder.py
-import cv2
-import base64
+"""
+Video de preview de una grabación.
+
+Dos modos:
+  - "mjpeg": los JPEG que ya produjo la grabación se meten tal cual en un AVI
+    Motion-JPEG (sin decodificar ni recomprimir nada).
+  - "mp4v": se decodifica cada JPEG, se dibuja el timestamp y se codifica con
+    cv2.VideoWriter (más chico, más caro).
+
+PreviewVideoWriter codifica en un hilo propio a medida que llegan los frames,
+así el video está listo apenas termina la grabación.
+
+    python -m app.infrastructure.video.video_encoder bench --frames 600
+"""
+import argparse
+import os
+import queue
+import struct
 import tempfile
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import List, Optional, Tuple
+
+import cv2
 import numpy as np
-from typing import List
+
 from app.domain.entities.gesto_sesion import FrameData
 
-def crear_video_preview(frames: List[FrameData], fps: int = 30) -> str:
+MODOS = ("mjpeg", "mp4v")
+EXTENSION = {"mjpeg": ".avi", "mp4v": ".mp4"}
+CONTENT_TYPE = {"mjpeg": "video/x-msvideo", "mp4v": "video/mp4"}
+
+_SOF_MARKERS = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+
+
+def jpeg_size(jpeg: bytes) -> Tuple[int, int]:
+    """(ancho, alto) leyendo solo la cabecera SOF del JPEG."""
+    i = 2
+    n = len(jpeg)
+    while i + 9 < n:
+        if jpeg[i] != 0xFF:
+            i += 1
+            continue
+        marker = jpeg[i + 1]
+        if marker in _SOF_MARKERS:
+            h, w = struct.unpack(">HH", jpeg[i + 5:i + 9])
+            return w, h
+        if marker == 0xFF or 0xD0 <= marker <= 0xD9:
+            i += 2 if marker != 0xFF else 1
+            continue
+        i += 2 + struct.unpack(">H", jpeg[i + 2:i + 4])[0]
+    raise ValueError("JPEG sin cabecera SOF")
+
+
+# ------------------ AVI Motion-JPEG ------------------
+_AVIF_HASINDEX = 0x10
+_AVIIF_KEYFRAME = 0x10
+
+
+class MjpegAviWriter:
+    """Muxer AVI (RIFF) mínimo: un stream de video MJPG, cada frame es un JPEG ya comprimido."""
+
+    def __init__(self, path: str, width: int, height: int, fps: float = 30.0):
+        self.path = path
+        self.width, self.height, self.fps = width, height, fps
+        self._f = open(path, "wb")
+        self._index: List[Tuple[int, int]] = []
+        self._max_size = 0
+        self._write_header()
+
+    def _write_header(self) -> None:
+        w, h = self.width, self.height
+        scale, rate = 1000, max(1, round(self.fps * 1000))
+        avih = struct.pack("<14I", round(1e6 / self.fps), 0, 0, _AVIF_HASINDEX, 0, 0, 1, 0, w, h, 0, 0, 0, 0)
+        strh = struct.pack("<4s4sIHHIIIIIIII4h", b"vids", b"MJPG", 0, 0, 0, 0, scale, rate, 0, 0, 0,
+                           0xFFFFFFFF, 0, 0, 0, w, h)
+        strf = struct.pack("<IiiHH4sIiiII", 40, w, h, 1, 24, b"MJPG", w * h * 3, 0, 0, 0, 0)
+        strl = b"strl" + _chunk(b"strh", strh) + _chunk(b"strf", strf)
+        hdrl = b"hdrl" + _chunk(b"avih", avih) + _chunk(b"LIST", strl)
+
+        self._f.write(b"RIFF\0\0\0\0AVI ")
+        self._avih_pos = self._f.tell() + 8 + 4 + 8  # LIST size hdrl | avih size
+        self._f.write(_chunk(b"LIST", hdrl))
+        self._strh_pos = self._avih_pos + len(avih) + 8 + 4 + 8
+        self._movi_pos = self._f.tell()
+        self._f.write(b"LIST\0\0\0\0movi")
+
+    def write(self, jpeg: bytes) -> None:
+        offset = self._f.tell() - (self._movi_pos + 8)
+        self._f.write(_chunk(b"00dc", jpeg))
+        self._index.append((offset, len(jpeg)))
+        self._max_size = max(self._max_size, len(jpeg))
+
+    def close(self) -> None:
+        if self._f.closed:
+            return
+        f = self._f
+        end_movi = f.tell()
+        f.write(b"idx1" + struct.pack("<I", 16 * len(self._index)))
+        f.write(b"".join(struct.pack("<4sIII", b"00dc", _AVIIF_KEYFRAME, off, size) for off, size in self._index))
+        end = f.tell()
+
+        n = len(self._index)
+        f.seek(4)
+        f.write(struct.pack("<I", end - 8))
+        f.seek(self._movi_pos + 4)
+        f.write(struct.pack("<I", end_movi - self._movi_pos - 8))
+        f.seek(self._avih_pos + 16)   # dwTotalFrames
+        f.write(struct.pack("<I", n))
+        f.seek(self._avih_pos + 28)   # dwSuggestedBufferSize
+        f.write(struct.pack("<I", self._max_size + 8))
+        f.seek(self._strh_pos + 32)   # dwLength
+        f.write(struct.pack("<II", n, self._max_size + 8))
+        f.close()
+
+
+def _chunk(fourcc: bytes, data: bytes) -> bytes:
+    pad = b"\0" if len(data) % 2 else b""
+    return fourcc + struct.pack("<I", len(data)) + data + pad
+
+
+# ------------------ Escritura incremental ------------------
+class PreviewVideoWriter:
+    """
+    agregar(timestamp, jpeg) encola el frame y un hilo escritor lo escribe.
+    cerrar() espera la cola y devuelve la ruta del video terminado.
+
+    En modo "mp4v" con decode_workers > 0 la decodificación + anotación corre
+    en un pool y el escritor consume los resultados en orden de llegada. Como
+    mucho hay `max_in_flight` frames decodificados a la vez: agregar() espera
+    si la ventana está llena.
+    """
+
+    def __init__(self, modo: str = "mjpeg", fps: float = 30.0, path: Optional[str] = None,
+                 decode_workers: int = 0, max_in_flight: int = 16):
+        if modo not in MODOS:
+            raise ValueError(f"Modo de preview desconocido: {modo}")
+        self.modo = modo
+        self.fps = fps
+        self.content_type = CONTENT_TYPE[modo]
+        if path is None:
+            fd, path = tempfile.mkstemp(suffix=EXTENSION[modo], prefix="preview_")
+            os.close(fd)
+        self.path = path
+        self.frames = 0
+        self._writer = None
+        self._error: Optional[BaseException] = None
+        self._pool = None
+        self._ventana = None
+        if modo == "mp4v" and decode_workers > 0:
+            self._pool = ThreadPoolExecutor(max_workers=decode_workers, thread_name_prefix="preview-decode")
+            self._ventana = threading.BoundedSemaphore(max(1, max_in_flight))
+        self._cola: "queue.SimpleQueue" = queue.SimpleQueue()
+        self._hilo = threading.Thread(target=self._run, name="preview-video", daemon=True)
+        self._hilo.start()
+
+    def agregar(self, timestamp: float, jpeg: bytes) -> None:
+        if self._pool is None:
+            self._cola.put((timestamp, jpeg))
+            return
+        self._ventana.acquire()
+        self._cola.put((timestamp, self._pool.submit(_decodificar, timestamp, jpeg)))
+
+    def cerrar(self) -> str:
+        """Termina el video; lanza ValueError si no llegó ningún frame."""
+        self._terminar()
+        if self._error is not None:
+            raise self._error
+        if not self.frames:
+            self.descartar()
+            raise ValueError("No hay frames para generar video")
+        return self.path
+
+    def descartar(self) -> None:
+        self._terminar(cancelar=True)
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+
+    def _terminar(self, cancelar: bool = False) -> None:
+        if self._hilo.is_alive():
+            self._cola.put(None)
+            self._hilo.join()
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=cancelar)
+
+    def _run(self) -> None:
+        try:
+            while True:
+                item = self._cola.get()
+                if item is None:
+                    break
+                try:
+                    if self._error is None:
+                        self._escribir(*item)
+                except BaseException as e:  # se relanza en cerrar()
+                    self._error = e
+                finally:
+                    if self._ventana is not None:
+                        self._ventana.release()
+        finally:
+            if self._writer is not None:
+                self._close_writer()
+
+    def _escribir(self, timestamp: float, data) -> None:
+        if self.modo == "mjpeg":
+            if self._writer is None:
+                self._writer = MjpegAviWriter(self.path, *jpeg_size(data), fps=self.fps)
+            self._writer.write(data)
+        else:
+            frame = data.result() if isinstance(data, Future) else _decodificar(timestamp, data)
+            if self._writer is None:
+                h, w = frame.shape[:2]
+                self._writer = cv2.VideoWriter(self.path, cv2.VideoWriter_fourcc(*"mp4v"), self.fps, (w, h))
+            self._writer.write(frame)
+        self.frames += 1
+
+    def _close_writer(self) -> None:
+        if self.modo == "mjpeg":
+            self._writer.close()
+        else:
+            self._writer.release()
+
+
+def _decodificar(timestamp: float, jpeg: bytes) -> np.ndarray:
+    frame = cv2.imdecode(np.frombuffer(jpeg, np.uint8), cv2.IMREAD_COLOR)
+    if frame is None:
+        raise ValueError(f"Frame {timestamp:.2f}s: JPEG inválido")
+    cv2.putText(frame, f"{timestamp:.2f}s", (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
+    return frame
+
+
+def crear_video_preview(frames: List[FrameData], fps: int = 30, modo: str = "mp4v",
+                        decode_workers: Optional[int] = None, max_in_flight: int = 16) -> str:
     if not frames:
         raise ValueError("No hay frames para generar video")
 
-    # Decodificar primer frame para obtener tamaño
-    first_img = base64.b64decode(frames[0].image_base64)
-    nparr = np.frombuffer(first_img, np.uint8)
-    sample = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
-    h, w = sample.shape[:2]
+    if decode_workers is None:
+        # Un núcleo queda para el hilo escritor (cv2.VideoWriter)
+        decode_workers = max(0, min(4, (os.cpu_count() or 1) - 1))
+    writer = PreviewVideoWriter(modo=modo, fps=fps, decode_workers=decode_workers, max_in_flight=max_in_flight)
+    for frame_data in frames:
+        writer.agregar(frame_data.timestamp, frame_data.image_jpeg)
+    return writer.cerrar()
+
 
-    # Crear archivo temporal
-    tmp_file = tempfile.NamedTemporaryFile(delete=False, suffix=".mp4")
-    output_path = tmp_file.name
-    tmp_file.close()
+# ------------------ Benchmark ------------------
+def _frames_sinteticos(n: int, width: int, height: int) -> List[FrameData]:
+    rng = np.random.default_rng(0)
+    base = rng.integers(0, 255, (height, width, 3), dtype=np.uint8)
+    base = cv2.GaussianBlur(base, (0, 0), 3)
+    frames = []
+    for i in range(n):
+        img = np.roll(base, i * 4, axis=1)
+        cv2.circle(img, (width // 2, height // 2), 40 + i % 60, (0, 0, 255), -1)
+        frames.append(FrameData(i / 30.0, {}, cv2.imencode(".jpg", img)[1].tobytes()))
+    return frames
 
-    fourcc = cv2.VideoWriter_fourcc(*"mp4v")
-    out = cv2.VideoWriter(output_path, fourcc, fps, (w, h))
 
-    for frame_data in frames:
-        img_data = base64.b64decode(frame_data.image_base64)
-        frame = cv2.imdecode(np.frombuffer(img_data, np.uint8), cv2.IMREAD_COLOR)
-        
-        # Opcional: dibujar timestamp
-        cv2.putText(frame, f"{frame_data.timestamp:.2f}s", (10, 30),
-                    cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
-        
-        out.write(frame)
-
-    out.release()
-    return output_path
\ No newline at end of file
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Video de preview")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    bench = sub.add_parser("bench", help="Compara decodificación serie vs pool en crear_video_preview")
+    bench.add_argument("--frames", type=int, default=600)
+    bench.add_argument("--size", default="640x480")
+    bench.add_argument("--workers", type=int, nargs="+", default=[0, 2, 4])
+    bench.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    width, height = map(int, args.size.split("x"))
+    frames = _frames_sinteticos(args.frames, width, height)
+    print(f"{args.frames} frames {width}x{height}, mejor de {args.repeat}")
+    base = None
+    for modo, workers in [("mjpeg", 0)] + [("mp4v", w) for w in args.workers]:
+        mejor = float("inf")
+        for _ in range(args.repeat):
+            t0 = time.perf_counter()
+            path = crear_video_preview(frames, modo=modo, decode_workers=workers)
+            mejor = min(mejor, time.perf_counter() - t0)
+            os.unlink(path)
+        if modo == "mp4v" and workers == 0:
+            base = mejor
+        speedup = f"  x{base / mejor:.2f}" if base and modo == "mp4v" else ""
+        print(f"  {modo:5s} workers={workers}: {mejor * 1000:8.1f} ms  "
+              f"({args.frames / mejor:6.0f} frames/s){speedup}")
+
+
+if __name__ == "__main__":
+    main()
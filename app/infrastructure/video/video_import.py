@@ -0,0 +1,242 @@
+# app/infrastructure/video/video_import.py
+"""
+Importación offline de videos de referencia a gestos.
+
+Cada video se procesa entero en un worker de un ProcessPoolExecutor (un modelo
+de pose por proceso, el tracking de MediaPipe necesita los frames en orden); el
+padre recibe los landmarks (N, 33, 4) y los mapea por lotes con
+to_loly_pose_batch + el mismo filtro que usa GestureRecorder en vivo.
+"""
+import json
+import logging
+import multiprocessing as mp
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from app.domain.enums.gesture_type import GestureType
+from app.infrastructure.video.calibration import CalibrationProfile
+from app.infrastructure.video.filters import ServoFilterBank
+from app.infrastructure.video.mapper import DEFAULT_MIN_VISIBILITY, to_loly_pose_batch
+from app.infrastructure.video.resample import DEFAULT_MAX_HOLD, DEFAULT_TICK_HZ, movimientos_uniformes
+
+log = logging.getLogger(__name__)
+
+NUM_POSE_LANDMARKS = 33
+
+
+# ------------------ Manifest ------------------
+@dataclass(frozen=True)
+class VideoImportItem:
+    path: str
+    nombre: str
+    tipo: GestureType = GestureType.EMOTIONAL
+    emocion: Optional[str] = None
+    palabras_clave: List[str] = field(default_factory=list)
+    perfil_calibracion: Optional[str] = None
+
+    @classmethod
+    def from_dict(cls, data: Dict, base_dir: str = "") -> "VideoImportItem":
+        path = data["path"]
+        return cls(
+            path=path if os.path.isabs(path) else os.path.join(base_dir, path),
+            nombre=data.get("nombre") or os.path.splitext(os.path.basename(path))[0],
+            tipo=GestureType(data.get("tipo", GestureType.EMOTIONAL.value)),
+            emocion=data.get("emocion"),
+            palabras_clave=list(data.get("palabras_clave", [])),
+            perfil_calibracion=data.get("perfil_calibracion"),
+        )
+
+
+def load_manifest(path: str) -> List[VideoImportItem]:
+    """
+    Manifest JSON: {"videos": [{"path", "nombre", "tipo", "emocion", "palabras_clave"}, ...]}
+    (o directamente la lista). Las rutas relativas son relativas al manifest.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    entries = data["videos"] if isinstance(data, dict) else data
+    base_dir = os.path.dirname(os.path.abspath(path))
+    return [VideoImportItem.from_dict(e, base_dir) for e in entries]
+
+
+# ------------------ Worker ------------------
+_estimator = None
+
+
+def _init_worker(model_complexity: int) -> None:
+    global _estimator
+    from app.infrastructure.external.pose_inference import PoseEstimator
+
+    # El paralelismo lo dan los procesos: OpenCV con un hilo evita sobre-suscribir núcleos
+    cv2.setNumThreads(1)
+    _estimator = PoseEstimator(model_complexity=model_complexity)
+
+
+def extract_landmarks(path: str) -> Tuple[np.ndarray, np.ndarray, int]:
+    """
+    Corre la pose sobre todo el video. Devuelve (timestamps (N,), landmarks (N, 33, 4))
+    solo con los frames donde hubo detección, timestamps en segundos desde el inicio,
+    y la cantidad de frames decodificados (con o sin pose).
+    """
+    cap = cv2.VideoCapture(path)
+    if not cap.isOpened():
+        raise ValueError(f"No se pudo abrir el video {path}")
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+    count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT)) or 0
+
+    timestamps = np.empty(count, dtype=np.float64)
+    landmarks = np.empty((count, NUM_POSE_LANDMARKS, 4), dtype=np.float32)
+    n = i = 0
+    image = None
+    try:
+        while True:
+            ok, image = cap.read(image)
+            if not ok:
+                break
+            if n == len(timestamps):  # CAP_PROP_FRAME_COUNT es solo una estimación
+                timestamps = np.resize(timestamps, max(16, 2 * n))
+                landmarks = np.resize(landmarks, (max(16, 2 * n), NUM_POSE_LANDMARKS, 4))
+            if _estimator.process(image, landmarks[n]):
+                timestamps[n] = i / fps
+                n += 1
+            i += 1
+    finally:
+        cap.release()
+    return timestamps[:n].copy(), landmarks[:n].copy(), i
+
+
+def _process_video(path: str) -> Tuple[np.ndarray, np.ndarray, int]:
+    t0 = time.perf_counter()
+    timestamps, landmarks, decodificados = extract_landmarks(path)
+    log.debug("%s: %d/%d frames con pose en %.1fs", path, len(timestamps), decodificados,
+              time.perf_counter() - t0)
+    return timestamps, landmarks, decodificados
+
+
+# ------------------ Mapeo ------------------
+def landmarks_to_movimientos(timestamps: np.ndarray, landmarks: np.ndarray,
+                             profile: Optional[CalibrationProfile] = None,
+                             filtro_config: Optional[Dict[str, dict]] = None,
+                             tick_hz: float = DEFAULT_TICK_HZ, max_hold: float = DEFAULT_MAX_HOLD) -> List[Dict]:
+    """Landmarks de un video → gesto en el formato que sube AprobarGesto (grilla fija a tick_hz)."""
+    if not len(timestamps):
+        return []
+    servos = to_loly_pose_batch(landmarks, profile, min_visibility=DEFAULT_MIN_VISIBILITY)
+    servos = ServoFilterBank(filtro_config).apply_batch(timestamps, servos)
+    return movimientos_uniformes(timestamps, servos, rate_hz=tick_hz, max_hold=max_hold)
+
+
+# ------------------ Job ------------------
+@dataclass
+class ImportJob:
+    total: int
+    id: str = field(default_factory=lambda: str(uuid.uuid4()))
+    estado: str = "pendiente"  # pendiente | procesando | terminado | error
+    procesados: int = 0
+    frames: int = 0            # decodificados (el throughput real del pool)
+    frames_con_pose: int = 0
+    resultados: List[Dict] = field(default_factory=list)
+    errores: List[Dict] = field(default_factory=list)
+    error: Optional[str] = None  # por qué se abortó el job entero (estado "error")
+    inicio: Optional[float] = None
+    fin: Optional[float] = None
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    @property
+    def segundos(self) -> float:
+        if self.inicio is None:
+            return 0.0
+        return (self.fin or time.time()) - self.inicio
+
+    @property
+    def frames_por_segundo(self) -> float:
+        s = self.segundos
+        return self.frames / s if s > 0 else 0.0
+
+    def to_dict(self) -> Dict:
+        with self._lock:
+            return {
+                "job_id": self.id,
+                "estado": self.estado,
+                "total": self.total,
+                "procesados": self.procesados,
+                "progreso": round(self.procesados / self.total, 3) if self.total else 1.0,
+                "frames": self.frames,
+                "frames_con_pose": self.frames_con_pose,
+                "frames_por_segundo": round(self.frames_por_segundo, 1),
+                "segundos": round(self.segundos, 1),
+                "resultados": list(self.resultados),
+                "errores": list(self.errores),
+                "error": self.error,
+            }
+
+
+class VideoImporter:
+    """
+    Reparte los videos en un pool de procesos y entrega cada gesto mapeado a
+    `on_gesture(item, movimientos) -> dict` (subirlo, escribirlo a disco...) a
+    medida que termina, actualizando el progreso del job.
+    """
+
+    def __init__(self, workers: Optional[int] = None, model_complexity: int = 1,
+                 profiles: Optional[Callable[[Optional[str]], CalibrationProfile]] = None,
+                 filtro_config: Optional[Dict[str, dict]] = None,
+                 tick_hz: float = DEFAULT_TICK_HZ, max_hold: float = DEFAULT_MAX_HOLD):
+        self.workers = workers or os.cpu_count() or 1
+        self.model_complexity = model_complexity
+        self.profiles = profiles
+        self.filtro_config = filtro_config
+        self.tick_hz = tick_hz
+        self.max_hold = max_hold
+
+    def run(self, items: List[VideoImportItem], on_gesture: Callable[[VideoImportItem, List[Dict]], Dict],
+            job: Optional[ImportJob] = None) -> ImportJob:
+        job = job or ImportJob(total=len(items))
+        job.estado, job.inicio = "procesando", time.time()
+        # spawn: el proceso padre puede tener hilos (uvicorn, captura) y fork no es seguro con ellos
+        ctx = mp.get_context("spawn")
+        try:
+            with ProcessPoolExecutor(max_workers=min(self.workers, max(1, len(items))), mp_context=ctx,
+                                     initializer=_init_worker, initargs=(self.model_complexity,)) as pool:
+                futures = {pool.submit(_process_video, item.path): item for item in items}
+                for future in as_completed(futures):
+                    item = futures[future]
+                    try:
+                        timestamps, landmarks, decodificados = future.result()
+                        with job._lock:
+                            job.frames += decodificados
+                            job.frames_con_pose += len(timestamps)
+                        profile = self.profiles(item.perfil_calibracion) if self.profiles else None
+                        movimientos = landmarks_to_movimientos(
+                            timestamps, landmarks, profile, self.filtro_config, self.tick_hz, self.max_hold
+                        )
+                        if not movimientos:
+                            raise ValueError("No se detectó pose en ningún frame")
+                        resultado = {"nombre": item.nombre, "frames": decodificados,
+                                     "frames_con_pose": len(timestamps), **on_gesture(item, movimientos)}
+                        with job._lock:
+                            job.resultados.append(resultado)
+                    except Exception as e:
+                        log.warning("Importación de %s falló: %s", item.path, e)
+                        with job._lock:
+                            job.errores.append({"nombre": item.nombre, "path": item.path, "error": str(e)})
+                    with job._lock:
+                        job.procesados += 1
+                    log.info("Importación %s: %d/%d videos, %.1f frames/s",
+                             job.id, job.procesados, job.total, job.frames_por_segundo)
+            job.estado = "terminado"
+        except Exception as e:
+            log.exception("Importación %s abortada", job.id)
+            job.estado, job.error = "error", f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            job.fin = time.time()
+        return job
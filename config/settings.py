@@ -7,6 +7,52 @@ class Settings(BaseSettings):
     AZURE_SPEECH_KEY: str
     AZURE_SPEECH_REGION: str
 
+    # Sesiones de grabación: "redis" (compartidas entre workers) o "memory" (un solo proceso)
+    SESSION_STORE: str = "redis"
+    REDIS_URL: str = "redis://localhost:6379/0"
+    SESSION_MAX_SESIONES: int = 64   # solo "memory": tope LRU de sesiones
+    SESSION_MAX_MB: int = 256        # solo "memory": tope LRU de imágenes en memoria
+    # Eventos de sesión (SSE): "redis" o "memory"; por defecto el mismo backend que SESSION_STORE
+    SESSION_EVENTS: str | None = None
+
+    # Calibración de servos: perfiles por robot (se recargan al cambiar el archivo)
+    CALIBRATION_FILE: str = "config/calibration.json"
+    CALIBRATION_PROFILE: str = "default"
+
+    # Suavizado de los servos al grabar: "none" (las poses del mapper tal cual, como
+    # siempre), "one_euro", "ema" o "kalman" (parámetros en filters.DEFAULT_CHANNEL_CONFIG)
+    SERVO_FILTER: str = "none"
+
+    # Captura: "sync" (todo en el hilo que llama) o "threaded" (grabber + inferencia)
+    CAPTURE_MODE: str = "sync"
+    CAMERA_INDEX: int = 1
+    # Si está definido, la cámara la maneja el broker (camera_broker.py) y cada sesión se suscribe
+    CAMERA_BROKER_NAME: str | None = None
+    # Si está definido, se reproduce una captura grabada (landmark_stream.py) en lugar de la cámara
+    CAPTURE_REPLAY_FILE: str | None = None
+
+    # Inferencia de pose: "fixed" (frame completo) o "adaptive" (ROI + complejidad automática)
+    POSE_INFERENCE: str = "fixed"
+    POSE_INFERENCE_WIDTH: int = 640
+    POSE_TARGET_FPS: float = 30.0
+
+    # Gestos aprobados: remuestreo a la frecuencia fija del robot
+    ROBOT_TICK_HZ: float = 25.0
+    GESTURE_MAX_HOLD: float = 0.25   # s que se sostiene el último valor en un hueco sin landmarks
+    GESTURE_MAX_ERROR: int = 1       # error máximo (unidades de servo) de la compresión por keyframes
+
+    # Video de preview, codificado mientras se graba: "mp4v" (MP4, lo reproducen los
+    # clientes móviles/web) o "mjpeg", opcional: mete los JPEG tal cual en un AVI sin
+    # recomprimir (menos CPU, pero muchos reproductores no lo abren)
+    PREVIEW_VIDEO_MODE: str = "mp4v"
+    PREVIEW_VIDEO_FPS: float = 30.0
+    PREVIEW_CACHE_MAX: int = 32      # videos de preview guardados por proceso
+
+    # Importación offline de videos: procesos del pool (0 = uno por núcleo)
+    IMPORT_WORKERS: int = 0
+    # Carpeta de la que la API acepta videos a importar (el CLI no tiene esta restricción)
+    IMPORT_DIR: str = "data/import"
+
     class Config:
         env_file = ".env"
 
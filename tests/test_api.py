@@ -0,0 +1,157 @@
+import asyncio
+import json
+import os
+import time
+
+import cv2
+import numpy as np
+import pytest
+from fastapi import HTTPException
+
+# Settings exige las credenciales de Azure; estos tests no las usan
+for _variable in ("AZURE_STORAGE_CONNECTION_STRING", "AZURE_SPEECH_KEY", "AZURE_SPEECH_REGION"):
+    os.environ.setdefault(_variable, "test")
+
+from app.application.gestos.eventos_sesion import EventosSesion  # noqa: E402
+from app.application.gestos.gestor_sesiones import GestorSesiones  # noqa: E402
+from app.application.gestos.importar_videos import (  # noqa: E402
+    ImportarVideos,
+    ImportarVideosRequest,
+    ImportJobRegistry,
+    VideoImportEntry,
+)
+from app.domain.entities.gesto_sesion import GestoSesion  # noqa: E402
+from app.infrastructure.persistence.session_events import MemoryEventBus  # noqa: E402
+from app.infrastructure.persistence.session_store import MemorySessionStore  # noqa: E402
+from app.infrastructure.video import video_import  # noqa: E402
+from app.infrastructure.video.calibration import CalibrationRegistry  # noqa: E402
+from app.infrastructure.video.preview_cache import PreviewVideo, PreviewVideoCache  # noqa: E402
+
+
+def _gestor(**estado):
+    gestor = GestorSesiones(MemorySessionStore(), MemoryEventBus())
+    sesion = GestoSesion(**estado)
+    gestor.crear(sesion)
+    return gestor, sesion
+
+
+def _eventos(use_case, sesion_id, publicar=()):
+    """Corre el stream SSE; tras la foto inicial publica `publicar` como lo haría el grabador."""
+
+    async def correr():
+        recibidos = []
+        async for evento in await use_case.ejecutar(sesion_id):
+            recibidos.append((evento["event"], json.loads(evento["data"])))
+            if evento["event"] == "estado":
+                for tipo, data in publicar:
+                    use_case.gestor.publicar(sesion_id, tipo, data)
+        return recibidos
+
+    return asyncio.run(asyncio.wait_for(correr(), 5.0))
+
+
+def test_suscripcion_sigue_despues_de_finished():
+    bus = MemoryEventBus()
+
+    async def correr():
+        suscripcion = bus.suscribir("s1")
+        await suscripcion.iniciar()
+        for tipo in ("finished", "preview", "frames"):
+            bus.publicar("s1", {"type": tipo, "data": None})
+        recibidos = [evento["type"] async for evento in suscripcion]
+        await suscripcion.cerrar()
+        return recibidos
+
+    assert asyncio.run(asyncio.wait_for(correr(), 5.0)) == ["finished", "preview"]
+    assert not bus._subs
+
+
+def test_eventos_entrega_finished_y_preview():
+    gestor, sesion = _gestor(grabando=True)
+    eventos = _eventos(EventosSesion(gestor), sesion.id,
+                       publicar=[("frames", 10), ("finished", 10), ("preview", "https://x/p.mp4")])
+    assert [tipo for tipo, _ in eventos] == ["estado", "frames", "finished", "preview"]
+    assert eventos[-1][1] == "https://x/p.mp4"
+
+
+def test_eventos_sesion_finalizada_espera_el_preview():
+    gestor, sesion = _gestor(finalizado=True)
+    eventos = _eventos(EventosSesion(gestor), sesion.id, publicar=[("preview", "https://x/p.mp4")])
+    assert [tipo for tipo, _ in eventos] == ["estado", "preview"]
+
+
+def test_eventos_sesion_finalizada_con_preview_en_cache(tmp_path):
+    gestor, sesion = _gestor(finalizado=True)
+    videos = PreviewVideoCache()
+    video = videos.guardar(sesion.id, PreviewVideo(str(tmp_path / "p.mp4"), 10, "video/mp4"))
+    video.url, video.url_expira = "https://x/p.mp4", float("inf")
+    eventos = _eventos(EventosSesion(gestor, videos), sesion.id)
+    assert eventos[1:] == [("preview", "https://x/p.mp4")]
+
+
+def test_eventos_sin_preview_termina_por_timeout():
+    gestor, sesion = _gestor(grabando=True)
+    eventos = _eventos(EventosSesion(gestor, espera_preview=0.05), sesion.id, publicar=[("finished", 3)])
+    assert [tipo for tipo, _ in eventos] == ["estado", "finished"]
+
+
+# ------------------ Importación ------------------
+def _importar(tmp_path):
+    carpeta = tmp_path / "import"
+    carpeta.mkdir()
+    (carpeta / "ok.mp4").write_bytes(b"")
+    jobs = ImportJobRegistry()
+    return ImportarVideos(None, CalibrationRegistry(), jobs, workers=1, import_dir=str(carpeta)), jobs
+
+
+def test_importar_solo_dentro_de_la_carpeta(tmp_path):
+    use_case, _ = _importar(tmp_path)
+    (tmp_path / "secreto.mp4").write_bytes(b"")
+    (tmp_path / "import" / "enlace.mp4").symlink_to(tmp_path / "secreto.mp4")
+    for path in ("../secreto.mp4", str(tmp_path / "secreto.mp4"), "enlace.mp4", "/etc/passwd"):
+        with pytest.raises(HTTPException) as e:
+            use_case.ejecutar(ImportarVideosRequest([VideoImportEntry(path)]))
+        assert e.value.status_code == 400 and "fuera de la carpeta" in e.value.detail
+    with pytest.raises(HTTPException) as e:
+        use_case.ejecutar(ImportarVideosRequest([VideoImportEntry("no_existe.mp4")]))
+    assert "no encontrados" in e.value.detail
+
+
+def test_importar_registra_el_error_del_job(tmp_path):
+    use_case, jobs = _importar(tmp_path)
+
+    class ImporterRoto:
+        def run(self, items, on_gesture, job):
+            assert [i.path for i in items] == [str(tmp_path / "import" / "ok.mp4")]
+            raise OSError("sin espacio")
+
+    use_case.importer = ImporterRoto()
+    job = use_case.ejecutar(ImportarVideosRequest([VideoImportEntry("ok.mp4")]))
+    for _ in range(100):
+        estado = jobs.get(job["job_id"]).to_dict()
+        if estado["estado"] == "error":
+            break
+        time.sleep(0.01)
+    assert estado["estado"] == "error" and estado["error"] == "OSError: sin espacio"
+
+
+def test_extract_landmarks_cuenta_frames_decodificados(tmp_path, monkeypatch):
+    path = str(tmp_path / "v.avi")
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), 10.0, (32, 32))
+    for i in range(9):
+        writer.write(np.full((32, 32, 3), i * 20, dtype=np.uint8))
+    writer.release()
+
+    class PoseEnPares:
+        n = 0
+
+        def process(self, image, out):
+            self.n += 1
+            out[:] = self.n
+            return self.n % 2 == 1
+
+    monkeypatch.setattr(video_import, "_estimator", PoseEnPares())
+    timestamps, landmarks, decodificados = video_import.extract_landmarks(path)
+    assert decodificados == 9
+    assert timestamps.tolist() == pytest.approx([0.0, 0.2, 0.4, 0.6, 0.8])
+    assert landmarks[:, 0, 0].tolist() == [1, 3, 5, 7, 9]
@@ -0,0 +1,110 @@
+import threading
+
+import numpy as np
+import pytest
+
+pytest.importorskip("mediapipe")
+
+from app.infrastructure.external import pose_inference  # noqa: E402
+from app.infrastructure.external.pose_inference import AdaptivePoseEstimator  # noqa: E402
+from app.infrastructure.external.threaded_capture import FREE, FrameRing  # noqa: E402
+
+
+class _Reloj:
+    def __init__(self):
+        self.t = 0.0
+
+    def perf_counter(self):
+        return self.t
+
+    monotonic = perf_counter
+
+
+class _Resultado:
+    pose_landmarks = None
+
+
+class _Modelo:
+    def __init__(self, reloj, latencia, warm_up):
+        self.reloj = reloj
+        self.latencia = latencia
+        self.warm_up = warm_up
+
+    def process(self, _rgb):
+        self.reloj.t += self.latencia + self.warm_up
+        self.warm_up = 0.0
+        return _Resultado()
+
+
+@pytest.fixture
+def reloj(monkeypatch):
+    reloj = _Reloj()
+    monkeypatch.setattr(pose_inference, "time", reloj)
+    return reloj
+
+
+def _estimador(reloj, latencias, **kwargs):
+    """Modelos falsos: construirlos tarda 2 s y su primer frame 1 s extra (warm-up)."""
+
+    def factory(complexity):
+        reloj.t += 2.0
+        return _Modelo(reloj, latencias[complexity], warm_up=1.0)
+
+    # Presupuesto 80 ms; se sube con una media < 40 ms
+    return AdaptivePoseEstimator(target_fps=10.0, cooldown_frames=5, ceiling_cooldown=60.0,
+                                 pose_factory=factory, **kwargs)
+
+
+def _correr(estimador, n):
+    frame = np.zeros((4, 4, 3), dtype=np.uint8)
+    out = np.zeros((33, 4))
+    for _ in range(n):
+        estimador.process(frame, out)
+
+
+def test_subida_sin_bajada_espuria_por_warm_up(reloj):
+    estimador = _estimador(reloj, {1: 0.03, 2: 0.06})
+    _correr(estimador, 5)
+    assert estimador.complexity == 2
+    # 60 ms está dentro del presupuesto: la carga y el warm-up del modelo nuevo no lo bajan
+    _correr(estimador, 100)
+    assert estimador.complexity == 2
+    assert estimador.latency_ewma == pytest.approx(0.06)
+
+
+def test_bajada_fija_techo_hasta_que_vence(reloj):
+    estimador = _estimador(reloj, {1: 0.03, 2: 0.1})
+    _correr(estimador, 5)
+    assert estimador.complexity == 2
+    _correr(estimador, 5)
+    assert estimador.complexity == 1
+    # 30 ms permitiría subir, pero el nivel 2 no cumplió: queda como techo
+    _correr(estimador, 100)
+    assert estimador.complexity == 1
+    reloj.t += 60.0
+    _correr(estimador, 5)
+    assert estimador.complexity == 2
+
+
+def test_respeta_limites_de_complejidad(reloj):
+    estimador = _estimador(reloj, {0: 0.2, 1: 0.2}, min_complexity=0, max_complexity=1)
+    _correr(estimador, 50)
+    assert estimador.complexity == 0
+    estimador = _estimador(reloj, {1: 0.001}, max_complexity=1)
+    _correr(estimador, 50)
+    assert estimador.complexity == 1
+
+
+def test_ring_release_despierta_a_acquire():
+    ring = FrameRing(capacity=4)
+    ocupados = [ring.acquire() for _ in range(4)]
+    obtenido = []
+    hilo = threading.Thread(target=lambda: obtenido.append(ring.acquire()), daemon=True)
+    hilo.start()
+    hilo.join(0.05)
+    assert hilo.is_alive()  # sin slots libres, espera
+    # Camino de excepción en la inferencia: el slot vuelve a FREE sin publicarse
+    ring.release(ocupados[2])
+    hilo.join(1.0)
+    assert not hilo.is_alive() and obtenido == [ocupados[2]]
+    assert ocupados[2].state != FREE
@@ -0,0 +1,107 @@
+import json
+
+import numpy as np
+import pytest
+
+from app.infrastructure.video.keyframes import (
+    FORMAT,
+    comprimir_movimientos,
+    comprimir_servos,
+    descomprimir_gesto,
+    expandir_servos,
+    rdp_indices,
+)
+from app.infrastructure.video.resample import movimientos_uniformes, resample_servos
+
+
+def test_resample_grilla_fija():
+    t = np.array([0.013, 0.05, 0.09, 0.131, 0.17, 0.2])
+    v = np.column_stack([np.linspace(0, 100, 6)] * 7)
+    grid, out = resample_servos(t, v, rate_hz=25.0)
+    assert np.allclose(grid, [0.0, 0.04, 0.08, 0.12, 0.16])
+    assert out.dtype == np.uint8 and out.shape == (5, 7)
+    # Interpolación lineal entre muestras cercanas
+    esperado = np.rint(np.interp(t[0] + grid, t, v[:, 0]))
+    assert out[:, 0].tolist() == esperado.tolist()
+
+
+def test_resample_hueco_largo_sostiene_y_rampa():
+    t = np.array([0.0, 1.0])
+    v = np.array([[0] * 7, [100] * 7])
+    grid, out = resample_servos(t, v, rate_hz=10.0, max_gap=0.1, max_hold=0.25)
+    # Se sostiene el valor hasta 0.25 s y luego rampa hasta 100 en 1.0 s
+    assert out[grid <= 0.25 + 1e-9, 0].tolist() == [0, 0, 0]
+    assert out[-1, 0] == 100
+    assert (np.diff(out[:, 0].astype(int)) >= 0).all()
+    assert out[5, 0] == round((0.5 - 0.25) / 0.75 * 100)
+
+
+def test_resample_timestamps_repetidos_y_desordenados():
+    t = np.array([0.08, 0.0, 0.04, 0.04])
+    v = np.array([[30] * 7, [10] * 7, [20] * 7, [25] * 7])
+    grid, out = resample_servos(t, v, rate_hz=25.0)
+    assert out[:, 0].tolist() == [10, 25, 30]
+
+
+def test_resample_casos_borde():
+    grid, out = resample_servos(np.empty(0), np.empty((0, 7)))
+    assert grid.shape == (0,) and out.shape == (0, 7)
+    grid, out = resample_servos([1.5], [[7] * 7])
+    assert grid.tolist() == [0.0] and out.tolist() == [[7] * 7]
+    with pytest.raises(ValueError):
+        resample_servos([0.0, 1.0], [[1] * 7])
+
+
+def test_movimientos_uniformes():
+    movimientos = movimientos_uniformes([0.0, 0.1], [[50] * 7, [60] * 7], rate_hz=20.0)
+    assert [m["time"] for m in movimientos] == [0.0, 0.05, 0.1]
+    assert all(m["duration"] == 0.05 for m in movimientos)
+    assert movimientos[1]["head"] == {"pitch": 55, "yaw": 55, "row": 55}
+
+
+# ------------------ Keyframes ------------------
+def _servos(n=250, seed=0):
+    rng = np.random.default_rng(seed)
+    t = np.arange(n) / 25.0
+    base = 50 + 40 * np.sin(t[:, None] * np.arange(1, 8)) + rng.normal(0, 0.3, (n, 7))
+    return np.clip(np.rint(base), 0, 100).astype(np.uint8)
+
+
+def test_rdp_recta_y_extremos():
+    assert rdp_indices(np.arange(10) * 3, 0).tolist() == [0, 9]
+    assert rdp_indices([5, 5], 1).tolist() == [0, 1]
+    assert rdp_indices([0, 10, 0], 1).tolist() == [0, 1, 2]
+
+
+@pytest.mark.parametrize("max_error", [0, 1, 3])
+def test_keyframes_error_acotado(max_error):
+    servos = _servos()
+    data = comprimir_servos(servos, 25.0, max_error)
+    assert data["format"] == FORMAT and data["ticks"] == len(servos)
+    grid, out = expandir_servos(data)
+    assert len(grid) == len(servos)
+    assert np.abs(out.astype(int) - servos.astype(int)).max() <= max_error
+    if max_error == 0:
+        assert (out == servos).all()
+
+
+def test_keyframes_otra_frecuencia():
+    servos = _servos()
+    data = comprimir_servos(servos, 25.0, 1)
+    grid, out = expandir_servos(data, rate_hz=50.0)
+    assert np.isclose(grid[-1], (len(servos) - 1) / 25.0)
+    assert (out[::2] == expandir_servos(data)[1]).all()
+
+
+def test_comprimir_movimientos_ida_y_vuelta():
+    servos = _servos(100, seed=1)
+    movimientos = movimientos_uniformes(np.arange(100) / 25.0, servos, rate_hz=25.0)
+    payload, stats = comprimir_movimientos(movimientos, 25.0, 1)
+    assert stats["error_maximo"] <= 1 and stats["ratio_compresion"] > 1
+    restaurado = descomprimir_gesto(json.loads(payload))
+    assert [m["time"] for m in restaurado] == [m["time"] for m in movimientos]
+
+
+def test_descomprimir_formato_viejo():
+    viejo = [{"time": 0.0, "duration": 0.04, "head": {"pitch": 1, "yaw": 2, "row": 3}}]
+    assert descomprimir_gesto(viejo) is viejo
@@ -0,0 +1,163 @@
+import numpy as np
+import pytest
+
+from app.infrastructure.video.calibration import CAL_TABLES, CalibrationProfile
+from app.infrastructure.video.filters import SIN_FILTRO, ServoFilterBank, config_por_tipo
+from app.infrastructure.video.mapper import (
+    SERVO_CHANNELS,
+    PoseMapper,
+    interp_lookup,
+    interp_lookup_batch,
+    pose_to_servo_row,
+    to_loly_pose,
+    to_loly_pose_batch,
+)
+
+
+def _landmarks(n, seed=0):
+    rng = np.random.default_rng(seed)
+    lm = rng.uniform(0.0, 1.0, (n, 33, 3))
+    # Algunos casos borde: hombros superpuestos y boca degenerada
+    lm[0, 12] = lm[0, 11]
+    lm[1, 10] = lm[1, 9]
+    return lm
+
+
+def _pose_dict(frame):
+    return {i: tuple(frame[i]) for i in range(33) if not np.isnan(frame[i]).any()}
+
+
+@pytest.mark.parametrize("profile", [None, CalibrationProfile.from_tables("invertido", {
+    "pitch": [(57.0, 0), (47.0, 50), (39.0, 100)],
+})])
+def test_batch_igual_a_escalar(profile):
+    lm = _landmarks(500)
+    batch = to_loly_pose_batch(lm, profile)
+    assert batch.shape == (500, len(SERVO_CHANNELS))
+    assert batch.dtype == np.uint8
+    for i, frame in enumerate(lm):
+        esperado = pose_to_servo_row(to_loly_pose(_pose_dict(frame), (640, 480), profile))
+        assert batch[i].tolist() == esperado, i
+
+
+def test_batch_landmarks_ausentes():
+    lm = _landmarks(40, seed=1)
+    lm[::3, 0] = np.nan    # nariz
+    lm[1::4, 15] = np.nan  # muñeca izquierda
+    lm[2::5, 9] = np.nan   # boca
+    batch = to_loly_pose_batch(lm)
+    for i, frame in enumerate(lm):
+        assert batch[i].tolist() == pose_to_servo_row(to_loly_pose(_pose_dict(frame), (640, 480))), i
+
+
+def test_batch_mantiene_ultimo_visible():
+    lm = np.concatenate([_landmarks(4, seed=2), np.ones((4, 33, 1))], axis=2)
+    lm[2:, 15, 3] = 0.0  # muñeca izquierda invisible desde el frame 2
+    servos = to_loly_pose_batch(lm, min_visibility=0.5)
+    sin_hold = to_loly_pose_batch(lm)
+    assert (servos[2:, 3:5] == servos[1, 3:5]).all()
+    assert (servos[:, [0, 1, 2, 5, 6]] == sin_hold[:, [0, 1, 2, 5, 6]]).all()
+
+
+def test_batch_forma_invalida():
+    with pytest.raises(ValueError):
+        to_loly_pose_batch(np.zeros((2, 17, 3)))
+
+
+def test_interp_lookup_batch():
+    angles = np.array([-200.0, 0.0, 39.0, 42.5, 47.0, 51.3, 57.0, 90.0, np.nan])
+    for name, table in CAL_TABLES.items():
+        esperado = [interp_lookup(a, table) for a in angles]
+        assert interp_lookup_batch(angles, table).tolist() == esperado, name
+
+
+def test_pose_mapper_igual_a_batch():
+    rng = np.random.default_rng(3)
+    lm = np.concatenate([rng.uniform(0, 1, (300, 33, 3)), rng.uniform(0, 1, (300, 33, 1))], axis=2)
+    lm = lm.astype(np.float32)
+    lm[::7, 0, :3] = np.nan
+    mapper = PoseMapper()
+    filas = np.array([mapper.map(frame) for frame in lm])
+    assert filas.dtype == np.uint8
+    assert (filas == to_loly_pose_batch(lm, min_visibility=0.5)).all()
+
+
+def _fila(valor, canal=None, resto=50):
+    fila = [resto] * len(SERVO_CHANNELS)
+    if canal is None:
+        return [valor] * len(SERVO_CHANNELS)
+    fila[SERVO_CHANNELS.index(canal)] = valor
+    return fila
+
+
+def _filtrar(bank, filas, hz=30.0):
+    return np.array([bank.update(fila, i / hz).copy() for i, fila in enumerate(filas)])
+
+
+def test_filtro_desactivado_deja_pasar():
+    filas = np.random.default_rng(4).integers(0, 101, (50, len(SERVO_CHANNELS)))
+    assert (_filtrar(ServoFilterBank(SIN_FILTRO), filas) == filas).all()
+    assert config_por_tipo("none") is SIN_FILTRO
+    with pytest.raises(ValueError):
+        config_por_tipo("mediana")
+
+
+def test_filtro_ema_escalon():
+    bank = ServoFilterBank({"default": {"type": "ema", "alpha": 0.5}})
+    salida = _filtrar(bank, [_fila(20)] + [_fila(80)] * 4)
+    # 20 → 50 → 65 → 72.5 → 76.25 (redondeo al par más cercano)
+    assert salida[:, 0].tolist() == [20, 50, 65, 72, 76]
+
+
+def _escalon(tipo, segundos=3.0):
+    bank = ServoFilterBank(config_por_tipo(tipo))
+    n = int(segundos * 30)
+    return _filtrar(bank, [_fila(20)] * 5 + [_fila(80)] * n)[5:, 0].astype(int)
+
+
+def test_filtro_one_euro_escalon():
+    escalon = _escalon("one_euro")
+    assert 20 < escalon[0] < 80                  # suaviza: no salta de golpe
+    assert (np.diff(escalon) >= 0).all()         # sin oscilar ni sobrepico
+    assert escalon.max() <= 80
+    assert abs(escalon[-1] - 80) <= 1.5          # llega dentro de la deadzone
+    assert (escalon[5:] >= 78).all()             # en ~150 ms
+
+
+def test_filtro_kalman_escalon():
+    escalon = _escalon("kalman")
+    # Modelo de velocidad constante: más lento al arrancar y con sobrepico acotado
+    assert escalon[0] < 40
+    assert escalon.max() <= 95
+    assert abs(escalon[-1] - 80) <= 1.5
+
+
+def test_filtro_histeresis_ignora_jitter():
+    bank = ServoFilterBank({"default": {"type": "none", "hysteresis": 1.5}})
+    ruido = [50, 51, 49, 50.4, 51.2, 48.8, 50]
+    salida = _filtrar(bank, [_fila(v) for v in ruido + [52, 51, 52.4]])[:, 0]
+    assert salida[:len(ruido)].tolist() == [50] * len(ruido)
+    # Un cambio real pasa y el nuevo valor sostenido también filtra su jitter
+    assert salida[len(ruido):].tolist() == [52, 52, 52]
+
+
+def test_filtro_canales_independientes():
+    config = {"default": {"type": "none", "hysteresis": 0.0}, "pitch": {"type": "ema", "alpha": 0.5}}
+    filas = [_fila(20, "pitch", resto=10)] + [_fila(80, "pitch", resto=10 + 5 * i) for i in range(1, 5)]
+    salida = _filtrar(ServoFilterBank(config), filas)
+    assert salida[:, 0].tolist() == [20, 50, 65, 72, 76]
+    assert (salida[:, 1:] == np.array(filas)[:, 1:]).all()
+    # Mover solo un canal no arrastra a los demás (mismo filtro en todos)
+    bank = ServoFilterBank(config_por_tipo("one_euro"))
+    filas = [_fila(20, "AL_v")] * 3 + [_fila(90, "AL_v")] * 10
+    salida = _filtrar(bank, filas)
+    otros = [i for i, ch in enumerate(SERVO_CHANNELS) if ch != "AL_v"]
+    assert (salida[:, otros] == 50).all()
+    assert salida[-1, SERVO_CHANNELS.index("AL_v")] > 20
+
+
+def test_filtro_config_invalida():
+    with pytest.raises(ValueError):
+        ServoFilterBank({"cuello": {"type": "ema"}})
+    with pytest.raises(ValueError):
+        ServoFilterBank({"default": {"type": "mediana"}})
@@ -0,0 +1,228 @@
+from datetime import timedelta
+
+import numpy as np
+import pytest
+
+from app.domain.entities.gesto_sesion import FrameData, GestoSesion
+from app.infrastructure.persistence import session_store
+from app.infrastructure.persistence.session_store import MemorySessionStore, RedisSessionStore
+from app.infrastructure.video.mapper import servo_row_to_pose
+from app.infrastructure.video.pose_codec import (
+    POSE_FRAME,
+    decode_pose_frame,
+    decode_pose_frames,
+    encode_pose_frame,
+)
+
+
+def _pose(i):
+    return servo_row_to_pose([(i * 7 + c * 13) % 101 for c in range(7)])
+
+
+def test_pose_frame_ida_y_vuelta():
+    pose = {
+        "head": {"pitch": 0, "yaw": 50, "row": 100},
+        "wing_L": {"vertical": 12, "horizontal": 255},
+        "wing_R": {"vertical": 1, "horizontal": 99},
+    }
+    data = encode_pose_frame(1.234567, pose)
+    assert len(data) == POSE_FRAME.size == 15
+    assert decode_pose_frame(data) == (1.234567, pose)
+
+
+def test_pose_frames_en_bloque_igual_a_uno_por_uno():
+    entradas = [encode_pose_frame(i / 25.0, _pose(i)) for i in range(100)]
+    timestamps, servos = decode_pose_frames(entradas)
+    assert servos.dtype == np.uint8 and servos.shape == (100, 7)
+    for i, entrada in enumerate(entradas):
+        timestamp, pose = decode_pose_frame(entrada)
+        assert timestamps[i] == timestamp
+        assert servo_row_to_pose(servos[i]) == pose
+
+
+def test_pose_frames_vacio():
+    timestamps, servos = decode_pose_frames([])
+    assert timestamps.shape == (0,) and servos.shape == (0, 7)
+
+
+def test_pose_frame_fuera_de_rango():
+    pose = _pose(0)
+    pose["head"]["pitch"] = 300
+    with pytest.raises(Exception):
+        encode_pose_frame(0.0, pose)
+
+
+# ------------------ Sesiones ------------------
+class _Reloj:
+    def __init__(self):
+        self.t = 1000.0
+
+    def monotonic(self):
+        return self.t
+
+
+@pytest.fixture
+def reloj(monkeypatch):
+    reloj = _Reloj()
+    monkeypatch.setattr(session_store, "time", reloj)
+    return reloj
+
+
+def _frame(i, jpeg=b"jpeg"):
+    return FrameData(i / 25, _pose(i), jpeg)
+
+
+def test_memoria_ttl_se_renueva_al_escribir(reloj):
+    store = MemorySessionStore(ttl=timedelta(seconds=60))
+    sesion = GestoSesion(id="s1")
+    store.crear(sesion)
+    reloj.t += 50
+    store.agregar_frame("s1", _frame(0))
+    reloj.t += 50  # 100 s desde crear, 50 desde la última escritura
+    assert store.obtener_estado("s1").frames_guardados == 1
+    reloj.t += 59
+    sesion.grabando = True
+    store.guardar_estado(sesion)
+    reloj.t += 59.9
+    assert store.obtener("s1").grabando
+    reloj.t += 60
+    assert store.obtener_estado("s1") is None
+    assert store.obtener("s1") is None
+    # Expirada no recibe frames (como el RPUSH sobre una clave vencida que nadie lee)
+    store.agregar_frame("s1", _frame(1))
+    assert store.obtener("s1") is None
+
+
+def test_memoria_lru_por_cantidad(reloj):
+    store = MemorySessionStore(max_sesiones=3)
+    for sid in ("a", "b", "c"):
+        store.crear(GestoSesion(id=sid))
+        reloj.t += 1
+    assert store.obtener_estado("a") is not None  # "a" pasa a ser la más reciente
+    store.crear(GestoSesion(id="d"))
+    assert store.obtener_estado("b") is None
+    assert [sid for sid in "acd" if store.obtener_estado(sid)] == ["a", "c", "d"]
+
+
+def test_memoria_lru_por_bytes(reloj):
+    store = MemorySessionStore(max_bytes=100)
+    store.crear(GestoSesion(id="a", frames=[_frame(0, b"x" * 40)]))
+    store.crear(GestoSesion(id="b", frames=[_frame(0, b"x" * 40)]))
+    store.agregar_frame("b", _frame(1, b"x" * 30))  # 110 bytes: sale "a"
+    assert store.obtener_estado("a") is None
+    assert store.obtener_estado("b").frames_guardados == 2
+    # Una sola sesión por encima del tope no se desaloja a sí misma
+    store.agregar_frame("b", _frame(2, b"x" * 200))
+    assert store.obtener("b").frames_guardados == 3
+    store.eliminar("b")
+    assert store._bytes == 0
+
+
+def test_memoria_obtener_devuelve_copias(reloj):
+    store = MemorySessionStore()
+    sesion = GestoSesion(id="s1", frames=[_frame(0)])
+    store.crear(sesion)
+    sesion.frames.append(_frame(1))
+    completa = store.obtener("s1")
+    completa.frames.clear()
+    assert store.obtener("s1").frames_guardados == 1
+    assert store.obtener_estado("s1").frames == []
+
+
+class _RedisFalso:
+    """Lo justo de redis-py para RedisSessionStore; registra los comandos de cada pipeline."""
+
+    def __init__(self):
+        self.datos = {}
+        self.ttl = {}
+        self.pipelines = []
+
+    @staticmethod
+    def _b(valor):
+        return valor if isinstance(valor, bytes) else str(valor).encode()
+
+    def hset(self, key, mapping):
+        self.datos.setdefault(key, {}).update({self._b(k): self._b(v) for k, v in mapping.items()})
+
+    def hgetall(self, key):
+        return dict(self.datos.get(key, {}))
+
+    def hincrby(self, key, campo, n):
+        h = self.datos.setdefault(key, {})
+        h[self._b(campo)] = self._b(int(h.get(self._b(campo), 0)) + n)
+
+    def rpush(self, key, *valores):
+        self.datos.setdefault(key, []).extend(self._b(v) for v in valores)
+
+    def lrange(self, key, inicio, fin):
+        return list(self.datos.get(key, []))
+
+    def expire(self, key, ttl):
+        self.ttl[key] = ttl
+
+    def delete(self, *keys):
+        for key in keys:
+            self.datos.pop(key, None)
+            self.ttl.pop(key, None)
+
+    def pipeline(self, transaction=True):
+        pipe = _PipelineFalso(self)
+        self.pipelines.append(pipe.comandos)
+        return pipe
+
+
+class _PipelineFalso:
+    def __init__(self, redis):
+        self.redis = redis
+        self.comandos = []
+
+    def __getattr__(self, nombre):
+        def encolar(*args, **kwargs):
+            self.comandos.append((nombre, args, kwargs))
+            return self
+        return encolar
+
+    def execute(self):
+        return [getattr(self.redis, nombre)(*args, **kwargs) for nombre, args, kwargs in self.comandos]
+
+
+@pytest.fixture
+def redis_falso(monkeypatch):
+    redis = pytest.importorskip("redis")
+    falso = _RedisFalso()
+    monkeypatch.setattr(redis, "from_url", lambda url: falso)
+    return falso
+
+
+def test_redis_claves_y_pipeline_por_frame(redis_falso):
+    store = RedisSessionStore("redis://falso", ttl=timedelta(minutes=30))
+    sesion = GestoSesion(id="s1", emocion="alegria", palabras_clave=["sol"], frames=[_frame(0)])
+    store.crear(sesion)
+    assert set(redis_falso.datos) == {"gesto_sesion:s1", "gesto_sesion:s1:frames", "gesto_sesion:s1:images"}
+    assert redis_falso.ttl == dict.fromkeys(redis_falso.datos, timedelta(minutes=30))
+
+    redis_falso.pipelines.clear()
+    store.agregar_frame("s1", _frame(1, b"otra"))
+    # Un solo viaje por frame: RPUSH de pose e imagen, HINCRBY del contador y EXPIRE de las tres claves
+    assert [(nombre, args[0]) for nombre, args, _ in redis_falso.pipelines[0]] == [
+        ("rpush", "gesto_sesion:s1:frames"),
+        ("rpush", "gesto_sesion:s1:images"),
+        ("hincrby", "gesto_sesion:s1"),
+        ("expire", "gesto_sesion:s1"),
+        ("expire", "gesto_sesion:s1:frames"),
+        ("expire", "gesto_sesion:s1:images"),
+    ]
+    assert len(redis_falso.datos["gesto_sesion:s1:frames"][1]) == POSE_FRAME.size
+
+    estado = store.obtener_estado("s1")
+    assert (estado.frames, estado.frames_guardados, estado.emocion) == ([], 2, "alegria")
+    completa = store.obtener("s1")
+    assert [f.image_jpeg for f in completa.frames] == [b"jpeg", b"otra"]
+    assert completa.frames[1].pose == _pose(1)
+    assert completa.frames[1].timestamp == pytest.approx(1 / 25)
+
+    sesion.finalizado = True
+    store.guardar_estado(sesion)  # solo el hash: los frames no se reescriben
+    assert store.obtener("s1").finalizado and store.obtener_estado("s1").frames_guardados == 2
+    store.eliminar("s1")
+    assert store.obtener_estado("s1") is None and not redis_falso.datos
@@ -0,0 +1,217 @@
+import json
+
+import pytest
+
+from app.application.stories.gesture_library import GestureLibrary, get_gesture_library
+from app.application.stories.gesture_planner import GesturePlanner
+from app.application.stories.gesture_selection import select_contextual_gesture
+from app.application.stories.keyword_expansion import get_expansion_store, importar, leer_dump
+from app.application.stories.keyword_matcher import KeywordMatcher
+
+
+def _gesto(folder, gesture_id, duration, labels=("alegria",), keywords=()):
+    frames = {f"p{j}": {"timestamp": round(duration * j / 2, 3)} for j in range(3)}
+    data = {"gesture_id": gesture_id, "labels": list(labels), "duration": duration, "frames": frames}
+    if keywords:
+        data["keywords"] = list(keywords)
+    with open(folder / f"{gesture_id}.json", "w", encoding="utf-8") as f:
+        json.dump(data, f)
+
+
+def _ids(plan):
+    return [g.gesture_id for g in plan]
+
+
+@pytest.fixture
+def emociones(tmp_path):
+    _gesto(tmp_path, "a", 1.0)
+    _gesto(tmp_path, "b", 0.8)
+    _gesto(tmp_path, "otra", 0.5, labels=("tristeza",))
+    return tmp_path
+
+
+def test_plan_variado_antes_que_repetir(emociones):
+    planner = GesturePlanner(GestureLibrary(str(emociones)))
+    # a+a llena 2.0 s pero la repetición cuesta 0.25 s: a+b (1.8 s) vale más
+    assert _ids(planner.planificar("alegria", 2.0)) == ["a", "b"]
+    # Sin penalización gana llenar todo el segmento
+    sin_penalizar = GesturePlanner(planner.library, variety_penalty=0.0)
+    assert _ids(sin_penalizar.planificar("alegria", 2.0)) == ["a", "a"]
+
+
+def test_plan_nunca_se_pasa_del_segmento(emociones):
+    planner = GesturePlanner(GestureLibrary(str(emociones)))
+    assert _ids(planner.planificar("alegria", 0.99)) == ["b"]
+    assert _ids(planner.planificar("alegria", 0.79)) == []
+    assert _ids(planner.planificar("alegria", 3.0)) == ["a", "b", "a"]
+    for centesimas in range(1, 700):
+        duration = centesimas / 100
+        plan = planner.planificar("alegria", duration)
+        assert sum(g.duration for g in plan) <= duration + 1e-9
+    assert planner.planificar("sin_gestos", 5.0) == ()
+
+
+def test_rellenar_completa_con_recorte(emociones):
+    planner = GesturePlanner(GestureLibrary(str(emociones)))
+    instancias = planner.rellenar("alegria", 3.0, 2.0)
+    assert [i.gesture_id for i in instancias] == ["a", "b", "a_mod"]
+    assert [i.start for i in instancias] == pytest.approx([3.0, 4.0, 4.8])
+    assert instancias[-1].duration == pytest.approx(0.2)
+
+
+def test_rellenar_segmento_largo_repite_sin_estirar(tmp_path):
+    _gesto(tmp_path, "a", 0.5)
+    planner = GesturePlanner(GestureLibrary(str(tmp_path)))
+    # La penalización solo deja dos copias en el plan; el resto se repite entero
+    assert _ids(planner.planificar("alegria", 4.2)) == ["a", "a"]
+    instancias = planner.rellenar("alegria", 0.0, 4.2)
+    assert [i.gesture_id for i in instancias] == ["a"] * 8 + ["a_mod"]
+    assert [i.start for i in instancias] == pytest.approx([0.5 * n for n in range(9)])
+    # El único recorte es el sobrante final, más corto que el gesto
+    assert instancias[-1].duration == pytest.approx(0.2)
+    assert all(i.hasta is None for i in instancias[:-1])
+
+
+def test_plan_se_invalida_al_recargar(emociones):
+    library = GestureLibrary(str(emociones))
+    planner = GesturePlanner(library)
+    assert _ids(planner.planificar("alegria", 1.5)) == ["a"]
+    # Memorizado: misma tupla
+    assert planner.planificar("alegria", 1.5) is planner.planificar("alegria", 1.5)
+
+    _gesto(emociones, "c", 1.5)
+    assert library.refrescar(forzar=True)
+    assert _ids(planner.planificar("alegria", 1.5)) == ["c"]
+
+    (emociones / "c.json").unlink()
+    _gesto(emociones, "a", 0.7)
+    assert library.refrescar(forzar=True)
+    assert _ids(planner.planificar("alegria", 1.5)) == ["b", "a"]
+
+
+def test_archivo_invalido_no_se_relee_hasta_cambiar(emociones, caplog):
+    library = GestureLibrary(str(emociones))
+    (emociones / "roto.json").write_text("{no es json", encoding="utf-8")
+    with caplog.at_level("WARNING"):
+        assert not library.refrescar(forzar=True)
+        version = library.version
+        for _ in range(3):
+            assert not library.refrescar(forzar=True)
+    assert sum("roto.json" in r.getMessage() for r in caplog.records) == 1
+    assert library.version == version
+
+    _gesto(emociones, "roto", 0.6)  # arreglado: se carga en la próxima revisión
+    assert library.refrescar(forzar=True)
+    assert "roto" in library.gestures
+
+
+def test_matcher_sin_tildes_ni_mayusculas():
+    matcher = KeywordMatcher([("corazón", 1)])
+    texto = "Su CORAZON latía; mi Corazón también"
+    matches = matcher.buscar(texto)
+    assert [(m.keyword, m.palabra_inicio, m.inicio, m.fin) for m in matches] == [
+        ("corazón", 1, 3, 10), ("corazón", 4, 21, 28),
+    ]
+    assert texto[21:28] == "Corazón"
+
+
+def test_matcher_palabras_enteras():
+    matcher = KeywordMatcher([("sol", "s"), ("mar", "m")])
+    assert matcher.buscar("el solcito y la marea; girasol") == []
+    assert [m.payload for m in matcher.buscar("sol, mar.")] == ["s", "m"]
+
+
+def test_matcher_frases_superpuestas():
+    matcher = KeywordMatcher([("mi corazón late", "frase"), ("corazón", "corazon"), ("late", "late")])
+    texto = "y mi corazón late fuerte"
+    matches = matcher.buscar(texto)
+    assert [(m.payload, m.palabra_inicio, m.palabra_fin) for m in matches] == [
+        ("corazon", 2, 2), ("frase", 1, 3), ("late", 3, 3),
+    ]
+    frase = matches[1]
+    assert frase.palabras == 3
+    assert texto[frase.inicio:frase.fin] == "mi corazón late"
+    # Una frase incompleta no deja coincidencias a medias
+    assert [m.payload for m in matcher.buscar("mi corazón")] == ["corazon"]
+
+
+def test_matcher_payloads_repetidos():
+    matcher = KeywordMatcher([("luna", 1), ("Luna", 2), ("", 3)])
+    assert len(matcher) == 2
+    assert [m.payload for m in matcher.buscar("la luna")] == [1, 2]
+
+
+def test_gesto_contextual_preferido(tmp_path):
+    _gesto(tmp_path, "g1", 1.0, keywords=("corazón",))
+    _gesto(tmp_path, "g2", 1.0, keywords=("mi corazón late",))
+    _gesto(tmp_path, "g3", 1.0, keywords=("feliz", "saltar"))
+    library = GestureLibrary(str(tmp_path))
+
+    # La frase más larga gana y la posición es la del match, no la primera subcadena igual
+    gesto, posicion = select_contextual_gesture("corazón: mi corazón late", library)
+    assert gesto.gesture_id == "g2" and posicion == 9
+    # Sin frase: orden de la biblioteca antes que la posición en la oración
+    gesto, posicion = select_contextual_gesture("Saltar de corazón", library)
+    assert gesto.gesture_id == "g1" and posicion == 10
+    assert select_contextual_gesture("nada que ver", library) == (None, None)
+
+
+def test_gesto_contextual_propio_antes_que_expansion(tmp_path):
+    class Expansiones:
+        def expandir(self, keyword):
+            return {"feliz": ("contento",), "saltar": ("brincar",)}.get(keyword, ())
+
+    _gesto(tmp_path, "g1", 1.0, keywords=("feliz",))
+    _gesto(tmp_path, "g2", 1.0, keywords=("brincar",))
+    _gesto(tmp_path, "g3", 1.0, keywords=("saltar",))
+    library = GestureLibrary(str(tmp_path), expansiones=Expansiones())
+
+    gesto, posicion = select_contextual_gesture("Estaba contento", library)
+    assert gesto.gesture_id == "g1" and posicion == 7
+    # "brincar" es palabra clave propia de g2 y expansión de g3: gana la propia
+    gesto, _ = select_contextual_gesture("contento de brincar", library)
+    assert gesto.gesture_id == "g2"
+
+
+def _dump(path, filas):
+    with open(path, "w", encoding="utf-8") as f:
+        for rel, inicio, fin, info in filas:
+            f.write(f"/a/x\t/r/{rel}\t/c/es/{inicio}/n\t/c/es/{fin}\t{info}\n")
+
+
+def test_leer_dump_info_no_objeto(tmp_path):
+    dump = tmp_path / "dump.csv"
+    _dump(dump, [
+        ("Synonym", "feliz", "contento", '{"weight": 2.0}'),
+        ("Synonym", "feliz", "alegre", "[1, 2]"),
+        ("Synonym", "feliz", "dichoso", '"texto"'),
+        ("Synonym", "feliz", "gozoso", '{"weight": null}'),
+        ("Synonym", "feliz", "radiante", "no es json"),
+    ])
+    pesos = {(t, r): p for t, r, _, p in leer_dump(str(dump))}
+    assert pesos[("contento", "feliz")] == 2.0
+    assert all(pesos[(r, "feliz")] == 1.0 for r in ("alegre", "dichoso", "gozoso", "radiante"))
+
+
+def test_store_y_biblioteca_siguen_a_la_base(tmp_path):
+    db = str(tmp_path / "exp.db")
+    carpeta = tmp_path / "context"
+    carpeta.mkdir()
+    _gesto(carpeta, "g1", 1.0, keywords=("feliz",))
+
+    store = get_expansion_store(db)
+    assert store.expandir("feliz") == ()
+    library = get_gesture_library(str(carpeta), expansiones=store)
+    assert library.buscar_keywords("estaba contento") == []
+
+    dump = tmp_path / "dump.csv"
+    _dump(dump, [("Synonym", "feliz", "contento", '{"weight": 2.0}')])
+    importar(str(dump), db)
+    nuevo = get_expansion_store(db)
+    assert nuevo is not store and nuevo.expandir("feliz") == ("contento",)
+    assert get_expansion_store(db) is nuevo
+
+    version = library.version
+    assert get_gesture_library(str(carpeta), expansiones=nuevo) is library
+    assert library.version == version + 1
+    assert [m.payload[2].gesture_id for m in library.buscar_keywords("estaba contento")] == ["g1"]